@@ -0,0 +1,8 @@
+"""Benchmarks for detect-installer.
+
+Run them from the project root::
+
+    uv run python -m benchmarks               # every detection branch, as JSON
+    uv run python -m benchmarks.dist_index    # dist-info index vs importlib
+    uv run python -m benchmarks.classify      # bulk prefix classification
+"""
@@ -0,0 +1,85 @@
+"""Run the detect_installer branch benchmarks and emit JSON.
+
+Usage::
+
+    uv run python -m benchmarks --output results.json
+    uv run python -m benchmarks --compare baseline.json --tolerance 0.25
+
+With --compare the exit status is 1 if any measurement is slower than the
+baseline by more than the tolerance (a fraction, 0.25 = 25%).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+
+from . import branches
+
+
+def compare(
+    baseline: dict[str, dict[str, float]],
+    current: dict[str, dict[str, float]],
+    tolerance: float,
+) -> list[str]:
+    """Return a description of every measurement that regressed."""
+
+    regressions = []
+
+    for branch, metrics in current.items():
+        for metric, value in metrics.items():
+            previous = baseline.get(branch, {}).get(metric)
+
+            if previous and value > previous * (1 + tolerance):
+                regressions.append(
+                    f"{branch}.{metric}: {previous:.0f}ns -> {value:.0f}ns"
+                    f" (+{(value / previous - 1) * 100:.0f}%)"
+                )
+
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON file to compare to")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    report = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "results": branches.run(args.iterations),
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+        regressions = compare(baseline, report["results"], args.tolerance)
+
+        for line in regressions:
+            print(f"regression: {line}", file=sys.stderr)
+
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""Time every detect_installer branch against fake environments.
+
+Each branch is measured three ways:
+
+- cold: all in-process caches cleared before every call, so the dist-info
+  index is rebuilt and every probe runs (the OS page cache stays warm);
+- warm: the dist-info index is primed but results are not memoized;
+- memoized: repeat calls answered from the result cache.
+"""
+
+from __future__ import annotations
+
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from detect_installer import clear_cache, detect_installer
+from tests.fakes import SimplePatcher, build_fake_env
+
+BRANCHES: dict[str, dict] = {
+    "pipx": {"prefix": "home/.local/pipx/venvs/mypkg", "installer_value": "pip"},
+    "uv-tool": {"prefix": "home/.local/share/uv/tools/mypkg", "installer_value": "uv"},
+    "conda": {
+        "prefix": "home/miniconda3/envs/myenv",
+        "installer_value": "pip",
+        "conda_packages": ["mypkg"],
+    },
+    "mamba": {
+        "prefix": "home/miniforge3/envs/myenv",
+        "installer_value": "pip",
+        "env": {"MAMBA_EXE": "/usr/bin/mamba"},
+        "conda_packages": ["mypkg"],
+    },
+    "pip-in-conda": {
+        "prefix": "home/miniconda3/envs/myenv",
+        "installer_value": "pip",
+        "conda_packages": [f"conda-pkg-{i}" for i in range(400)],
+    },
+    "brew": {
+        "prefix": "opt/homebrew/Frameworks/Python.framework/Versions/3.12",
+        "executable": "opt/homebrew/Frameworks/Python.framework/Versions/3.12/bin/python3",
+        "installer_value": "pip",
+        "brew_formula": "mypkg",
+    },
+    "uv-project": {
+        "prefix": "myproject/.venv",
+        "installer_value": "uv",
+        "extra_files": {"myproject/uv.lock": ""},
+    },
+    "uv-pip": {"prefix": "myproject/.venv", "installer_value": "uv"},
+    "pip": {"prefix": "myproject/.venv", "installer_value": "pip"},
+    "unknown": {"prefix": "myproject/.venv", "installer_value": None},
+    "not-found": {"prefix": "myproject/.venv", "no_package": True},
+}
+
+# Variables that would otherwise leak the real environment into the fakes.
+_NEUTRAL_ENV = {"CONDA_PREFIX": "", "MAMBA_EXE": ""}
+
+
+def _median_ns(samples: list[int]) -> float:
+    return float(statistics.median(samples))
+
+
+def measure(spec: dict, iterations: int) -> dict[str, float]:
+    """Return the median nanoseconds per call for one branch."""
+
+    with tempfile.TemporaryDirectory() as tmp, SimplePatcher() as patcher:
+        build_fake_env(
+            Path(tmp), {**spec, "env": {**_NEUTRAL_ENV, **spec.get("env", {})}}, patcher
+        )
+        package = spec.get("pkg_name", "mypkg")
+        clock = time.perf_counter_ns
+
+        cold = []
+        for _ in range(iterations):
+            clear_cache()
+            start = clock()
+            detect_installer(package)
+            cold.append(clock() - start)
+
+        warm = []
+        for _ in range(iterations):
+            start = clock()
+            detect_installer(package, use_cache=False)
+            warm.append(clock() - start)
+
+        memoized = []
+        detect_installer(package)
+        for _ in range(iterations):
+            start = clock()
+            detect_installer(package)
+            memoized.append(clock() - start)
+
+        clear_cache()
+
+    return {
+        "cold_ns": _median_ns(cold),
+        "warm_ns": _median_ns(warm),
+        "memoized_ns": _median_ns(memoized),
+    }
+
+
+def run(iterations: int = 200) -> dict[str, dict[str, float]]:
+    """Measure every branch, keyed by branch name."""
+
+    return {name: measure(spec, iterations) for name, spec in BRANCHES.items()}
@@ -0,0 +1,76 @@
+"""Time classifying environment prefixes by their location.
+
+Compares classify_prefixes() with calling the per-environment probes
+(pipx, uv tool, conda, brew) once per prefix, which is what classifying a
+fleet inventory cost before the probes shared one compiled classifier.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import timeit
+
+from detect_installer import classify_prefixes
+from detect_installer._detect import _detect_environment, _Environment
+
+_TEMPLATES = [
+    "/home/{user}/.local/pipx/venvs/{name}",
+    "/home/{user}/.local/share/uv/tools/{name}",
+    "/home/{user}/miniforge3/envs/{name}",
+    "/opt/homebrew/Cellar/python@3.12/3.12.{n}/Frameworks/Python.framework",
+    "/srv/{user}/projects/{name}/.venv",
+    "C:\\Users\\{user}\\AppData\\Local\\{name}\\.venv",
+]
+
+
+def make_prefixes(count: int, unique: float = 0.5) -> list[str]:
+    """Return count prefixes of which roughly `unique` are distinct."""
+
+    rng = random.Random(0)
+    distinct = max(1, int(count * unique))
+    pool = [
+        rng.choice(_TEMPLATES).format(user=f"user{i % 97}", name=f"env{i}", n=i % 10)
+        for i in range(distinct)
+    ]
+
+    return [pool[rng.randrange(distinct)] for _ in range(count)]
+
+
+def run(count: int) -> tuple[float, float]:
+    """Return the mean seconds per prefix for (per-environment probes, bulk)."""
+
+    prefixes = make_prefixes(count)
+
+    def _probes() -> None:
+        for prefix in prefixes:
+            _detect_environment(_Environment(prefix, prefix + "/bin/python", []))
+
+    def _bulk() -> None:
+        classify_prefixes(prefixes)
+
+    probes = min(timeit.repeat(_probes, number=1, repeat=5))
+    bulk = min(timeit.repeat(_bulk, number=1, repeat=5))
+
+    return probes / count, bulk / count
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000], metavar="N"
+    )
+    args = parser.parse_args(argv)
+
+    print(f"{'prefixes':>9} {'probes (ns)':>12} {'bulk (ns)':>10} {'speedup':>9}")
+
+    for count in args.sizes:
+        probes, bulk = run(count)
+        print(
+            f"{count:>9} {probes * 1e9:>12.0f} {bulk * 1e9:>10.0f}"
+            f" {probes / bulk:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Time a persistent cache hit in a fresh process.
+
+The persistent cache only pays off if reading it is cheaper than detecting
+again, imports included, so every sample starts a new interpreter and times
+importing detect_installer and the call, leaving the interpreter's own
+startup out. Compares a run that detects the package with a run that finds
+it in a warm cache. Installed packages have their bytecode compiled, so
+run it with PYTHONDONTWRITEBYTECODE unset or after python -m compileall.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+_SCRIPT = """\
+import time
+start = time.perf_counter()
+import detect_installer
+detect_installer.detect_installer({!r}{})
+print(time.perf_counter() - start)
+"""
+
+
+def _time(code: str, env: dict[str, str], repeat: int) -> float:
+    """Return the fastest of `repeat` runs of `code` in a new interpreter."""
+
+    return min(
+        float(
+            subprocess.run(
+                [sys.executable, "-c", code],
+                env=env,
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+        )
+        for _ in range(repeat)
+    )
+
+
+def run(package: str, repeat: int) -> dict[str, float]:
+    """Return the seconds per process of each variant."""
+
+    with tempfile.TemporaryDirectory() as cache_home:
+        env = {**os.environ, "XDG_CACHE_HOME": cache_home}
+        cached = _SCRIPT.format(package, ", persistent_cache=True")
+        subprocess.run(
+            [sys.executable, "-c", cached], env=env, check=True, capture_output=True
+        )
+
+        return {
+            "uncached": _time(_SCRIPT.format(package, ""), env, repeat),
+            "cache hit": _time(cached, env, repeat),
+        }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--package", default="pip")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    print(f"{'variant':>10} {'ms':>8}")
+
+    for variant, seconds in run(args.package, args.repeat).items():
+        print(f"{variant:>10} {seconds * 1e3:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Compare distribution lookups through importlib.metadata and the dist-info index.
+
+Builds a throwaway site-packages directory with N distributions, puts it at
+the front of sys.path and times looking up names spread across it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import timeit
+from importlib.metadata import distribution
+from pathlib import Path
+
+from detect_installer._detect import _DistInfoIndex, _normalize_name
+
+
+def _populate(site_packages: Path, count: int) -> list[str]:
+    names = [f"Bench_Pkg.{i:05d}" for i in range(count)]
+
+    for name in names:
+        dist_info = site_packages / f"{name.replace('.', '_')}-1.0.0.dist-info"
+        dist_info.mkdir()
+        (dist_info / "METADATA").write_text(
+            f"Metadata-Version: 2.1\nName: {name}\nVersion: 1.0.0\n"
+        )
+        (dist_info / "INSTALLER").write_text("pip\n")
+
+    return names
+
+
+def run(count: int, lookups: int) -> tuple[float, float]:
+    """Return the mean seconds per lookup for (importlib.metadata, index)."""
+
+    with tempfile.TemporaryDirectory() as tmp:
+        site_packages = Path(tmp)
+        names = _populate(site_packages, count)
+        step = max(1, count // lookups)
+        targets = names[::step][:lookups]
+        original_path = sys.path[:]
+        sys.path.insert(0, str(site_packages))
+
+        try:
+            index = _DistInfoIndex()
+
+            def _importlib() -> None:
+                for name in targets:
+                    distribution(name)
+
+            def _index() -> None:
+                for name in targets:
+                    normalized = _normalize_name(name)
+                    assert index.find({normalized}, sys.path)
+
+            # Warm both sides so the comparison is steady-state lookups.
+            _importlib()
+            _index()
+
+            baseline = min(timeit.repeat(_importlib, number=1, repeat=5))
+            indexed = min(timeit.repeat(_index, number=1, repeat=5))
+        finally:
+            sys.path[:] = original_path
+
+    return baseline / len(targets), indexed / len(targets)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000], metavar="N"
+    )
+    parser.add_argument("--lookups", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    print(f"{'dists':>8} {'importlib (us)':>16} {'index (us)':>12} {'speedup':>9}")
+
+    for count in args.sizes:
+        baseline, indexed = run(count, args.lookups)
+        print(
+            f"{count:>8} {baseline * 1e6:>16.1f} {indexed * 1e6:>12.1f}"
+            f" {baseline / indexed:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Measure the memory held by many detection results.
+
+Builds N results the way the detection does (a shared template and the
+package name, rendered on first access) and the way it used to (every
+upgrade command formatted up front), and reports the bytes each holds per
+result, before and after every upgrade_cmd has been read.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import tracemalloc
+from collections.abc import Callable
+
+from detect_installer import Installer, InstallerInfo
+from detect_installer._detect import _get_upgrade_cmd, _info
+
+_INSTALLERS = [
+    Installer.PIP,
+    Installer.UV_PIP,
+    Installer.UV,
+    Installer.CONDA,
+    Installer.PIPX,
+]
+
+
+def _measure(
+    build: Callable[[], list[InstallerInfo]],
+) -> tuple[int, list[InstallerInfo]]:
+    gc.collect()
+    tracemalloc.start()
+    results = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return size, results
+
+
+def _rendered(results: list[InstallerInfo]) -> int:
+    gc.collect()
+    tracemalloc.start()
+
+    for info in results:
+        _ = info.upgrade_cmd
+
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return size
+
+
+def run(count: int) -> dict[str, tuple[float, float]]:
+    """Return the bytes per result of (unread, read) per construction."""
+
+    names = [f"package-{i}" for i in range(count)]
+    pairs = [(_INSTALLERS[i % len(_INSTALLERS)], name) for i, name in enumerate(names)]
+
+    def _eager() -> list[InstallerInfo]:
+        return [
+            InstallerInfo(installer, _get_upgrade_cmd(installer, name))
+            for installer, name in pairs
+        ]
+
+    def _lazy() -> list[InstallerInfo]:
+        return [_info(installer, name) for installer, name in pairs]
+
+    report = {}
+
+    for label, build in (("eager", _eager), ("lazy", _lazy)):
+        unread, results = _measure(build)
+        read = unread + _rendered(results)
+        report[label] = (unread / count, read / count)
+        del results
+
+    return report
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    print(f"{args.count} results")
+    print(f"{'':<6} {'unread (B/result)':>18} {'read (B/result)':>16}")
+
+    for label, (unread, read) in run(args.count).items():
+        print(f"{label:<6} {unread:>18.1f} {read:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
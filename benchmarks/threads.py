@@ -0,0 +1,118 @@
+"""Measure detect_installer throughput as the number of threads grows.
+
+Two workloads run against a fake environment:
+
+- memoized: every thread asks for packages whose results are cached, the
+  path multi-threaded servers take on each request;
+- uncached: every thread re-runs the detection (use_cache=False), which
+  reads the package metadata each time.
+
+On a free-threaded build (python3.13t) the memoized workload should scale
+with the thread count, since cache hits take no lock. On a regular build
+the GIL caps it at one thread's throughput; the single-thread numbers are
+the ones to compare against a baseline (see `python -m benchmarks
+--compare` for the per-branch regression gate).
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from detect_installer import clear_cache, detect_installer
+from tests.fakes import SimplePatcher, build_fake_env, make_dist_info
+
+PACKAGES = 64
+
+
+def _gil_enabled() -> bool:
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+
+    return True if is_gil_enabled is None else is_gil_enabled()
+
+
+def throughput(threads: int, calls: int, use_cache: bool, names: list[str]) -> float:
+    """Return the detections per second of `threads` threads making `calls` each."""
+
+    barrier = threading.Barrier(threads + 1)
+
+    def _worker(offset: int) -> None:
+        barrier.wait()
+
+        for i in range(calls):
+            detect_installer(names[(offset + i) % len(names)], use_cache=use_cache)
+
+    workers = [
+        threading.Thread(target=_worker, args=(offset,)) for offset in range(threads)
+    ]
+
+    for worker in workers:
+        worker.start()
+
+    barrier.wait()
+    start = time.perf_counter()
+
+    for worker in workers:
+        worker.join()
+
+    return threads * calls / (time.perf_counter() - start)
+
+
+def run(thread_counts: list[int], calls: int) -> dict[str, dict[int, float]]:
+    with tempfile.TemporaryDirectory() as tmp, SimplePatcher() as patcher:
+        build_fake_env(
+            Path(tmp),
+            {
+                "prefix": "myproject/.venv",
+                "installer_value": "pip",
+                "env": {"CONDA_PREFIX": "", "MAMBA_EXE": ""},
+            },
+            patcher,
+        )
+        site_packages = Path(tmp) / "myproject/.venv/lib/python3.12/site-packages"
+        names = [f"package-{i}" for i in range(PACKAGES)]
+
+        for name in names:
+            make_dist_info(site_packages, name, "pip")
+
+        clear_cache()
+        # Prime the memo (and the dist-info index) once for every package.
+        for name in names:
+            detect_installer(name)
+
+        return {
+            workload: {
+                threads: throughput(threads, calls, use_cache, names)
+                for threads in thread_counts
+            }
+            for workload, use_cache, calls in (
+                ("memoized", True, calls),
+                ("uncached", False, max(calls // 100, 1)),
+            )
+        }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--threads", type=int, nargs="+", default=[1, 2, 4, 8], metavar="N"
+    )
+    parser.add_argument("--calls", type=int, default=100_000, help="per thread")
+    args = parser.parse_args(argv)
+
+    print(f"Python {sys.version.split()[0]}, GIL {'on' if _gil_enabled() else 'off'}")
+
+    for workload, results in run(args.threads, args.calls).items():
+        single = results[min(results)]
+        print(f"\n{workload:<9} {'threads':>7} {'calls/s':>12} {'scaling':>8}")
+
+        for threads, rate in results.items():
+            print(f"{'':<9} {threads:>7} {rate:>12.0f} {rate / single:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Time picking the "auto" uv strategy on a large uv.lock.
+
+Compares the streaming scanner used by the "auto" strategy with parsing the
+whole lockfile with tomllib, for a package near the start, in the middle
+and at the end of the file.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import timeit
+
+from detect_installer import clear_cache
+from detect_installer._detect import _resolve_uv_upgrade_strategy
+
+
+def write_project(directory: str, packages: int) -> list[str]:
+    """Write a pyproject.toml and a uv.lock locking `packages` packages."""
+
+    names = [f"package-{i}" for i in range(packages)]
+
+    with open(os.path.join(directory, "pyproject.toml"), "w") as f:
+        f.write('[project]\nname = "app"\ndependencies = ["package-0"]\n')
+
+    with open(os.path.join(directory, "uv.lock"), "w") as f:
+        f.write('version = 1\nrequires-python = ">=3.12"\n')
+
+        for i, name in enumerate(names):
+            f.write(
+                f'\n[[package]]\nname = "{name}"\nversion = "1.{i}.0"\n'
+                'source = { registry = "https://pypi.org/simple" }\n'
+                f'dependencies = [\n    {{ name = "{names[i - 1]}" }},\n]\n'
+                f'sdist = {{ url = "https://files.example/{name}.tar.gz", '
+                f'hash = "sha256:{"0" * 64}", size = {i} }}\n'
+            )
+
+    return names
+
+
+def run(directory: str, names: list[str]) -> dict[str, tuple[float, float]]:
+    """Return the seconds per lookup of (tomllib, scanner) per position."""
+
+    if sys.version_info < (3, 11):
+        raise SystemExit("this benchmark needs tomllib (Python 3.11+)")
+
+    import tomllib
+
+    path = os.path.join(directory, "uv.lock")
+    results = {}
+
+    for position, name in (
+        ("first", names[1]),
+        ("middle", names[len(names) // 2]),
+        ("last", names[-1]),
+    ):
+
+        def _tomllib(name: str = name) -> None:
+            with open(path, "rb") as f:
+                any(package["name"] == name for package in tomllib.load(f)["package"])
+
+        def _scanner(name: str = name) -> None:
+            clear_cache()
+            _resolve_uv_upgrade_strategy("auto", directory, name)
+
+        results[position] = (
+            min(timeit.repeat(_tomllib, number=1, repeat=5)),
+            min(timeit.repeat(_scanner, number=1, repeat=5)),
+        )
+
+    return results
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--packages", type=int, default=20_000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        names = write_project(directory, args.packages)
+        size = os.path.getsize(os.path.join(directory, "uv.lock"))
+        print(f"uv.lock: {args.packages} packages, {size / 1e6:.1f} MB")
+        print(f"{'position':>9} {'tomllib (ms)':>13} {'scanner (ms)':>13}")
+
+        for position, (full, scan) in run(directory, names).items():
+            print(f"{position:>9} {full * 1e3:>13.2f} {scan * 1e3:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
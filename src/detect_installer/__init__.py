@@ -1,3 +1,98 @@
-from ._detect import Installer, InstallerInfo, UvUpgradeStrategy, detect_installer
+from ._detect import (
+    Installer,
+    InstallerInfo,
+    classify_prefixes,
+    clear_cache,
+    detect_installer,
+    detect_installers,
+)
+from ._inventory import installer_report, iter_environment
 
-__all__ = ["detect_installer", "Installer", "InstallerInfo", "UvUpgradeStrategy"]
+TYPE_CHECKING = False
+
+if TYPE_CHECKING:
+    from ._async import detect_installer_async, detect_installers_async
+    from ._detect import DetectionStrategy, UvUpgradeStrategy
+    from ._index import IndexClient, outdated_packages
+    from ._notify import UpgradeNotice, upgrade_notice
+    from ._plan import UpgradePlan, UpgradeStep, upgrade_plan
+    from ._prefetch import prefetch_installer
+    from ._stats import CacheStats, LatencyHistogram, Stats, reset_stats, stats
+    from ._trace import DetectionTrace, ProbeTrace, explain_installer
+
+__all__ = [
+    "detect_installer",
+    "detect_installers",
+    "detect_installer_async",
+    "detect_installers_async",
+    "prefetch_installer",
+    "iter_environment",
+    "installer_report",
+    "classify_prefixes",
+    "upgrade_plan",
+    "upgrade_notice",
+    "outdated_packages",
+    "IndexClient",
+    "UpgradeNotice",
+    "UpgradePlan",
+    "UpgradeStep",
+    "explain_installer",
+    "DetectionTrace",
+    "ProbeTrace",
+    "clear_cache",
+    "stats",
+    "reset_stats",
+    "Stats",
+    "CacheStats",
+    "LatencyHistogram",
+    "Installer",
+    "InstallerInfo",
+    "UvUpgradeStrategy",
+    "DetectionStrategy",
+]
+
+
+def __getattr__(name: str) -> object:
+    # These are loaded on first access so that importing the package does
+    # not pay for importing typing, dataclasses, asyncio or threading.
+    if name in ("UvUpgradeStrategy", "DetectionStrategy"):
+        from . import _detect
+
+        return getattr(_detect, name)
+
+    if name in ("detect_installer_async", "detect_installers_async"):
+        from . import _async
+
+        return getattr(_async, name)
+
+    if name == "prefetch_installer":
+        from . import _prefetch
+
+        return _prefetch.prefetch_installer
+
+    if name in ("explain_installer", "DetectionTrace", "ProbeTrace"):
+        from . import _trace
+
+        return getattr(_trace, name)
+
+    if name in ("upgrade_plan", "UpgradePlan", "UpgradeStep"):
+        from . import _plan
+
+        return getattr(_plan, name)
+
+    if name in ("outdated_packages", "IndexClient"):
+        from . import _index
+
+        return getattr(_index, name)
+
+    if name in ("upgrade_notice", "UpgradeNotice"):
+        from . import _notify
+
+        return getattr(_notify, name)
+
+    if name in ("stats", "reset_stats", "Stats", "CacheStats", "LatencyHistogram"):
+        from . import _stats
+
+        return getattr(_stats, name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
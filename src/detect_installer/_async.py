@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import TYPE_CHECKING
+
+from ._detect import (
+    _MISSING,
+    InstallerInfo,
+    _cache,
+    _environment_fingerprint,
+    detect_installers,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from ._detect import UvUpgradeStrategy
+
+MAX_WORKERS = 4
+
+_executor: ThreadPoolExecutor | None = None
+
+_Key = tuple[str, str, bool]
+
+# Detections currently running, per event loop, so that concurrent requests
+# for the same package share one executor job.
+_in_flight: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[_Key, asyncio.Future[InstallerInfo | None]]
+] = weakref.WeakKeyDictionary()
+
+
+def _after_fork_in_child() -> None:
+    # The executor's threads did not survive the fork.
+    global _executor
+
+    _executor = None
+    _in_flight.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=MAX_WORKERS, thread_name_prefix="detect-installer"
+        )
+
+    return _executor
+
+
+def _resolve(
+    in_flight: dict[_Key, asyncio.Future[InstallerInfo | None]],
+    futures: dict[_Key, asyncio.Future[InstallerInfo | None]],
+    job: asyncio.Future[dict[str, InstallerInfo | None]],
+) -> None:
+    """Hand the result of a finished executor job to every waiting future."""
+
+    for key, future in futures.items():
+        if in_flight.get(key) is future:
+            del in_flight[key]
+
+        if future.done():
+            continue
+
+        if job.cancelled():
+            future.cancel()
+        elif (exc := job.exception()) is not None:
+            future.set_exception(exc)
+        else:
+            future.set_result(job.result()[key[0]])
+
+
+def _start(
+    package_names: Iterable[str],
+    uv_upgrade_strategy: UvUpgradeStrategy,
+    use_cache: bool,
+) -> dict[str, asyncio.Future[InstallerInfo | None]]:
+    """Return a future per package, starting one executor job for the new ones."""
+
+    loop = asyncio.get_running_loop()
+    in_flight = _in_flight.setdefault(loop, {})
+    fingerprint = _environment_fingerprint() if use_cache else ()
+    futures: dict[str, asyncio.Future[InstallerInfo | None]] = {}
+    started: dict[_Key, asyncio.Future[InstallerInfo | None]] = {}
+
+    for package_name in package_names:
+        if package_name in futures:
+            continue
+
+        key = (package_name, uv_upgrade_strategy, use_cache)
+        future = in_flight.get(key)
+
+        if future is None:
+            future = loop.create_future()
+
+            # Memoized results need no filesystem access, answer them inline.
+            cache_key = (package_name, uv_upgrade_strategy, fingerprint)
+            if (
+                use_cache
+                and (result := _cache.get(cache_key, _MISSING)) is not _MISSING
+            ):
+                future.set_result(result)
+            else:
+                in_flight[key] = started[key] = future
+
+        futures[package_name] = future
+
+    if started:
+        job = loop.run_in_executor(
+            _get_executor(),
+            partial(
+                detect_installers,
+                [key[0] for key in started],
+                uv_upgrade_strategy,
+                use_cache=use_cache,
+            ),
+        )
+        job.add_done_callback(partial(_resolve, in_flight, started))
+
+    return futures
+
+
+async def detect_installer_async(
+    package_name: str,
+    uv_upgrade_strategy: UvUpgradeStrategy = "add",
+    *,
+    timeout: float | None = None,
+    use_cache: bool = True,
+) -> InstallerInfo | None:
+    """Async version of detect_installer().
+
+    The filesystem probes run in a bounded thread pool, so the event loop is
+    never blocked. Concurrent calls for the same package share one
+    detection. Cancelling a call, or hitting its timeout (which raises
+    asyncio.TimeoutError, the builtin TimeoutError from Python 3.11 on),
+    only stops the caller from waiting; the shared detection keeps running
+    for the other callers.
+    """
+
+    future = _start([package_name], uv_upgrade_strategy, use_cache)[package_name]
+
+    return await asyncio.wait_for(asyncio.shield(future), timeout)
+
+
+async def detect_installers_async(
+    package_names: Iterable[str],
+    uv_upgrade_strategy: UvUpgradeStrategy = "add",
+    *,
+    timeout: float | None = None,
+    use_cache: bool = True,
+) -> dict[str, InstallerInfo | None]:
+    """Async version of detect_installers().
+
+    Packages that are not already being detected are handled by a single
+    executor job, so the environment checks still run only once. The timeout
+    behaves as in detect_installer_async().
+    """
+
+    futures = _start(package_names, uv_upgrade_strategy, use_cache)
+    names = list(futures)
+    results = await asyncio.wait_for(
+        asyncio.gather(*(asyncio.shield(futures[name]) for name in names)),
+        timeout,
+    )
+
+    return dict(zip(names, results))
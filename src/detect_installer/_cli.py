@@ -0,0 +1,305 @@
+"""The detect-installer command.
+
+The command is run from shell prompts and CI hooks, so its startup time is
+what users notice. The usual invocations are parsed by hand. argparse is
+only imported to print --help or a usage error, and json only for --json and
+--ndjson output.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+
+TYPE_CHECKING = False
+
+if TYPE_CHECKING:
+    import argparse
+    from collections.abc import Iterable, Iterator
+
+    from ._detect import UvUpgradeStrategy
+
+PROG = "detect-installer"
+
+# Exit statuses.
+EXIT_OK = 0
+EXIT_NOT_INSTALLED = 1
+EXIT_USAGE = 2
+EXIT_UNKNOWN_INSTALLER = 3
+
+_DESCRIPTION = """\
+Report how Python packages were installed and the command to upgrade them.
+
+With package names, prints one line per package: the name, the installer
+and the upgrade command. With --all, every installed distribution is
+reported, with its version after the name.
+"""
+
+_EPILOG = """\
+exit status:
+  0  every package was found and its installer detected
+  1  at least one package is not installed
+  2  usage error
+  3  at least one package was installed by an unknown installer
+"""
+
+_FORMATS = {"--json": "json", "--ndjson": "ndjson"}
+_UV_UPGRADE_STRATEGIES = ("add", "lock", "auto")
+
+
+class _Options:
+    __slots__ = (
+        "packages",
+        "all",
+        "format",
+        "environment",
+        "uv_upgrade_strategy",
+        "workers",
+    )
+
+    def __init__(self) -> None:
+        self.packages: list[str] = []
+        self.all = False
+        self.format = "text"
+        self.environment: str | None = None
+        self.uv_upgrade_strategy: UvUpgradeStrategy = "add"
+        self.workers = 0
+
+
+def _parse_fast(argv: list[str]) -> _Options | None:
+    """Parse the command line without argparse.
+
+    Returns None for anything unusual (--help, unknown options, invalid
+    values or combinations), which is then left to argparse to report.
+    """
+
+    options = _Options()
+    args = iter(argv)
+
+    for arg in args:
+        if arg == "--":
+            options.packages.extend(args)
+            break
+
+        if not arg.startswith("-") or arg == "-":
+            options.packages.append(arg)
+            continue
+
+        name, has_value, value = arg.partition("=")
+
+        if name in ("--all", *_FORMATS) and not has_value:
+            if name == "--all":
+                options.all = True
+            elif options.format != "text":
+                return None
+            else:
+                options.format = _FORMATS[name]
+            continue
+
+        if name not in ("--environment", "--uv-upgrade-strategy", "--workers"):
+            return None
+
+        if not has_value:
+            next_arg = next(args, None)
+            if next_arg is None:
+                return None
+            value = next_arg
+
+        if name == "--environment":
+            options.environment = value
+        elif name == "--uv-upgrade-strategy":
+            if value not in _UV_UPGRADE_STRATEGIES:
+                return None
+            options.uv_upgrade_strategy = value  # type: ignore[assignment]
+        else:
+            try:
+                options.workers = int(value)
+            except ValueError:
+                return None
+
+    if options.all == bool(options.packages):
+        return None
+
+    return options
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog=PROG,
+        description=_DESCRIPTION,
+        epilog=_EPILOG,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("packages", nargs="*", metavar="PACKAGE")
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="report every installed distribution instead of named packages",
+    )
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument(
+        "--json",
+        dest="format",
+        action="store_const",
+        const="json",
+        default="text",
+        help="print a JSON array of results",
+    )
+    output.add_argument(
+        "--ndjson",
+        dest="format",
+        action="store_const",
+        const="ndjson",
+        help="print one JSON object per line",
+    )
+    parser.add_argument(
+        "--environment",
+        metavar="PATH",
+        help="inspect the virtual environment or prefix at PATH",
+    )
+    parser.add_argument(
+        "--uv-upgrade-strategy",
+        choices=_UV_UPGRADE_STRATEGIES,
+        default="add",
+        help=(
+            "upgrade command to suggest for uv projects; auto picks add for "
+            "direct dependencies and lock for the others (default: add)"
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="with --all, read package metadata with this many threads",
+    )
+
+    return parser
+
+
+def _parse(argv: list[str]) -> _Options:
+    if (options := _parse_fast(argv)) is not None:
+        return options
+
+    # Either a help request or an error: argparse prints it and exits.
+    parser = _build_parser()
+    namespace = parser.parse_args(argv)
+
+    if namespace.all and namespace.packages:
+        parser.error("package names cannot be combined with --all")
+
+    if not namespace.all and not namespace.packages:
+        parser.error("give at least one package name, or --all")
+
+    options = _Options()
+
+    for name in _Options.__slots__:
+        setattr(options, name, getattr(namespace, name))
+
+    return options
+
+
+def _records(options: _Options) -> Iterator[dict[str, str | None]]:
+    if options.all:
+        from ._inventory import iter_environment
+
+        for name, version, info in iter_environment(
+            options.uv_upgrade_strategy,
+            environment=options.environment,
+            workers=options.workers,
+        ):
+            yield {
+                "name": name,
+                "version": version,
+                "installer": info.installer.value,
+                "upgrade_cmd": info.upgrade_cmd,
+            }
+
+        return
+
+    from ._detect import detect_installers
+
+    results = detect_installers(
+        options.packages,
+        options.uv_upgrade_strategy,
+        environment=options.environment,
+    )
+
+    for name, info in results.items():
+        yield {
+            "name": name,
+            "installer": info.installer.value if info else None,
+            "upgrade_cmd": info.upgrade_cmd if info else None,
+        }
+
+
+def _noting_installers(
+    records: Iterable[dict[str, str | None]], installers: set[str | None]
+) -> Iterator[dict[str, str | None]]:
+    """Pass the records through, adding their installer to installers."""
+
+    for record in records:
+        installers.add(record["installer"])
+        yield record
+
+
+def _exit_status(installers: set[str | None]) -> int:
+    if None in installers:
+        return EXIT_NOT_INSTALLED
+
+    if "unknown" in installers:
+        return EXIT_UNKNOWN_INSTALLER
+
+    return EXIT_OK
+
+
+def _write(options: _Options, records: Iterable[dict[str, str | None]]) -> None:
+    write = sys.stdout.write
+
+    if options.format == "text":
+        for record in records:
+            fields = [
+                record["name"] or "",
+                *([record["version"] or "-"] if options.all else []),
+                record["installer"] or "not-installed",
+                record["upgrade_cmd"] or "-",
+            ]
+            write("\t".join(fields) + "\n")
+
+        return
+
+    import json
+
+    if options.format == "json":
+        write(json.dumps(list(records), indent=2) + "\n")
+    else:
+        for record in records:
+            write(json.dumps(record) + "\n")
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the command and return its exit status."""
+
+    options = _parse(sys.argv[1:] if argv is None else argv)
+
+    if options.environment is not None and not os.path.isdir(options.environment):
+        sys.stderr.write(
+            f"{PROG}: error: environment not found: {options.environment}\n"
+        )
+        return EXIT_USAGE
+
+    # Streamed, so that only --json holds the inventory in memory; the exit
+    # status is known once every record has been written.
+    installers: set[str | None] = set()
+
+    try:
+        _write(options, _noting_installers(_records(options), installers))
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # The reader went away (e.g. `| head`): stop quietly, and keep the
+        # interpreter from failing again when it flushes stdout at exit.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return EXIT_OK
+
+    return _exit_status(installers)
@@ -1,14 +1,48 @@
 from __future__ import annotations
 
+import _thread
 import os
 import sys
-from dataclasses import dataclass
+from bisect import bisect_left
 from enum import Enum
-from importlib.metadata import Distribution, PackageNotFoundError, distribution
-from pathlib import Path
-from typing import Literal
+from functools import cache, partial
+from time import perf_counter_ns
 
-UvUpgradeStrategy = Literal["add", "lock"]
+# Keep `import detect_installer` cheap: typing, dataclasses, pathlib and
+# importlib.metadata each cost milliseconds to import, so they are either
+# only seen by type checkers or imported when a metadata read needs them.
+TYPE_CHECKING = False
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+    from typing import Any, ContextManager, Literal, NoReturn, TextIO, TypedDict
+
+    UvUpgradeStrategy = Literal["add", "lock", "auto"]
+    DetectionStrategy = Literal["fast", "thorough"]
+
+    class _DirectUrlBase(TypedDict):
+        url: str
+
+    class _DirectUrl(_DirectUrlBase, total=False):
+        """A PEP 610 direct_url.json; only url is checked when it is read."""
+
+        dir_info: dict[str, object]
+        vcs_info: dict[str, object]
+        subdirectory: object
+
+
+def __getattr__(name: str) -> object:
+    if name == "UvUpgradeStrategy":
+        from typing import Literal
+
+        return Literal["add", "lock", "auto"]
+
+    if name == "DetectionStrategy":
+        from typing import Literal
+
+        return Literal["fast", "thorough"]
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class Installer(str, Enum):
@@ -23,158 +57,2029 @@ class Installer(str, Enum):
     UNKNOWN = "unknown"
 
 
-@dataclass(frozen=True)
 class InstallerInfo:
+    """The detected installer and the command that upgrades the package.
+
+    strategy is the detection strategy that produced the result: "fast"
+    results are best-effort guesses made without touching the filesystem.
+
+    Instances are immutable and compare by value. The results of a
+    detection keep the package name and a shared per-installer template,
+    and only render upgrade_cmd the first time it is read.
+    """
+
+    __slots__ = ("installer", "strategy", "_template", "_package", "_upgrade_cmd")
+    __match_args__ = ("installer", "upgrade_cmd", "strategy")
+
     installer: Installer
-    upgrade_cmd: str | None
+    strategy: DetectionStrategy
+    _template: str | None
+    _package: str
+    _upgrade_cmd: str | None
+
+    def __init__(
+        self,
+        installer: Installer,
+        upgrade_cmd: str | None,
+        strategy: DetectionStrategy = "thorough",
+    ) -> None:
+        object.__setattr__(self, "installer", installer)
+        object.__setattr__(self, "strategy", strategy)
+        object.__setattr__(self, "_upgrade_cmd", upgrade_cmd)
+
+    @classmethod
+    def _from_template(
+        cls,
+        installer: Installer,
+        template: str | None,
+        package_name: str,
+        strategy: DetectionStrategy = "thorough",
+    ) -> InstallerInfo:
+        """Build a result whose upgrade_cmd is template.format(package_name)."""
+
+        self = cls.__new__(cls)
+        object.__setattr__(self, "installer", installer)
+        object.__setattr__(self, "strategy", strategy)
+        object.__setattr__(self, "_template", template)
+        object.__setattr__(self, "_package", package_name)
+
+        return self
+
+    @property
+    def upgrade_cmd(self) -> str | None:
+        try:
+            return self._upgrade_cmd
+        except AttributeError:
+            pass
+
+        template = self._template
+        command = None if template is None else template.format(self._package)
+        object.__setattr__(self, "_upgrade_cmd", command)
+
+        return command
+
+    def __setattr__(self, name: str, value: object) -> NoReturn:
+        raise AttributeError(f"cannot assign to field {name!r}")
+
+    def __delattr__(self, name: str) -> NoReturn:
+        raise AttributeError(f"cannot delete field {name!r}")
+
+    def __reduce__(self) -> tuple[object, ...]:
+        return InstallerInfo, (self.installer, self.upgrade_cmd, self.strategy)
+
+    def __repr__(self) -> str:
+        return (
+            f"InstallerInfo(installer={self.installer!r}, "
+            f"upgrade_cmd={self.upgrade_cmd!r}, strategy={self.strategy!r})"
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, InstallerInfo):
+            return NotImplemented
+
+        return (self.installer, self.upgrade_cmd, self.strategy) == (
+            other.installer,
+            other.upgrade_cmd,
+            other.strategy,
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.installer, self.upgrade_cmd, self.strategy))
+
+
+class _FilesystemCalls:
+    """Running count of the filesystem calls made by the detection code."""
+
+    __slots__ = ("stat", "scandir", "open")
+
+    def __init__(self) -> None:
+        self.stat = 0
+        self.scandir = 0
+        self.open = 0
+
+    def total(self) -> int:
+        return self.stat + self.scandir + self.open
+
+
+_fs_calls = _FilesystemCalls()
+
+# The caches whose hits and misses are counted for stats().
+_CACHE_LAYERS = ("memory", "in_flight", "disk", "dist_index", "conda_meta", "uv_lock")
+
+# Upper bounds of the detection latency histogram buckets, in nanoseconds.
+_LATENCY_BUCKETS_NS = (
+    10_000,
+    50_000,
+    100_000,
+    500_000,
+    1_000_000,
+    5_000_000,
+    10_000_000,
+    50_000_000,
+    100_000_000,
+    500_000_000,
+    1_000_000_000,
+)
+
+
+class _Counters:
+    """Process-wide activity counters, read by stats().
+
+    Updates are plain integer increments, cheap enough to leave on. Threads
+    racing on a free-threaded build may lose the odd update.
+    """
+
+    __slots__ = ("calls", "not_found", "cache", "latency")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.not_found = 0
+        # layer -> [hits, misses]
+        self.cache = {layer: [0, 0] for layer in _CACHE_LAYERS}
+        # branch -> [count per bucket..., count above the last bucket, sum_ns]
+        self.latency: dict[str, list[int]] = {}
+
+    def reset(self) -> None:
+        # In place: the lists are shared with the code that increments them.
+        self.calls = 0
+        self.not_found = 0
+
+        for counts in self.cache.values():
+            counts[:] = [0, 0]
+
+        self.latency.clear()
+
+
+_counters = _Counters()
+_memory_cache = _counters.cache["memory"]
+
+
+def _observe(branch: str, elapsed_ns: int) -> None:
+    """Record how long a detection that ended in the given branch took."""
+
+    if (counts := _counters.latency.get(branch)) is None:
+        counts = _counters.latency.setdefault(
+            branch, [0] * (len(_LATENCY_BUCKETS_NS) + 2)
+        )
+
+    counts[bisect_left(_LATENCY_BUCKETS_NS, elapsed_ns)] += 1
+    counts[-1] += elapsed_ns
+
+
+def _stat(path: str) -> os.stat_result:
+    _fs_calls.stat += 1
+    return os.stat(path)
+
+
+def _isdir(path: str) -> bool:
+    _fs_calls.stat += 1
+    return os.path.isdir(path)
+
+
+def _scandir(path: str) -> ContextManager[Iterator[os.DirEntry[str]]]:
+    _fs_calls.scandir += 1
+    return os.scandir(path)
+
+
+def _open_text(path: str, errors: str = "strict") -> TextIO:
+    _fs_calls.open += 1
+    return open(path, encoding="utf-8", errors=errors)
+
+
+def default_cache_dir() -> str:
+    """Return the detect-installer directory inside the XDG cache dir."""
+
+    if cache_home := os.environ.get("XDG_CACHE_HOME"):
+        return os.path.join(cache_home, "detect-installer")
+
+    return os.path.join(os.path.expanduser("~"), ".cache", "detect-installer")
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    """Replace a file with data, creating its directory; give up on OSError.
+
+    The data goes to a temporary file next to it that is then renamed over
+    it, so concurrent readers see either the old or the new content.
+    """
+
+    import tempfile
+
+    directory = os.path.dirname(path)
+
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    except OSError:
+        return
+
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+class _Environment:
+    """The interpreter state that the detection rules look at.
+
+    Usually that is the running interpreter (current()), but it can also be
+    another environment on disk, analysed without starting its interpreter
+    (from_prefix()).
+    """
+
+    __slots__ = (
+        "prefix",
+        "executable",
+        "path",
+        "conda_prefix",
+        "mamba_exe",
+        "uv_project_environment",
+        "homebrew_prefix",
+        "homebrew_cellar",
+    )
+
+    def __init__(
+        self,
+        prefix: str,
+        executable: str,
+        path: list[str],
+        conda_prefix: str = "",
+        mamba_exe: str = "",
+        uv_project_environment: str = "",
+        homebrew_prefix: str = "",
+        homebrew_cellar: str = "",
+    ) -> None:
+        self.prefix = prefix
+        self.executable = executable
+        self.path = path
+        self.conda_prefix = conda_prefix
+        self.mamba_exe = mamba_exe
+        self.uv_project_environment = uv_project_environment
+        self.homebrew_prefix = homebrew_prefix
+        self.homebrew_cellar = homebrew_cellar
+
+    @classmethod
+    def current(cls) -> _Environment:
+        return cls(
+            sys.prefix,
+            sys.executable,
+            sys.path,
+            os.environ.get("CONDA_PREFIX", ""),
+            os.environ.get("MAMBA_EXE", ""),
+            os.environ.get("UV_PROJECT_ENVIRONMENT", ""),
+            os.environ.get("HOMEBREW_PREFIX", ""),
+            os.environ.get("HOMEBREW_CELLAR", ""),
+        )
+
+    @classmethod
+    def from_prefix(cls, prefix: str | os.PathLike[str]) -> _Environment:
+        """Describe the environment installed at prefix by reading it from disk.
+
+        Handles virtual environments (pyvenv.cfg, including
+        include-system-site-packages) as well as plain and conda prefixes.
+        The result is memoized per prefix until clear_cache().
+        """
+
+        key = (
+            os.path.abspath(os.fspath(prefix)),
+            os.environ.get("MAMBA_EXE", ""),
+            os.environ.get("HOMEBREW_PREFIX", ""),
+            os.environ.get("HOMEBREW_CELLAR", ""),
+        )
+        env = _prefix_environments.get(key)
+
+        if env is None:
+            env = _prefix_environments[key] = cls._read_prefix(*key)
+
+        return env
+
+    @classmethod
+    def _read_prefix(
+        cls, prefix: str, mamba_exe: str, homebrew_prefix: str, homebrew_cellar: str
+    ) -> _Environment:
+        config = _read_pyvenv_cfg(prefix)
+        version = config.get("version_info") or config.get("version") or ""
+        path = _site_packages_dirs(prefix, version)
+
+        if os.name == "nt":
+            scripts = os.path.join(prefix, "Scripts")
+            executable = os.path.join(
+                scripts if _isdir(scripts) else prefix, "python.exe"
+            )
+        else:
+            executable = os.path.join(prefix, "bin", "python")
+
+        if config.get("include-system-site-packages", "").lower() == "true" and (
+            home := config.get("home")
+        ):
+            # home is the directory of the base interpreter: the prefix itself
+            # on Windows, its bin directory elsewhere.
+            base = home if os.name == "nt" else os.path.dirname(home)
+            path.extend(_site_packages_dirs(base, version))
+
+        conda_meta = os.path.join(prefix, "conda-meta")
+
+        return cls(
+            prefix,
+            executable,
+            path,
+            prefix if _isdir(conda_meta) else "",
+            mamba_exe,
+            homebrew_prefix=homebrew_prefix,
+            homebrew_cellar=homebrew_cellar,
+        )
+
+    def fingerprint(self) -> tuple[object, ...]:
+        return (
+            self.prefix,
+            self.executable,
+            self.conda_prefix,
+            self.mamba_exe,
+            self.uv_project_environment,
+            self.homebrew_prefix,
+            self.homebrew_cellar,
+            tuple(self.path),
+        )
+
+
+# Environments read by from_prefix(), keyed by their absolute prefix and the
+# environment variables they copy. Reset by clear_cache().
+_prefix_environments: dict[tuple[str, str, str, str], _Environment] = {}
+
+
+def _read_pyvenv_cfg(prefix: str) -> dict[str, str]:
+    """Parse <prefix>/pyvenv.cfg into a dict; empty if there is none."""
+
+    config: dict[str, str] = {}
+
+    try:
+        with _open_text(os.path.join(prefix, "pyvenv.cfg")) as f:
+            for line in f:
+                key, sep, value = line.partition("=")
+                if sep:
+                    config[key.strip().lower()] = value.strip()
+    except OSError:
+        pass
+
+    return config
+
+
+def _site_packages_dirs(prefix: str, version: str) -> list[str]:
+    """Return the site-packages directories of a prefix.
+
+    Prefers the lib/pythonX.Y directory matching version when it is known.
+    """
+
+    windows_site = os.path.join(prefix, "Lib", "site-packages")
+
+    if os.name == "nt" and _isdir(windows_site):
+        return [windows_site]
+
+    lib = os.path.join(prefix, "lib")
+
+    try:
+        with _scandir(lib) as entries:
+            candidates = sorted(
+                entry.name for entry in entries if entry.name.startswith("python")
+            )
+    except OSError:
+        return []
+
+    wanted = "python" + ".".join(version.split(".")[:2])
+    candidates.sort(key=lambda name: name.rstrip("t") != wanted)
+
+    return [
+        site_packages
+        for name in candidates
+        if _isdir(site_packages := os.path.join(lib, name, "site-packages"))
+    ]
+
+
+# Path markers, in the order detect_installer gives them precedence.
+_PIPX = 1
+_UV_TOOL = 2
+_CONDA = 4
+_BREW = 8
+
+_MARKER_BITS = {"pipx": _PIPX, "uv_tool": _UV_TOOL, "conda": _CONDA, "brew": _BREW}
+
+
+class _PathClassifier:
+    """Find every installer marker in a prefix and executable in one scan.
+
+    Backslashes are turned into slashes once, then a single precompiled
+    pattern matches all the prefix markers (pipx and uv tool venvs, conda
+    distribution directories) and another the Homebrew executable locations.
+    The slashes around markers are matched by lookarounds so that adjacent
+    markers never hide each other. The patterns are compiled on first use
+    to keep `re` out of `import detect_installer`.
+    """
 
+    __slots__ = ("_prefix_pattern", "_executable_pattern")
 
-def _is_pipx_environment() -> bool:
-    """Check whether the current environment is inside a pipx-managed venv."""
+    def __init__(self) -> None:
+        import re
 
-    return "pipx/venvs" in sys.prefix or "pipx\\venvs" in sys.prefix
+        self._prefix_pattern = re.compile(
+            r"(?P<pipx>pipx/venvs)"
+            r"|(?P<uv_tool>(?<=/)uv/tools(?=/))"
+            r"|(?<![^/])(?P<conda>(?i:conda|miniconda|miniforge|mambaforge))"
+        )
+        self._executable_pattern = re.compile(
+            r"(?<=/)(?P<brew>(?i:opt/homebrew|usr/local/cellar|home/linuxbrew))(?=/)"
+        )
+
+    def prefix_markers(self, prefix: str) -> int:
+        """Return the _PIPX, _UV_TOOL and _CONDA bits found in a prefix."""
+
+        markers = 0
+
+        for match in self._prefix_pattern.finditer(prefix.replace("\\", "/")):
+            # Every alternative is a named group, so lastgroup is always set.
+            if (group := match.lastgroup) is not None:
+                markers |= _MARKER_BITS[group]
+
+        return markers
+
+    def executable_markers(self, executable: str) -> int:
+        """Return the _BREW bit if the executable lives under Homebrew."""
+
+        if self._executable_pattern.search(executable.replace("\\", "/")):
+            return _BREW
+
+        return 0
+
+    def markers(self, env: _Environment) -> int:
+        return self.prefix_markers(env.prefix) | self.executable_markers(env.executable)
+
+
+_path_classifier: _PathClassifier | None = None
+
+
+def _get_path_classifier() -> _PathClassifier:
+    global _path_classifier
+
+    if _path_classifier is None:
+        _path_classifier = _PathClassifier()
+
+    return _path_classifier
 
 
-def _is_uv_tool_environment() -> bool:
-    """Check whether the current environment is inside a uv tool-managed venv."""
+def _is_pipx_environment(env: _Environment) -> bool:
+    """Check whether the environment is inside a pipx-managed venv."""
 
-    return "/uv/tools/" in sys.prefix or "\\uv\\tools\\" in sys.prefix
+    return bool(_get_path_classifier().prefix_markers(env.prefix) & _PIPX)
 
 
-def _detect_conda_variant() -> Installer:
+def _is_uv_tool_environment(env: _Environment) -> bool:
+    """Check whether the environment is inside a uv tool-managed venv."""
+
+    return bool(_get_path_classifier().prefix_markers(env.prefix) & _UV_TOOL)
+
+
+def _detect_conda_variant(env: _Environment) -> Installer:
     """Return MAMBA if the Mamba executable is configured, otherwise CONDA."""
 
-    return Installer.MAMBA if os.environ.get("MAMBA_EXE") else Installer.CONDA
+    return Installer.MAMBA if env.mamba_exe else Installer.CONDA
+
+
+def _is_active_conda_environment(env: _Environment) -> bool:
+    conda_prefix = env.conda_prefix
+
+    return bool(conda_prefix) and os.path.normcase(env.prefix).startswith(
+        os.path.normcase(conda_prefix)
+    )
 
 
-def _detect_conda_environment() -> Installer | None:
-    """Detect whether the current environment is a Conda (or Mamba) environment.
+def _detect_conda_environment(env: _Environment) -> Installer | None:
+    """Detect whether the environment is a Conda (or Mamba) environment.
 
     Checks in two ways:
-    - CONDA_PREFIX env var being set (i.e. a conda env is activated)
-    - sys.prefix path containing a known conda distribution directory name
+    - CONDA_PREFIX env var being set (i.e. a conda env is activated), or a
+      conda-meta directory for environments read from disk
+    - the prefix path containing a known conda distribution directory name
 
     Returns the installer, or None if not a conda environment.
     """
 
-    conda_prefix = os.environ.get("CONDA_PREFIX", "")
-    if conda_prefix and os.path.normcase(sys.prefix).startswith(
-        os.path.normcase(conda_prefix)
+    if _is_active_conda_environment(env) or (
+        _get_path_classifier().prefix_markers(env.prefix) & _CONDA
     ):
-        return _detect_conda_variant()
+        return _detect_conda_variant(env)
+
+    return None
 
-    prefix_lower = sys.prefix.lower()
-    parts = prefix_lower.replace("\\", "/").split("/")
-    conda_prefixes = ("conda", "miniconda", "miniforge", "mambaforge")
 
-    if any(part.startswith(conda_prefixes) for part in parts):
-        return _detect_conda_variant()
+_realpaths: dict[str, str] = {}
 
-    return None
 
+def _realpath(path: str) -> str:
+    """Resolve the symlinks in path, once per process (reset by clear_cache())."""
+
+    try:
+        return _realpaths[path]
+    except KeyError:
+        pass
+
+    _fs_calls.stat += 1
+    result = _realpaths[path] = os.path.realpath(path)
+
+    return result
+
+
+def _homebrew_roots(env: _Environment) -> tuple[str, ...]:
+    return tuple(
+        root.rstrip(os.sep) + os.sep
+        for root in (env.homebrew_prefix, env.homebrew_cellar)
+        if root
+    )
+
+
+def _is_brew_environment(env: _Environment, resolve_symlinks: bool = True) -> bool:
+    """Check whether the Python executable lives under a Homebrew prefix.
+
+    Besides the default Homebrew locations, HOMEBREW_PREFIX and
+    HOMEBREW_CELLAR are honoured. With resolve_symlinks the resolved
+    executable is checked too, which catches e.g. a python3 linked into a
+    Homebrew prefix from elsewhere.
+    """
+
+    classifier = _get_path_classifier()
+    roots = _homebrew_roots(env)
+    executables = [env.executable]
+
+    if resolve_symlinks:
+        executables.append(_realpath(env.executable))
 
-def _is_brew_environment() -> bool:
-    """Check whether the Python executable lives under a Homebrew prefix."""
-    exe = sys.executable.lower()
     return any(
-        p in exe for p in ("/opt/homebrew/", "/usr/local/cellar/", "/home/linuxbrew/")
+        classifier.executable_markers(executable) or executable.startswith(roots)
+        for executable in executables
     )
 
 
-def _get_installer_metadata(dist: Distribution) -> str | None:
-    """Read the INSTALLER metadata file from a distribution, if present."""
+# Homebrew kegs (<cellar>/<formula>/<version>) mapped to whether they have
+# an INSTALL_RECEIPT.json, i.e. were installed by brew. Each keg is checked
+# once per process (reset by clear_cache()).
+_brew_kegs: dict[str, bool] = {}
+
+
+def _brew_keg(path: str, env: _Environment) -> str | None:
+    """Return the keg directory a resolved path lies in, if any."""
+
+    cellars = [env.homebrew_cellar]
+
+    if env.homebrew_prefix:
+        cellars.append(os.path.join(env.homebrew_prefix, "Cellar"))
+
+    for cellar in filter(None, cellars):
+        cellar = cellar.rstrip(os.sep) + os.sep
+
+        if path.startswith(cellar):
+            parts = path[len(cellar) :].split(os.sep)
+            return cellar + os.path.join(*parts[:2]) if len(parts) > 2 else None
+
+    # Default and custom prefixes alike keep their kegs under a Cellar.
+    parts = path.split(os.sep)
 
-    if (value := dist.read_text("INSTALLER")) is None:
+    for index, part in enumerate(parts):
+        if part == "Cellar" and len(parts) > index + 3:
+            return os.sep.join(parts[: index + 3])
+
+    return None
+
+
+def _brew_formula(dist_path: str, env: _Environment) -> str | None:
+    """Return the Homebrew formula that installed a distribution, if any.
+
+    brew links a formula's site-packages entries from its keg, so the
+    metadata directory of a formula-owned package resolves into
+    <cellar>/<formula>/<version>. Packages pip-installed into Homebrew's
+    Python are plain directories and belong to no formula, and neither do
+    those in the interpreter's own keg, which is where pip installs when
+    site-packages is not linked out of it.
+    """
+
+    keg = _brew_keg(_realpath(dist_path), env)
+
+    if keg is None or keg == _brew_keg(_realpath(env.prefix) + os.sep, env):
         return None
 
-    value = value.strip().lower()
+    try:
+        owned = _brew_kegs[keg]
+    except KeyError:
+        try:
+            _stat(os.path.join(keg, "INSTALL_RECEIPT.json"))
+            owned = True
+        except OSError:
+            owned = False
 
-    return value if value else None
+        _brew_kegs[keg] = owned
 
+    return os.path.basename(os.path.dirname(keg)) if owned else None
 
-def _has_uv_lock(max_depth: int = 3) -> bool:
-    """Check whether a uv.lock file exists in a parent directory of sys.prefix."""
 
-    parent = Path(sys.prefix)
+def _installer_for_markers(markers: int, conda: Installer | None) -> Installer | None:
+    """Pick the installer a set of path markers stands for.
 
-    for _ in range(max_depth):
-        parent = parent.parent
+    conda is the installer to report for conda markers, or for an activated
+    conda environment when given without them.
+    """
 
-        if (parent / "uv.lock").exists():
-            return True
+    if markers & _PIPX:
+        return Installer.PIPX
 
-    return False
+    if markers & _UV_TOOL:
+        return Installer.UV_TOOL
 
+    if conda is not None:
+        return conda
 
-def _get_upgrade_cmd(
-    installer: Installer,
-    package_name: str,
-    uv_upgrade_strategy: UvUpgradeStrategy = "add",
-) -> str | None:
-    """Return the shell command to upgrade a package for the given installer."""
+    if markers & _BREW:
+        return Installer.BREW
+
+    return None
 
-    if installer == Installer.UV:
-        if uv_upgrade_strategy == "lock":
-            return f"uv lock --upgrade-package {package_name}"
 
-        return f"uv add {package_name} --upgrade-package {package_name}"
+def classify_prefixes(
+    paths: Iterable[str | os.PathLike[str]],
+) -> list[Installer | None]:
+    """Classify environment prefixes by the installer their location implies.
 
-    commands: dict[Installer, str] = {
-        Installer.PIP: f"pip install -U {package_name}",
-        Installer.UV_PIP: f"uv pip install --upgrade {package_name}",
-        Installer.UV_TOOL: f"uv tool upgrade {package_name}",
-        Installer.PIPX: f"pipx upgrade {package_name}",
-        Installer.BREW: f"brew upgrade {package_name}",
-        Installer.CONDA: f"conda update {package_name}",
-        Installer.MAMBA: f"mamba update {package_name}",
-    }
+    This applies the path checks of detect_installer (pipx venv, uv tool
+    venv, conda distribution directory, Homebrew), with the same precedence,
+    to each path and returns the results in order; None means the path
+    itself says nothing and the packages' INSTALLER metadata would decide.
 
-    return commands.get(installer)
+    Only the strings are looked at: the filesystem is not touched and
+    environment variables such as CONDA_PREFIX and MAMBA_EXE are ignored,
+    so conda prefixes are reported as Installer.CONDA. Repeated paths are
+    classified once.
+    """
 
+    classifier = _get_path_classifier()
+    seen: dict[str, Installer | None] = {}
+    results = []
 
-def detect_installer(
-    package_name: str,
-    uv_upgrade_strategy: UvUpgradeStrategy = "add",
-) -> InstallerInfo | None:
-    """Detect which installer was used to install the given package.
+    for path in paths:
+        path = os.fspath(path)
 
-    Returns None if the package is not installed.
+        try:
+            results.append(seen[path])
+            continue
+        except KeyError:
+            pass
+
+        # Homebrew markers are directories, so any executable inside the
+        # prefix matches them exactly when prefix + "/" does.
+        markers = classifier.prefix_markers(path) | classifier.executable_markers(
+            path + "/"
+        )
+        installer = seen[path] = _installer_for_markers(
+            markers, Installer.CONDA if markers & _CONDA else None
+        )
+        results.append(installer)
+
+    return results
+
+
+# Upper bounds on what is read from each metadata file. INSTALLER holds a
+# tool name; direct_url.json a URL and a few small fields.
+_MAX_INSTALLER_BYTES = 1024
+_MAX_DIRECT_URL_BYTES = 64 * 1024
+
+_O_RDONLY = os.O_RDONLY | getattr(os, "O_BINARY", 0) | getattr(os, "O_CLOEXEC", 0)
+
+
+class _DistInfo:
+    """What the installer detection reads from a metadata directory.
+
+    installer is the lowercased INSTALLER value, requested tells whether a
+    REQUESTED file exists (the package was asked for, not pulled in as a
+    dependency) and direct_url is the parsed PEP 610 direct_url.json.
     """
 
-    def _result(installer: Installer) -> InstallerInfo:
-        return InstallerInfo(
-            installer,
-            _get_upgrade_cmd(installer, package_name, uv_upgrade_strategy),
+    __slots__ = ("path", "installer", "requested", "direct_url")
+
+    def __init__(
+        self,
+        path: str,
+        installer: str | None = None,
+        requested: bool = False,
+        direct_url: _DirectUrl | None = None,
+    ) -> None:
+        self.path = path
+        self.installer = installer
+        self.requested = requested
+        self.direct_url = direct_url
+
+    def __repr__(self) -> str:
+        return (
+            f"_DistInfo({self.path!r}, installer={self.installer!r}, "
+            f"requested={self.requested!r}, direct_url={self.direct_url!r})"
         )
 
+
+def _read_file(path: str, limit: int) -> bytes | None:
+    """Return at most limit bytes of a file, or None if it cannot be read."""
+
+    _fs_calls.open += 1
+
+    try:
+        fd = os.open(path, _O_RDONLY)
+    except OSError:
+        return None
+
     try:
-        dist = distribution(package_name)
-    except PackageNotFoundError:
+        return os.read(fd, limit)
+    except OSError:
         return None
+    finally:
+        os.close(fd)
+
+
+def _parse_direct_url(data: bytes) -> _DirectUrl | None:
+    import json
 
-    # Step 2: filesystem / environment checks
-    if _is_pipx_environment():
-        return _result(Installer.PIPX)
+    try:
+        value = json.loads(data)
+    except ValueError:
+        return None
 
-    if _is_uv_tool_environment():
-        return _result(Installer.UV_TOOL)
+    if not isinstance(value, dict) or not isinstance(value.get("url"), str):
+        return None
 
-    if conda_result := _detect_conda_environment():
-        return _result(conda_result)
+    return value
 
-    if _is_brew_environment():
-        return _result(Installer.BREW)
 
-    # Step 3: INSTALLER metadata
-    metadata_value = _get_installer_metadata(dist)
+def _read_dist_info(path: str) -> _DistInfo:
+    """Read the installer-related files of a *.dist-info / *.egg-info path.
+
+    The directory is listed once and only the files it contains are opened:
+    REQUESTED only needs to exist, and direct_url.json is parsed only when
+    present.
+    """
+
+    dist = _DistInfo(path)
+
+    try:
+        with _scandir(path) as entries:
+            names = {entry.name for entry in entries}
+    except OSError:
+        return dist
+
+    if "INSTALLER" in names and (
+        data := _read_file(os.path.join(path, "INSTALLER"), _MAX_INSTALLER_BYTES)
+    ):
+        dist.installer = data.decode("utf-8", "replace").strip().lower() or None
+
+    dist.requested = "REQUESTED" in names
+
+    if "direct_url.json" in names and (
+        data := _read_file(os.path.join(path, "direct_url.json"), _MAX_DIRECT_URL_BYTES)
+    ):
+        dist.direct_url = _parse_direct_url(data)
+
+    return dist
+
+
+# Per-process memo of everything the uv project resolver learns about a
+# directory, so that no directory is examined twice (each stat is a network
+# round trip on NFS). Reset by clear_cache().
+_uv_project_dirs: dict[str, bool] = {}
+_devices: dict[str, int | None] = {}
+_uv_project_searches: dict[tuple[str, bool], tuple[str | None, list[str]]] = {}
+
+
+def _device(directory: str) -> int | None:
+    """Return the st_dev of a directory, or None if it cannot be read."""
+
+    try:
+        return _devices[directory]
+    except KeyError:
+        pass
+
+    try:
+        device = _stat(directory).st_dev
+    except OSError:
+        device = None
+
+    _devices[directory] = device
+
+    return device
+
+
+def _is_uv_table_header(line: str) -> bool:
+    """Check whether a TOML line opens [tool.uv], [tool.uv.*] or [[tool.uv.*]]."""
+
+    line = line.strip()
+
+    if not line.startswith("["):
+        return False
+
+    name = line.lstrip("[").partition("]")[0].strip()
+
+    return name == "tool.uv" or name.startswith("tool.uv.")
+
+
+def _pyproject_uses_uv(path: str) -> bool:
+    """Check whether a pyproject.toml has a [tool.uv] (or [tool.uv.*]) table."""
+
+    try:
+        with _open_text(path, errors="replace") as f:
+            return any(_is_uv_table_header(line) for line in f)
+    except OSError:
+        return False
+
 
-    if metadata_value == "uv":
-        if _has_uv_lock():
-            return _result(Installer.UV)
-        return _result(Installer.UV_PIP)
+def _is_uv_project_dir(directory: str) -> bool:
+    """Check whether a directory has a uv.lock or a pyproject.toml using uv."""
 
-    if metadata_value == "pip":
-        return _result(Installer.PIP)
+    try:
+        return _uv_project_dirs[directory]
+    except KeyError:
+        pass
+
+    names: set[str] = set()
+
+    try:
+        with _scandir(directory) as entries:
+            names = {
+                entry.name
+                for entry in entries
+                if entry.name in ("uv.lock", "pyproject.toml")
+            }
+    except OSError:
+        pass
+
+    result = "uv.lock" in names or (
+        "pyproject.toml" in names
+        and _pyproject_uses_uv(os.path.join(directory, "pyproject.toml"))
+    )
+    _uv_project_dirs[directory] = result
+
+    return result
+
+
+def _search_uv_project(
+    start: str, include_start: bool = False
+) -> tuple[str | None, list[str]]:
+    """Walk up from start looking for a uv project root.
+
+    The walk stops at the first project root or when it would cross onto a
+    different filesystem. Returns the root (or None) and the directories
+    that were examined.
+    """
+
+    key = (start, include_start)
+
+    try:
+        return _uv_project_searches[key]
+    except KeyError:
+        pass
+
+    visited: list[str] = []
+    root = None
+    directory = start
+    device = _device(start)
+
+    if include_start:
+        visited.append(start)
+        if _is_uv_project_dir(start):
+            root = start
+
+    while root is None:
+        parent = os.path.dirname(directory)
+
+        if parent == directory or _device(parent) != device:
+            break
+
+        visited.append(parent)
+
+        if _is_uv_project_dir(parent):
+            root = parent
+
+        directory = parent
+
+    result = _uv_project_searches[key] = (root, visited)
+
+    return result
+
+
+def _uv_project_search_start(env: _Environment) -> tuple[str, bool]:
+    """Return where to start looking for the uv project owning the prefix.
+
+    Honours UV_PROJECT_ENVIRONMENT: when it points at the running
+    environment, the project is found from the working directory (absolute
+    value) or from the directory the relative value is anchored at.
+    """
+
+    if not (project_env := env.uv_project_environment):
+        return env.prefix, False
+
+    prefix = os.path.normcase(os.path.normpath(env.prefix))
+
+    if os.path.isabs(project_env):
+        if os.path.normcase(os.path.normpath(project_env)) == prefix:
+            return os.getcwd(), True
+
+        return env.prefix, False
+
+    root = env.prefix
+
+    for _ in os.path.normpath(project_env).split(os.sep):
+        root = os.path.dirname(root)
+
+    if os.path.normcase(os.path.normpath(os.path.join(root, project_env))) == prefix:
+        return root, True
+
+    return env.prefix, False
+
+
+def _uv_project_search_dirs(env: _Environment) -> list[str]:
+    """Return the directories examined to find the uv project of the prefix."""
+
+    return _search_uv_project(*_uv_project_search_start(env))[1]
+
+
+def _uv_project_root(env: _Environment) -> str | None:
+    """Return the root of the uv project the prefix is the environment of."""
+
+    return _search_uv_project(*_uv_project_search_start(env))[0]
+
+
+# The dependency arrays of a pyproject.toml: (table, key) pairs, and tables
+# in which every key is one.
+_DEPENDENCY_KEYS = {("project", "dependencies"), ("tool.uv", "dev-dependencies")}
+_DEPENDENCY_TABLES = ("project.optional-dependencies", "dependency-groups")
+
+# Per-file memos validated by st_mtime_ns, so that a long-running process
+# sees edits while a batch reads each file once. Reset by clear_cache().
+_pyproject_dependencies: dict[str, tuple[int, frozenset[str]]] = {}
+_uv_lock_scans: dict[str, _UvLockScan] = {}
+
+
+def _mtime(path: str) -> int | None:
+    try:
+        return _stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _strip_toml_comment(line: str) -> str:
+    """Drop the comment from a TOML line, leaving "#" inside strings alone."""
+
+    if "#" not in line:
+        return line
+
+    quote = ""
+    escaped = False
+
+    for i, char in enumerate(line):
+        if quote:
+            if escaped:
+                escaped = False
+            elif char == "\\" and quote == '"':
+                escaped = True
+            elif char == quote:
+                quote = ""
+        elif char in "\"'":
+            quote = char
+        elif char == "#":
+            return line[:i]
+
+    return line
+
+
+def _read_pyproject_dependencies(path: str) -> frozenset[str]:
+    """Return the normalized names of a pyproject.toml's direct dependencies.
+
+    A line scanner rather than a TOML parser: tomllib is not available on
+    every supported Python, and only the requirement strings are needed.
+    """
+
+    import re
+
+    string = re.compile(r"""(=\s*)?(?:"([^"]*)"|'([^']*)')""")
+    requirement = re.compile(r"\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+    names: set[str] = set()
+    table = ""
+    depth = 0
+
+    try:
+        with _open_text(path, errors="replace") as f:
+            for line in f:
+                line = _strip_toml_comment(line)
+
+                if depth == 0:
+                    stripped = line.strip()
+
+                    if stripped.startswith("["):
+                        table = stripped.strip("[] \t")
+                        continue
+
+                    key, has_value, line = stripped.partition("=")
+                    key = key.strip().strip("\"'")
+
+                    if not has_value or (
+                        (table, key) not in _DEPENDENCY_KEYS
+                        and table not in _DEPENDENCY_TABLES
+                    ):
+                        continue
+
+                for match in string.finditer(line):
+                    # Strings after an "=" are inline table values, such
+                    # as the group in {include-group = "dev"}.
+                    if match[1] is None and (
+                        name := requirement.match(match[2] or match[3] or "")
+                    ):
+                        names.add(_normalize_name(name[1]))
+
+                # Brackets in strings are extras, not arrays.
+                unquoted = string.sub("", line)
+                depth = max(depth + unquoted.count("[") - unquoted.count("]"), 0)
+    except OSError:
+        pass
+
+    return frozenset(names)
+
+
+def _direct_dependencies(project_root: str) -> frozenset[str]:
+    path = os.path.join(project_root, "pyproject.toml")
+    mtime = _mtime(path)
+
+    if mtime is None:
+        return frozenset()
+
+    cached = _pyproject_dependencies.get(path)
+
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    names = _read_pyproject_dependencies(path)
+    _pyproject_dependencies[path] = (mtime, names)
+
+    return names
+
+
+class _UvLockScan:
+    """A uv.lock read up to the last [[package]] entry anyone asked for.
+
+    Lockfiles of large workspaces run to megabytes, so the file is read
+    line by line and only as far as needed; a later lookup of a package not
+    seen yet resumes where the previous one stopped. Threads take turns, so
+    the file is never read twice.
+    """
+
+    __slots__ = ("mtime", "offset", "names", "complete", "lock")
+
+    def __init__(self, mtime: int) -> None:
+        self.mtime = mtime
+        self.offset = 0
+        self.names: set[str] = set()
+        self.complete = False
+        self.lock = _thread.allocate_lock()
+
+    def locks(self, path: str, name: str) -> bool:
+        if name in self.names or self.complete:
+            _counters.cache["uv_lock"][0] += 1
+            return name in self.names
+
+        _counters.cache["uv_lock"][1] += 1
+
+        with self.lock:
+            return self._scan(path, name)
+
+    def _scan(self, path: str, name: str) -> bool:
+        if name in self.names or self.complete:
+            return name in self.names
+
+        try:
+            _fs_calls.open += 1
+            with open(path, "rb") as f:
+                f.seek(self.offset)
+                in_package = False
+
+                while line := f.readline():
+                    if line.startswith(b"["):
+                        in_package = line.rstrip() == b"[[package]]"
+                    elif in_package and line.startswith(b"name = "):
+                        in_package = False
+                        locked = _normalize_name(
+                            line[7:].strip().strip(b'"').decode("utf-8", "replace")
+                        )
+                        self.names.add(locked)
+
+                        if locked == name:
+                            # Resume after this line: the entry's other
+                            # fields do not start a [[package]].
+                            self.offset = f.tell()
+                            return True
+        except OSError:
+            pass
+
+        self.complete = True
+
+        return False
+
+
+def _uv_lock_locks(project_root: str, name: str) -> bool:
+    """Check whether a uv.lock has a [[package]] entry for name."""
+
+    path = os.path.join(project_root, "uv.lock")
+
+    if (mtime := _mtime(path)) is None:
+        return False
+
+    scan = _uv_lock_scans.get(path)
+
+    if scan is None or scan.mtime != mtime:
+        scan = _uv_lock_scans[path] = _UvLockScan(mtime)
+
+    return scan.locks(path, name)
+
+
+def _resolve_uv_upgrade_strategy(
+    uv_upgrade_strategy: UvUpgradeStrategy, project_root: str, package_name: str
+) -> UvUpgradeStrategy:
+    """Turn the "auto" strategy into "add" or "lock" for a package.
+
+    Direct dependencies, listed in pyproject.toml, are upgraded with
+    `uv add`. Transitive ones only appear in uv.lock, and `uv lock` upgrades
+    them without promoting them to direct dependencies. Packages in neither
+    get `uv add`.
+    """
+
+    if uv_upgrade_strategy != "auto":
+        return uv_upgrade_strategy
+
+    name = _normalize_name(package_name)
+
+    if name in _direct_dependencies(project_root):
+        return "add"
+
+    return "lock" if _uv_lock_locks(project_root, name) else "add"
+
+
+def _get_upgrade_cmd(
+    installer: Installer,
+    package_name: str,
+    uv_upgrade_strategy: UvUpgradeStrategy = "add",
+    direct_url: _DirectUrl | None = None,
+) -> str | None:
+    """Return the shell command to upgrade a package for the given installer.
+
+    direct_url is the package's PEP 610 direct_url.json: editable and VCS
+    installs made with pip or uv pip are upgraded from their source rather
+    than replaced by the release on the index.
+    """
+
+    if direct_url is not None and installer in (Installer.PIP, Installer.UV_PIP):
+        if command := _get_direct_url_upgrade_cmd(installer, package_name, direct_url):
+            return command
+
+    if (template := _upgrade_template(installer, uv_upgrade_strategy)) is None:
+        return None
+
+    return template.format(package_name)
+
+
+# The upgrade command of each installer, with {0} standing for the package.
+_UPGRADE_TEMPLATES: dict[Installer, str] = {
+    Installer.PIP: "pip install -U {0}",
+    Installer.UV_PIP: "uv pip install --upgrade {0}",
+    Installer.UV_TOOL: "uv tool upgrade {0}",
+    Installer.PIPX: "pipx upgrade {0}",
+    Installer.BREW: "brew upgrade {0}",
+    Installer.CONDA: "conda update {0}",
+    Installer.MAMBA: "mamba update {0}",
+}
+_UV_LOCK_TEMPLATE = "uv lock --upgrade-package {0}"
+_UV_ADD_TEMPLATE = "uv add {0} --upgrade-package {0}"
+
+
+def _upgrade_template(
+    installer: Installer, uv_upgrade_strategy: UvUpgradeStrategy = "add"
+) -> str | None:
+    if installer is Installer.UV:
+        return _UV_LOCK_TEMPLATE if uv_upgrade_strategy == "lock" else _UV_ADD_TEMPLATE
+
+    return _UPGRADE_TEMPLATES.get(installer)
+
+
+def _info(
+    installer: Installer,
+    package_name: str,
+    uv_upgrade_strategy: UvUpgradeStrategy = "add",
+    strategy: DetectionStrategy = "thorough",
+) -> InstallerInfo:
+    """Return a result whose upgrade command is rendered on first access."""
+
+    return InstallerInfo._from_template(
+        installer,
+        _upgrade_template(installer, uv_upgrade_strategy),
+        package_name,
+        strategy,
+    )
+
+
+# Results that do not depend on the package are shared.
+_UNKNOWN = InstallerInfo(Installer.UNKNOWN, None)
+_UNKNOWN_FAST = InstallerInfo(Installer.UNKNOWN, None, "fast")
+
+
+def _get_direct_url_upgrade_cmd(
+    installer: Installer, package_name: str, direct_url: _DirectUrl
+) -> str | None:
+    from shlex import quote
+
+    install = (
+        "pip install -U" if installer == Installer.PIP else ("uv pip install --upgrade")
+    )
+    url = direct_url["url"]
+    dir_info = direct_url.get("dir_info")
+    vcs_info = direct_url.get("vcs_info")
+
+    if isinstance(dir_info, dict) and dir_info.get("editable") is True:
+        return f"{install} -e {quote(_file_url_to_path(url))}"
+
+    if isinstance(vcs_info, dict) and isinstance(vcs := vcs_info.get("vcs"), str):
+        url = f"{vcs}+{url}"
+
+        if isinstance(revision := vcs_info.get("requested_revision"), str):
+            url += f"@{revision}"
+
+        if isinstance(subdirectory := direct_url.get("subdirectory"), str):
+            url += f"#subdirectory={subdirectory}"
+
+        return f"{install} {quote(f'{package_name} @ {url}')}"
+
+    return None
+
+
+def _file_url_to_path(url: str) -> str:
+    """Turn a file:// URL into a local path; other URLs are returned as is."""
+
+    from urllib.parse import unquote, urlsplit
+
+    parts = urlsplit(url)
+
+    if parts.scheme != "file":
+        return url
+
+    path = unquote(parts.path)
+
+    if os.name == "nt":
+        if parts.netloc and parts.netloc != "localhost":
+            path = f"//{parts.netloc}{path}"
+        elif path[:1] == "/" and path[2:3] == ":":
+            path = path[1:]
+
+        return os.path.normpath(path)
+
+    return path
+
+
+_cache: dict[tuple[object, ...], InstallerInfo | None] = {}
+
+# Tells a cache miss from a memoized None; typed as Any so that a hit
+# narrows to the cached value.
+_MISSING: Any = object()
+
+
+class _InFlight:
+    """A detection that one thread runs and others wait for.
+
+    The lock is held until the result is settled, so waiting is acquiring
+    it. Built on _thread rather than threading, which `import
+    detect_installer` would otherwise have to import.
+
+    Only Exception instances are raised again in the waiters. When the
+    running thread was interrupted (KeyboardInterrupt, SystemExit...),
+    wait() returns _MISSING and the waiters must claim the key again.
+    """
+
+    __slots__ = ("_done", "result", "error")
+
+    def __init__(self, result: InstallerInfo | None = None) -> None:
+        self._done = _thread.allocate_lock()
+        self.result = result
+        self.error: Exception | None = None
+
+    def wait(self) -> InstallerInfo | None:
+        with self._done:
+            pass
+
+        if self.error is not None:
+            raise self.error
+
+        return self.result
+
+
+# Detections running now, by _cache key, so that threads asking for the
+# same package wait for one probe instead of each running their own. The
+# lock is only taken on cache misses; hits are a plain dict lookup.
+_in_flight: dict[tuple[object, ...], _InFlight] = {}
+_in_flight_lock = _thread.allocate_lock()
+
+
+def _claim(key: tuple[object, ...]) -> tuple[_InFlight, bool]:
+    """Return the detection for a cache key and whether the caller must run it.
+
+    A memoized result comes back as an already settled _InFlight. Otherwise
+    the caller either joins the thread running the detection, or becomes
+    that thread and must _settle() the key.
+    """
+
+    counts = _counters.cache["in_flight"]
+
+    with _in_flight_lock:
+        if (result := _cache.get(key, _MISSING)) is not _MISSING:
+            counts[0] += 1
+            return _InFlight(result), False
+
+        if (flight := _in_flight.get(key)) is not None:
+            counts[0] += 1
+            return flight, False
+
+        counts[1] += 1
+        flight = _in_flight[key] = _InFlight()
+        flight._done.acquire()
+
+        return flight, True
+
+
+def _settle(
+    key: tuple[object, ...],
+    flight: _InFlight,
+    result: InstallerInfo | None = None,
+    error: BaseException | None = None,
+) -> None:
+    """Publish the outcome of a claimed detection and wake its waiters.
+
+    Results are memoized unless the detection failed, or clear_cache() ran
+    in the meantime and made them stale.
+    """
+
+    if isinstance(error, Exception):
+        flight.error = error
+    elif error is not None:
+        # An interruption belongs to the thread it happened in.
+        result = _MISSING
+
+    flight.result = result
+
+    with _in_flight_lock:
+        if _in_flight.get(key) is flight:
+            del _in_flight[key]
+
+            if error is None:
+                _cache[key] = result
+
+    flight._done.release()
+
+
+def _environment_fingerprint() -> tuple[object, ...]:
+    """Return the interpreter state the detectors read, for use as a cache key.
+
+    Same as _Environment.current().fingerprint(), without building the object.
+    """
+
+    return (
+        sys.prefix,
+        sys.executable,
+        os.environ.get("CONDA_PREFIX", ""),
+        os.environ.get("MAMBA_EXE", ""),
+        os.environ.get("UV_PROJECT_ENVIRONMENT", ""),
+        os.environ.get("HOMEBREW_PREFIX", ""),
+        os.environ.get("HOMEBREW_CELLAR", ""),
+        tuple(sys.path),
+    )
+
+
+def clear_cache() -> None:
+    """Forget every result memoized by detect_installer()."""
+
+    with _in_flight_lock:
+        _cache.clear()
+        _in_flight.clear()
+
+    _dist_info_index.clear()
+    _conda_meta_index.clear()
+    _uv_project_dirs.clear()
+    _devices.clear()
+    _uv_project_searches.clear()
+    _pyproject_dependencies.clear()
+    _uv_lock_scans.clear()
+    _realpaths.clear()
+    _brew_kegs.clear()
+    _prefix_environments.clear()
+
+
+def _after_fork_in_child() -> None:
+    """Replace the locks a thread of the parent may have held at fork time.
+
+    The threads running detections did not survive the fork, so their
+    in-flight entries would be waited for forever. Memoized results stay:
+    the child inherits the parent's environment.
+    """
+
+    global _in_flight_lock
+
+    _in_flight_lock = _thread.allocate_lock()
+    _in_flight.clear()
+
+    for scan in _uv_lock_scans.values():
+        scan.lock = _thread.allocate_lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def detect_installer(
+    package_name: str,
+    uv_upgrade_strategy: UvUpgradeStrategy = "add",
+    *,
+    strategy: DetectionStrategy = "thorough",
+    environment: str | os.PathLike[str] | None = None,
+    use_cache: bool = True,
+    persistent_cache: bool = False,
+) -> InstallerInfo | None:
+    """Detect which installer was used to install the given package.
+
+    Returns None if the package is not installed.
+
+    With strategy="fast" no file is stat'ed or opened, which makes it safe
+    to call from signal handlers or at interpreter shutdown. The answer
+    then comes from a memoized thorough result if there is one, otherwise
+    from sys.prefix, sys.executable and environment variables alone; when
+    those do not identify the installer it is Installer.UNKNOWN. A fast
+    result may also be returned for a package that is not installed. The
+    strategy attribute of the result tells which strategy produced it.
+
+    By default the running interpreter's environment is inspected. Pass the
+    path of another virtual environment or prefix as environment to analyse
+    it from disk instead, without starting its interpreter.
+
+    Results (including None) are memoized per package, strategy and
+    environment fingerprint. Pass use_cache=False to always re-run the
+    detection, or call clear_cache() after installing/removing packages.
+
+    With persistent_cache=True results are also stored on disk, under
+    $XDG_CACHE_HOME/detect-installer, and reused by later processes for as
+    long as the directories they were derived from are unchanged.
+    """
+
+    _counters.calls += 1
+
+    if strategy == "fast":
+        if environment is not None:
+            raise ValueError("the fast strategy cannot read another environment")
+
+        return _detect_fast(package_name, uv_upgrade_strategy, use_cache)
+
+    if strategy != "thorough":
+        raise ValueError(f"unknown detection strategy: {strategy!r}")
+
+    env = None if environment is None else _Environment.from_prefix(environment)
+
+    if not use_cache:
+        return _detect_uncached(
+            package_name, uv_upgrade_strategy, env, persistent_cache
+        )
+
+    fingerprint = _environment_fingerprint() if env is None else env.fingerprint()
+    key = (package_name, uv_upgrade_strategy, fingerprint)
+
+    try:
+        result = _cache[key]
+    except KeyError:
+        _memory_cache[1] += 1
+    else:
+        _memory_cache[0] += 1
+        return result
+
+    return _detect_claimed(
+        key, package_name, uv_upgrade_strategy, env, persistent_cache
+    )
+
+
+def _detect_claimed(
+    key: tuple[object, ...],
+    package_name: str,
+    uv_upgrade_strategy: UvUpgradeStrategy,
+    env: _Environment | None,
+    persistent_cache: bool,
+) -> InstallerInfo | None:
+    """Run the detection of a cache miss, or wait for the thread running it."""
+
+    while True:
+        flight, claimed = _claim(key)
+
+        if claimed:
+            break
+
+        # Otherwise the thread running it was interrupted: claim it again.
+        if (result := flight.wait()) is not _MISSING:
+            return result
+
+    try:
+        result = _detect_uncached(
+            package_name, uv_upgrade_strategy, env, persistent_cache
+        )
+    except BaseException as exc:
+        _settle(key, flight, error=exc)
+        raise
+
+    _settle(key, flight, result)
+
+    return result
+
+
+def _detect_fast(
+    package_name: str,
+    uv_upgrade_strategy: UvUpgradeStrategy,
+    use_cache: bool,
+) -> InstallerInfo | None:
+    """Detect the installer from what is already in memory, without any I/O."""
+
+    if use_cache:
+        key = (package_name, uv_upgrade_strategy, _environment_fingerprint())
+
+        try:
+            result = _cache[key]
+        except KeyError:
+            _memory_cache[1] += 1
+        else:
+            _memory_cache[0] += 1
+            return result
+
+    env = _Environment.current()
+    dist_path, certain = _dist_info_index.find_cached(
+        _normalize_name(package_name), env.path
+    )
+
+    if dist_path is None and certain:
+        return None
+
+    # Compiling the path classifier imports re, and importing reads files.
+    if _path_classifier is None and "re" not in sys.modules:
+        installer = None
+    else:
+        installer = _detect_environment(env, resolve_symlinks=False)
+
+    if installer is None:
+        return _UNKNOWN_FAST
+
+    return _info(installer, package_name, uv_upgrade_strategy, "fast")
+
+
+def _detect_uncached(
+    package_name: str,
+    uv_upgrade_strategy: UvUpgradeStrategy,
+    env: _Environment | None,
+    persistent_cache: bool,
+) -> InstallerInfo | None:
+    if env is None:
+        env = _Environment.current()
+
+    if not persistent_cache:
+        return _detect_installer(package_name, uv_upgrade_strategy, env)
+
+    from ._disk_cache import DiskCache
+
+    return DiskCache(env=env).detect(package_name, uv_upgrade_strategy)
+
+
+def detect_installers(
+    package_names: Iterable[str],
+    uv_upgrade_strategy: UvUpgradeStrategy = "add",
+    *,
+    environment: str | os.PathLike[str] | None = None,
+    use_cache: bool = True,
+) -> dict[str, InstallerInfo | None]:
+    """Detect the installer of several packages at once.
+
+    Equivalent to calling detect_installer() for every name, but the
+    environment checks run once and all distributions are located in a
+    single pass over sys.path. The result maps each requested name to its
+    InstallerInfo, or None if it is not installed.
+    """
+
+    if environment is None:
+        env = _Environment.current()
+        fingerprint = _environment_fingerprint() if use_cache else ()
+    else:
+        env = _Environment.from_prefix(environment)
+        fingerprint = env.fingerprint()
+
+    results: dict[str, InstallerInfo | None] = {}
+    pending: list[str] = []
+    # The detections this call runs, and those other threads are running.
+    claimed: dict[str, _InFlight] = {}
+    joined: dict[str, _InFlight] = {}
+
+    for package_name in package_names:
+        if package_name in results:
+            continue
+
+        key = (package_name, uv_upgrade_strategy, fingerprint)
+        results[package_name] = None
+        _counters.calls += 1
+
+        if not use_cache:
+            pending.append(package_name)
+        elif (result := _cache.get(key, _MISSING)) is not _MISSING:
+            _memory_cache[0] += 1
+            results[package_name] = result
+        else:
+            _memory_cache[1] += 1
+            flight, claim = _claim(key)
+
+            if claim:
+                claimed[package_name] = flight
+                pending.append(package_name)
+            else:
+                joined[package_name] = flight
+
+    if pending:
+        try:
+            _detect_pending(
+                pending, uv_upgrade_strategy, env, fingerprint, results, claimed
+            )
+        except BaseException as exc:
+            for package_name, flight in claimed.items():
+                key = (package_name, uv_upgrade_strategy, fingerprint)
+                _settle(key, flight, error=exc)
+            raise
+
+    # Only wait once this call's own detections are settled, so that two
+    # batches waiting for each other's packages cannot deadlock.
+    for package_name, flight in joined.items():
+        if (result := flight.wait()) is _MISSING:
+            key = (package_name, uv_upgrade_strategy, fingerprint)
+            result = _detect_claimed(key, package_name, uv_upgrade_strategy, env, False)
+
+        results[package_name] = result
+
+    return results
+
+
+def _detect_pending(
+    pending: list[str],
+    uv_upgrade_strategy: UvUpgradeStrategy,
+    env: _Environment,
+    fingerprint: tuple[object, ...],
+    results: dict[str, InstallerInfo | None],
+    claimed: dict[str, _InFlight],
+) -> None:
+    """Detect the packages of a detect_installers() call not found in the cache.
+
+    Each result is settled as soon as it is known, and removed from claimed.
+    """
+
+    dist_paths = _find_distributions(
+        {_normalize_name(name) for name in pending}, env.path
+    )
+    probes = _EnvironmentProbes(env)
+
+    for package_name in pending:
+        start = perf_counter_ns()
+        dist_path = dist_paths.get(_normalize_name(package_name))
+        result = None
+
+        if dist_path is not None:
+            result = _detect_from_distribution(
+                package_name,
+                dist_path,
+                probes,
+                uv_upgrade_strategy,
+            )
+            _observe(result.installer.value, perf_counter_ns() - start)
+        else:
+            _counters.not_found += 1
+            _observe("not-found", perf_counter_ns() - start)
+
+        results[package_name] = result
+
+        if (flight := claimed.pop(package_name, None)) is not None:
+            _settle((package_name, uv_upgrade_strategy, fingerprint), flight, result)
+
+
+def _normalize_name(name: str) -> str:
+    """Normalize a distribution name as described in PEP 503."""
+
+    name = name.lower().replace("_", "-").replace(".", "-")
+
+    while "--" in name:
+        name = name.replace("--", "-")
+
+    return name
+
+
+def _parse_metadata_dir_name(filename: str) -> tuple[str, str | None] | None:
+    """Split a *.dist-info / *.egg-info name into (normalized name, version).
+
+    Returns None for anything else. The version is None for egg-info
+    entries that do not carry one in their name.
+    """
+
+    stem, _, suffix = filename.rpartition(".")
+
+    if suffix not in ("dist-info", "egg-info"):
+        return None
+
+    name, _, version = stem.partition("-")
+
+    return _normalize_name(name), version.partition("-")[0] or None
+
+
+class _DistInfoIndex:
+    """Map normalized distribution names to their metadata directories.
+
+    Each sys.path directory is listed once with os.scandir and the result is
+    kept until the directory's mtime changes, so lookups cost one stat per
+    directory plus a dict lookup.
+    """
+
+    def __init__(self) -> None:
+        self._directories: dict[str, tuple[int, dict[str, str]]] = {}
+
+    def clear(self) -> None:
+        self._directories.clear()
+
+    def entries(self, directory: str) -> dict[str, str]:
+        """Return the normalized name -> metadata path mapping of a directory."""
+
+        try:
+            mtime = _stat(directory).st_mtime_ns
+        except OSError:
+            # Remembered as empty (-1 never matches a real mtime), so that
+            # find_cached() knows there is nothing to find here.
+            self._directories[directory] = (-1, {})
+            return {}
+
+        cached = self._directories.get(directory)
+
+        if cached is not None and cached[0] == mtime:
+            _counters.cache["dist_index"][0] += 1
+            return cached[1]
+
+        _counters.cache["dist_index"][1] += 1
+        names: dict[str, str] = {}
+
+        try:
+            with _scandir(directory) as entries:
+                for entry in entries:
+                    if parsed := _parse_metadata_dir_name(entry.name):
+                        names.setdefault(parsed[0], entry.path)
+        except OSError:
+            pass
+
+        self._directories[directory] = (mtime, names)
+
+        return names
+
+    def find_cached(self, name: str, path: list[str]) -> tuple[str | None, bool]:
+        """Locate a normalized name using only the listings already in memory.
+
+        Nothing is stat'ed, so the listings may be stale. Returns the
+        metadata directory (or None) and whether every path entry that could
+        hold it had been listed.
+        """
+
+        for path_entry in path:
+            if (cached := self._directories.get(path_entry or ".")) is None:
+                return None, False
+
+            if (dist_path := cached[1].get(name)) is not None:
+                return dist_path, True
+
+        return None, True
+
+    def find(self, names: set[str], path: list[str]) -> dict[str, str]:
+        """Locate the metadata directories for the given normalized names.
+
+        Earlier path entries win, as with importlib.metadata.
+        """
+
+        found: dict[str, str] = {}
+        wanted = set(names)
+
+        for path_entry in path:
+            if not wanted:
+                break
+
+            entries = self.entries(path_entry or ".")
+
+            for name in wanted & entries.keys():
+                found[name] = entries[name]
+
+            wanted.difference_update(found)
+
+        return found
+
+
+_dist_info_index = _DistInfoIndex()
+
+
+def _parse_conda_meta_name(filename: str) -> str | None:
+    """Return the normalized package name of a conda-meta record filename.
+
+    Records are named <name>-<version>-<build>.json; names may contain
+    dashes, versions and build strings may not.
+    """
+
+    if not filename.endswith(".json"):
+        return None
+
+    parts = filename[:-5].rsplit("-", 2)
+
+    if len(parts) != 3 or not all(parts):
+        return None
+
+    return _normalize_name(parts[0])
+
+
+class _CondaMetaIndex:
+    """The names of the packages conda installed in a prefix.
+
+    Built from the filenames in <prefix>/conda-meta alone (the JSON records
+    are never opened) and kept until the directory's mtime changes.
+    """
+
+    def __init__(self) -> None:
+        self._directories: dict[str, tuple[int, frozenset[str]]] = {}
+
+    def clear(self) -> None:
+        self._directories.clear()
+
+    def packages(self, prefix: str) -> frozenset[str]:
+        directory = os.path.join(prefix, "conda-meta")
+
+        try:
+            mtime = _stat(directory).st_mtime_ns
+        except OSError:
+            self._directories.pop(directory, None)
+            return frozenset()
+
+        cached = self._directories.get(directory)
+
+        if cached is not None and cached[0] == mtime:
+            _counters.cache["conda_meta"][0] += 1
+            return cached[1]
+
+        _counters.cache["conda_meta"][1] += 1
+        names = set()
+
+        try:
+            with _scandir(directory) as entries:
+                for entry in entries:
+                    if name := _parse_conda_meta_name(entry.name):
+                        names.add(name)
+        except OSError:
+            pass
+
+        packages = frozenset(names)
+        self._directories[directory] = (mtime, packages)
+
+        return packages
+
+
+_conda_meta_index = _CondaMetaIndex()
+
+
+def _conda_packages(env: _Environment) -> frozenset[str]:
+    """Return the normalized names of the packages conda installed in env."""
+
+    return _conda_meta_index.packages(env.prefix)
+
+
+def _find_distributions(names: set[str], path: list[str]) -> dict[str, str]:
+    """Locate the metadata directories for the given normalized names on path."""
+
+    return _dist_info_index.find(names, path)
+
+
+def _detect_environment(
+    env: _Environment, resolve_symlinks: bool = True
+) -> Installer | None:
+    """Run the package-independent checks (pipx, uv tool, conda, brew).
+
+    Without resolve_symlinks no filesystem call is made.
+    """
+
+    markers = _get_path_classifier().markers(env)
+    conda_markers = markers & _CONDA or _is_active_conda_environment(env)
+
+    if not (markers & (_PIPX | _UV_TOOL) or conda_markers) and _is_brew_environment(
+        env, resolve_symlinks
+    ):
+        markers |= _BREW
+
+    return _installer_for_markers(
+        markers, _detect_conda_variant(env) if conda_markers else None
+    )
+
+
+def _detect_installer(
+    package_name: str,
+    uv_upgrade_strategy: UvUpgradeStrategy,
+    env: _Environment,
+) -> InstallerInfo | None:
+    start = perf_counter_ns()
+    name = _normalize_name(package_name)
+
+    if (dist_path := _find_distributions({name}, env.path).get(name)) is None:
+        _counters.not_found += 1
+        _observe("not-found", perf_counter_ns() - start)
+        return None
+
+    result = _detect_from_distribution(
+        package_name, dist_path, _EnvironmentProbes(env), uv_upgrade_strategy
+    )
+    _observe(result.installer.value, perf_counter_ns() - start)
+
+    return result
+
+
+class _EnvironmentProbes:
+    """The package-independent checks of an environment, each run at most once.
+
+    Shared by all the packages of a batch or inventory, so that the
+    environment is only examined once however many packages are detected.
+    """
+
+    __slots__ = ("env", "installer", "uv_project_root", "conda_packages")
+
+    def __init__(self, env: _Environment) -> None:
+        self.env = env
+        self.installer: Callable[[], Installer | None] = cache(
+            partial(_detect_environment, env)
+        )
+        self.uv_project_root: Callable[[], str | None] = cache(
+            partial(_uv_project_root, env)
+        )
+        self.conda_packages: Callable[[], frozenset[str]] = cache(
+            partial(_conda_packages, env)
+        )
+
+
+def _detect_from_distribution(
+    package_name: str,
+    dist_path: str,
+    probes: _EnvironmentProbes,
+    uv_upgrade_strategy: UvUpgradeStrategy,
+) -> InstallerInfo:
+    # Step 2: filesystem / environment checks. In conda and Homebrew
+    # environments only the packages conda-meta lists or a formula links
+    # are theirs; the others were installed on top (usually with pip) and
+    # are told apart by INSTALLER.
+    environment_installer = probes.installer()
+
+    if environment_installer in (Installer.CONDA, Installer.MAMBA):
+        if _normalize_name(package_name) in probes.conda_packages():
+            return _info(environment_installer, package_name)
+    elif environment_installer is Installer.BREW:
+        if formula := _brew_formula(dist_path, probes.env):
+            return _info(Installer.BREW, formula)
+    elif environment_installer is not None:
+        return _info(environment_installer, package_name)
+
+    # Step 3: INSTALLER metadata
+    dist = _read_dist_info(dist_path)
+
+    if dist.installer == "uv":
+        if (project_root := probes.uv_project_root()) is None:
+            installer = Installer.UV_PIP
+        else:
+            return _info(
+                Installer.UV,
+                package_name,
+                _resolve_uv_upgrade_strategy(
+                    uv_upgrade_strategy, project_root, package_name
+                ),
+            )
+    elif dist.installer == "pip":
+        installer = Installer.PIP
+    elif dist.installer == "conda":
+        # conda writes INSTALLER too, which catches packages whose conda
+        # name differs from their Python distribution name.
+        if environment_installer in (Installer.CONDA, Installer.MAMBA):
+            return _info(environment_installer, package_name)
+        return _info(Installer.CONDA, package_name)
+    else:
+        # Step 4: default
+        return _UNKNOWN
+
+    # Editable and VCS installs are upgraded from their source.
+    if dist.direct_url is not None and (
+        command := _get_direct_url_upgrade_cmd(installer, package_name, dist.direct_url)
+    ):
+        return InstallerInfo(installer, command)
 
-    # Step 4: default
-    return InstallerInfo(Installer.UNKNOWN, None)
+    return _info(installer, package_name)
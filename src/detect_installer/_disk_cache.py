@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import marshal
+import os
+import zlib
+
+from ._detect import (
+    Installer,
+    InstallerInfo,
+    _counters,
+    _detect_environment,
+    _detect_installer,
+    _dist_info_index,
+    _Environment,
+    _fs_calls,
+    _normalize_name,
+    _stat,
+    _uv_project_root,
+    _uv_project_search_dirs,
+    _write_atomic,
+    default_cache_dir,
+)
+
+TYPE_CHECKING = False
+
+if TYPE_CHECKING:
+    from ._detect import UvUpgradeStrategy
+
+_FORMAT_VERSION = 2
+
+# How many fingerprints of one prefix are kept; sys.path[0] is the script's
+# directory, so every tool run by the same interpreter has its own.
+_MAX_ENVIRONMENTS = 8
+
+
+def _stat_key(path: str) -> list[object]:
+    """Return the [path, mtime_ns, inode] triple used to validate an entry."""
+
+    try:
+        st = _stat(path)
+    except OSError:
+        return [path, None, None]
+
+    return [path, st.st_mtime_ns, st.st_ino]
+
+
+class DiskCache:
+    """Detection results persisted across processes.
+
+    There is one file per interpreter prefix, holding the entries of
+    its most recently used environment fingerprints side by side, so tools
+    sharing an interpreter do not evict each other. Every entry records the
+    directories it was derived from (the site-packages directory holding the
+    distribution, and the uv.lock search directories for uv installs) and is
+    only reused while their mtime and inode are unchanged, so validating an
+    entry costs a few stat calls. Files are replaced atomically, so
+    concurrent processes can only lose each other's updates, never corrupt
+    the cache. The files are written with marshal, like the interpreter's
+    own bytecode cache: it needs no imports, where json alone would cost
+    more than some detections.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike[str] | None = None,
+        *,
+        env: _Environment | None = None,
+    ) -> None:
+        self.directory = os.fspath(directory) if directory else default_cache_dir()
+        self.env = env if env is not None else _Environment.current()
+        # Not a cryptographic hash: the file records its prefix, and hashlib
+        # alone costs more to import than a cache hit saves.
+        digest = zlib.crc32(self.env.prefix.encode("utf-8", "surrogatepass"))
+        self.path = os.path.join(self.directory, f"{digest:08x}.cache")
+        self._key = self.env.fingerprint()
+
+    def detect(
+        self,
+        package_name: str,
+        uv_upgrade_strategy: UvUpgradeStrategy = "add",
+    ) -> InstallerInfo | None:
+        """Return the cached result for a package, detecting it on a miss."""
+
+        key = f"{package_name}\0{uv_upgrade_strategy}"
+        environments = self._load()
+        entries = environments.get(self._key, {})
+        entry = entries.get(key)
+
+        if entry is not None and all(
+            _stat_key(path) == [path, mtime, inode]
+            for path, mtime, inode in entry["depends_on"]
+        ):
+            _counters.cache["disk"][0] += 1
+
+            if entry["installer"] is None:
+                return None
+
+            return InstallerInfo(Installer(entry["installer"]), entry["upgrade_cmd"])
+
+        _counters.cache["disk"][1] += 1
+        result = _detect_installer(package_name, uv_upgrade_strategy, self.env)
+        entries[key] = {
+            "installer": result.installer.value if result else None,
+            "upgrade_cmd": result.upgrade_cmd if result else None,
+            "depends_on": self._dependencies(package_name, result, uv_upgrade_strategy),
+        }
+        # Most recently written last, so the oldest fingerprint is dropped.
+        environments.pop(self._key, None)
+        environments[self._key] = entries
+
+        while len(environments) > _MAX_ENVIRONMENTS:
+            del environments[next(iter(environments))]
+
+        self._store(environments)
+
+        return result
+
+    def _dependencies(
+        self,
+        package_name: str,
+        result: InstallerInfo | None,
+        uv_upgrade_strategy: UvUpgradeStrategy,
+    ) -> list[list[object]]:
+        """Return the stat keys of the directories a result was derived from."""
+
+        if result is None:
+            # Installing the package anywhere on the path would change it.
+            return [_stat_key(entry or ".") for entry in self.env.path]
+
+        name = _normalize_name(package_name)
+        dist_path = _dist_info_index.find({name}, self.env.path)[name]
+        dependencies = [_stat_key(os.path.dirname(dist_path))]
+
+        if result.installer in (Installer.UV, Installer.UV_PIP):
+            dependencies.extend(_stat_key(d) for d in _uv_project_search_dirs(self.env))
+
+        if (
+            result.installer is Installer.UV
+            and uv_upgrade_strategy == "auto"
+            and (root := _uv_project_root(self.env)) is not None
+        ):
+            # The strategy was picked from the project's dependencies.
+            dependencies.extend(
+                _stat_key(os.path.join(root, name))
+                for name in ("pyproject.toml", "uv.lock")
+            )
+
+        if _detect_environment(self.env) in (Installer.CONDA, Installer.MAMBA):
+            # conda install/remove decides who owns the package.
+            dependencies.append(_stat_key(os.path.join(self.env.prefix, "conda-meta")))
+
+        return dependencies
+
+    def _load(self) -> dict[tuple[object, ...], dict]:
+        _fs_calls.open += 1
+
+        try:
+            with open(self.path, "rb") as f:
+                data = marshal.load(f)
+        except (OSError, EOFError, ValueError):
+            return {}
+
+        if (
+            not isinstance(data, dict)
+            or data.get("version") != _FORMAT_VERSION
+            or data.get("prefix") != self.env.prefix
+            or not isinstance(data.get("environments"), dict)
+        ):
+            return {}
+
+        return data["environments"]
+
+    def _store(self, environments: dict[tuple[object, ...], dict]) -> None:
+        data = {
+            "version": _FORMAT_VERSION,
+            "prefix": self.env.prefix,
+            "environments": environments,
+        }
+        _write_atomic(self.path, marshal.dumps(data))
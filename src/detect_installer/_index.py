@@ -0,0 +1,357 @@
+from __future__ import annotations
+
+import hashlib
+import http.client
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+from urllib.parse import urlsplit
+
+from ._detect import (
+    _normalize_name,
+    _write_atomic,
+    default_cache_dir,
+    detect_installers,
+)
+from ._notify import UpgradeNotice, _installed_version
+from ._versions import is_newer, is_prerelease, version_key
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from ._detect import UvUpgradeStrategy
+
+DEFAULT_INDEX_URL = "https://pypi.org/simple/"
+
+_ACCEPT = "application/vnd.pypi.simple.v1+json"
+
+_FORMAT_VERSION = 1
+
+_ARCHIVE_SUFFIXES = (".whl", ".tar.gz", ".zip", ".tar.bz2", ".tgz", ".egg")
+
+
+def _file_version(filename: str) -> str | None:
+    """Return the version in a wheel or sdist filename, if there is one."""
+
+    for suffix in _ARCHIVE_SUFFIXES:
+        if filename.endswith(suffix):
+            stem = filename[: -len(suffix)]
+            break
+    else:
+        return None
+
+    if suffix in (".whl", ".egg"):
+        parts = stem.split("-")
+        return parts[1] if len(parts) > 1 else None
+
+    # Normalized sdist names have no "-" in either the name or the version.
+    name, _, version = stem.rpartition("-")
+    return version if name else None
+
+
+def _available_versions(project: dict) -> list[str]:
+    """Return the versions of a PEP 691 project page with a file not yanked."""
+
+    available = set()
+
+    for file in project.get("files", ()):
+        if not isinstance(file, dict) or file.get("yanked"):
+            continue
+
+        version = _file_version(str(file.get("filename", "")))
+        if version is not None:
+            available.add(version)
+
+    return sorted(available, key=lambda version: version_key(version) or ())
+
+
+def _latest(versions: list[str], prereleases: bool) -> str | None:
+    candidates = [
+        version
+        for version in versions
+        if version_key(version) is not None
+        and (prereleases or not is_prerelease(version))
+    ]
+
+    if not candidates:
+        return None
+
+    return max(candidates, key=lambda version: version_key(version) or ())
+
+
+class _ConnectionPool:
+    """Keep-alive connections to one host, reused across threads."""
+
+    def __init__(self, url: str, size: int, timeout: float) -> None:
+        parts = urlsplit(url)
+
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"unsupported index URL: {url!r}")
+
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.size = size
+        self.timeout = timeout
+        self.created = 0
+        self._idle: list[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> http.client.HTTPConnection:
+        self.created += 1
+
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(
+                self.host, self.port, timeout=self.timeout
+            )
+
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def get(
+        self, path: str, headers: dict[str, str]
+    ) -> tuple[http.client.HTTPResponse, bytes]:
+        """Send a GET request and return the response with its body."""
+
+        while True:
+            with self._lock:
+                connection = self._idle.pop() if self._idle else None
+
+            reused = connection is not None
+            if connection is None:
+                connection = self._connect()
+
+            try:
+                connection.request("GET", path, headers=headers)
+                response = connection.getresponse()
+                body = response.read()
+            except (http.client.HTTPException, OSError):
+                connection.close()
+
+                # The server may have closed an idle connection; retry once
+                # on a new one.
+                if reused:
+                    continue
+                raise
+
+            self._release(connection, response)
+
+            return response, body
+
+    def _release(
+        self, connection: http.client.HTTPConnection, response: http.client.HTTPResponse
+    ) -> None:
+        if not response.will_close:
+            with self._lock:
+                if len(self._idle) < self.size:
+                    self._idle.append(connection)
+                    return
+
+        connection.close()
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+
+        for connection in idle:
+            connection.close()
+
+
+class IndexClient:
+    """Look up the latest versions of packages on a PEP 691 simple index.
+
+    Requests reuse a pool of up to max_connections keep-alive connections
+    to the index, and latest_versions() looks up that many packages at a
+    time. Project pages are cached under cache_dir (by
+    default under $XDG_CACHE_HOME/detect-installer) together with their
+    ETag and Last-Modified headers, so repeated lookups are conditional
+    requests that the index answers with 304 Not Modified when nothing was
+    released. Cache files are replaced atomically.
+
+    latest_version can be passed as the provider of upgrade_notice().
+    """
+
+    def __init__(
+        self,
+        index_url: str = DEFAULT_INDEX_URL,
+        *,
+        cache_dir: str | os.PathLike[str] | None = None,
+        max_connections: int = 4,
+        timeout: float = 10.0,
+    ) -> None:
+        if cache_dir is None:
+            cache_dir = os.path.join(default_cache_dir(), "index")
+
+        self.index_url = index_url.rstrip("/") + "/"
+        self.cache_dir = os.fspath(cache_dir)
+        self.max_connections = max_connections
+        self._pool = _ConnectionPool(self.index_url, max_connections, timeout)
+
+    def __enter__(self) -> IndexClient:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the idle connections to the index."""
+
+        self._pool.close()
+
+    def _cache_path(self, url: str) -> str:
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def _load(self, path: str, url: str) -> dict | None:
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if (
+            not isinstance(entry, dict)
+            or entry.get("version") != _FORMAT_VERSION
+            or entry.get("url") != url
+            or not isinstance(entry.get("versions"), list)
+        ):
+            return None
+
+        return entry
+
+    def _store(self, path: str, entry: dict) -> None:
+        _write_atomic(path, json.dumps(entry).encode("utf-8"))
+
+    def versions(self, package_name: str) -> list[str] | None:
+        """Return the versions of a package that are not yanked, oldest first.
+
+        Returns None when the index does not know the package or cannot be
+        reached.
+        """
+
+        url = f"{self.index_url}{_normalize_name(package_name)}/"
+        path = self._cache_path(url)
+        cached = self._load(path, url)
+        headers = {"Accept": _ACCEPT}
+
+        if cached is not None:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        try:
+            response, body = self._pool.get(urlsplit(url).path, headers)
+        except (http.client.HTTPException, OSError):
+            return None
+
+        if response.status == 304 and cached is not None:
+            return cached["versions"]
+
+        if response.status != 200:
+            return None
+
+        try:
+            project = json.loads(body)
+        except ValueError:
+            return None
+
+        if not isinstance(project, dict):
+            return None
+
+        versions = _available_versions(project)
+        etag = response.getheader("ETag")
+        last_modified = response.getheader("Last-Modified")
+
+        if etag or last_modified:
+            self._store(
+                path,
+                {
+                    "version": _FORMAT_VERSION,
+                    "url": url,
+                    "etag": etag,
+                    "last_modified": last_modified,
+                    "versions": versions,
+                },
+            )
+
+        return versions
+
+    def latest_version(
+        self, package_name: str, *, prereleases: bool = False
+    ) -> str | None:
+        """Return the latest version of a package, or None if unknown.
+
+        Pre-releases are only considered with prereleases=True.
+        """
+
+        versions = self.versions(package_name)
+
+        return None if versions is None else _latest(versions, prereleases)
+
+    def latest_versions(
+        self, package_names: Iterable[str], *, prereleases: bool = False
+    ) -> dict[str, str | None]:
+        """Look up the latest version of many packages concurrently."""
+
+        names = list(dict.fromkeys(package_names))
+
+        if len(names) <= 1:
+            return {
+                name: self.latest_version(name, prereleases=prereleases)
+                for name in names
+            }
+
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_connections, len(names)),
+            thread_name_prefix="detect-installer-index",
+        ) as executor:
+            latest = executor.map(
+                lambda name: self.latest_version(name, prereleases=prereleases),
+                names,
+            )
+
+            return dict(zip(names, latest))
+
+
+def outdated_packages(
+    package_names: Iterable[str],
+    *,
+    client: IndexClient | None = None,
+    prereleases: bool = False,
+    uv_upgrade_strategy: UvUpgradeStrategy = "add",
+) -> dict[str, UpgradeNotice]:
+    """Return the installed packages that have a newer release on the index.
+
+    Each outdated package is mapped to an UpgradeNotice holding its
+    installed and latest versions and the command that upgrades it.
+    Packages that are up to date, not installed or unknown to the index
+    are left out. client defaults to an IndexClient for PyPI.
+    """
+
+    names = list(dict.fromkeys(package_names))
+    installed = {
+        name: version
+        for name in names
+        if (version := _installed_version(name)) is not None
+    }
+
+    if client is None:
+        with IndexClient() as client:
+            latest = client.latest_versions(installed, prereleases=prereleases)
+    else:
+        latest = client.latest_versions(installed, prereleases=prereleases)
+
+    outdated = {
+        name: version
+        for name, current in installed.items()
+        if (version := latest[name]) is not None and is_newer(version, current)
+    }
+    installers = detect_installers(outdated, uv_upgrade_strategy)
+
+    return {
+        name: UpgradeNotice(name, installed[name], version, installer)
+        for name, version in outdated.items()
+        if (installer := installers[name]) is not None
+    }
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import os
+from collections import deque
+
+from ._detect import (
+    Installer,
+    InstallerInfo,
+    _detect_from_distribution,
+    _Environment,
+    _EnvironmentProbes,
+    _isdir,
+    _open_text,
+    _parse_metadata_dir_name,
+    _scandir,
+)
+
+TYPE_CHECKING = False
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+    from ._detect import UvUpgradeStrategy
+
+EnvironmentEntry = tuple[str, "str | None", InstallerInfo]
+
+
+def _read_version(path: str) -> str | None:
+    """Read the Version header of an egg-info whose name does not include it."""
+
+    metadata = os.path.join(path, "PKG-INFO") if _isdir(path) else path
+
+    try:
+        with _open_text(metadata, errors="replace") as f:
+            for line in f:
+                if line.startswith("Version:"):
+                    return line.partition(":")[2].strip() or None
+                if not line.strip():
+                    break
+    except OSError:
+        pass
+
+    return None
+
+
+def _iter_metadata_dirs(path: list[str]) -> Iterator[tuple[str, str, str | None]]:
+    """Yield (name, path, version) for every distribution visible on path.
+
+    Directories are streamed with os.scandir; distributions shadowed by an
+    earlier path entry are skipped, as importlib.metadata does.
+    """
+
+    seen: set[str] = set()
+
+    for path_entry in path:
+        try:
+            with _scandir(path_entry or ".") as entries:
+                for entry in entries:
+                    parsed = _parse_metadata_dir_name(entry.name)
+
+                    if parsed is None or parsed[0] in seen:
+                        continue
+
+                    seen.add(parsed[0])
+                    yield parsed[0], entry.path, parsed[1]
+        except OSError:
+            continue
+
+
+def iter_environment(
+    uv_upgrade_strategy: UvUpgradeStrategy = "add",
+    *,
+    environment: str | os.PathLike[str] | None = None,
+    workers: int = 0,
+) -> Iterator[EnvironmentEntry]:
+    """Yield (name, version, InstallerInfo) for every installed distribution.
+
+    Names are PEP 503 normalized. Each sys.path directory is listed once and
+    entries are produced lazily, so memory use does not grow with the size
+    of the environment (beyond the set of names already yielded).
+
+    With workers > 0 the per-distribution metadata is read by a thread pool
+    of that size, which helps on network filesystems; results are still
+    yielded in sys.path order.
+
+    Pass the path of another virtual environment or prefix as environment
+    to inventory it from disk instead of the running interpreter.
+    """
+
+    if environment is None:
+        env = _Environment.current()
+    else:
+        env = _Environment.from_prefix(environment)
+
+    probes = _EnvironmentProbes(env)
+
+    def _detect(item: tuple[str, str, str | None]) -> EnvironmentEntry:
+        name, path, version = item
+        info = _detect_from_distribution(name, path, probes, uv_upgrade_strategy)
+
+        return name, version if version is not None else _read_version(path), info
+
+    if workers <= 0:
+        yield from map(_detect, _iter_metadata_dirs(env.path))
+        return
+
+    yield from _map_bounded(_detect, _iter_metadata_dirs(env.path), workers)
+
+
+def installer_report(
+    uv_upgrade_strategy: UvUpgradeStrategy = "add",
+    *,
+    environment: str | os.PathLike[str] | None = None,
+    workers: int = 0,
+) -> dict[Installer, list[str]]:
+    """Group every installed distribution by the installer that owns it.
+
+    In a conda environment this tells the packages conda installed (those
+    listed in conda-meta) from the ones installed on top of it with pip or
+    uv. Names are PEP 503 normalized and keep their iter_environment()
+    order; arguments are as for iter_environment().
+    """
+
+    report: dict[Installer, list[str]] = {}
+
+    for name, _, info in iter_environment(
+        uv_upgrade_strategy, environment=environment, workers=workers
+    ):
+        report.setdefault(info.installer, []).append(name)
+
+    return report
+
+
+def _map_bounded(
+    func: Callable[[tuple[str, str, str | None]], EnvironmentEntry],
+    items: Iterator[tuple[str, str, str | None]],
+    workers: int,
+) -> Iterator[EnvironmentEntry]:
+    """Like Executor.map, but never queues more than a few items per worker."""
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="detect-installer"
+    ) as executor:
+        pending: deque = deque()
+
+        for item in items:
+            pending.append(executor.submit(func, item))
+
+            if len(pending) >= workers * 4:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import os
+import time
+
+from ._detect import (
+    Installer,
+    InstallerInfo,
+    _normalize_name,
+    _write_atomic,
+    default_cache_dir,
+    detect_installer,
+)
+
+TYPE_CHECKING = False
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from typing import NoReturn
+
+    from ._detect import UvUpgradeStrategy
+
+DEFAULT_INTERVAL = 24 * 60 * 60
+
+
+class UpgradeNotice:
+    """A newer version of a package and the command that installs it.
+
+    Instances are immutable and compare by value.
+    """
+
+    __slots__ = ("package", "current_version", "latest_version", "installer")
+    __match_args__ = ("package", "current_version", "latest_version", "installer")
+
+    package: str
+    current_version: str
+    latest_version: str
+    installer: InstallerInfo
+
+    def __init__(
+        self,
+        package: str,
+        current_version: str,
+        latest_version: str,
+        installer: InstallerInfo,
+    ) -> None:
+        object.__setattr__(self, "package", package)
+        object.__setattr__(self, "current_version", current_version)
+        object.__setattr__(self, "latest_version", latest_version)
+        object.__setattr__(self, "installer", installer)
+
+    @property
+    def upgrade_cmd(self) -> str | None:
+        return self.installer.upgrade_cmd
+
+    def _fields(self) -> tuple[str, str, str, InstallerInfo]:
+        return self.package, self.current_version, self.latest_version, self.installer
+
+    def __setattr__(self, name: str, value: object) -> NoReturn:
+        raise AttributeError(f"cannot assign to field {name!r}")
+
+    def __delattr__(self, name: str) -> NoReturn:
+        raise AttributeError(f"cannot delete field {name!r}")
+
+    def __reduce__(self) -> tuple[object, ...]:
+        return UpgradeNotice, self._fields()
+
+    def __repr__(self) -> str:
+        return (
+            f"UpgradeNotice(package={self.package!r}, "
+            f"current_version={self.current_version!r}, "
+            f"latest_version={self.latest_version!r}, "
+            f"installer={self.installer!r})"
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, UpgradeNotice):
+            return NotImplemented
+
+        return self._fields() == other._fields()
+
+    def __hash__(self) -> int:
+        return hash(self._fields())
+
+    def __str__(self) -> str:
+        message = (
+            f"{self.package} {self.latest_version} is available "
+            f"(you have {self.current_version})."
+        )
+
+        if self.upgrade_cmd is not None:
+            message += f" Upgrade with: {self.upgrade_cmd}"
+
+        return message
+
+
+def default_state_dir() -> str:
+    """Return the directory holding the notifier's per-package state files."""
+
+    return os.path.join(default_cache_dir(), "notify")
+
+
+def _installed_version(package_name: str) -> str | None:
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version(package_name)
+    except PackageNotFoundError:
+        return None
+
+
+def _read_state(path: str) -> dict[str, str | None] | None:
+    import json
+
+    try:
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    return state if isinstance(state, dict) else None
+
+
+def _write_state(path: str, state: dict[str, str | None] | None) -> None:
+    """Atomically replace the state file, leaving it empty when up to date."""
+
+    import json
+
+    _write_atomic(path, b"" if state is None else json.dumps(state).encode("utf-8"))
+
+
+def _notice(
+    package_name: str, current_version: str | None, state: dict[str, str | None] | None
+) -> UpgradeNotice | None:
+    if state is None:
+        return None
+
+    try:
+        latest = state["latest"]
+        installer = InstallerInfo(Installer(state["installer"]), state["upgrade_cmd"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    if not isinstance(latest, str):
+        return None
+
+    if current_version is None:
+        current_version = _installed_version(package_name)
+
+    from ._versions import is_newer
+
+    if current_version is None or not is_newer(latest, current_version):
+        return None
+
+    return UpgradeNotice(package_name, current_version, latest, installer)
+
+
+def upgrade_notice(
+    package_name: str,
+    latest_version: Callable[[str], str | None],
+    *,
+    current_version: str | None = None,
+    interval: float = DEFAULT_INTERVAL,
+    state_dir: str | os.PathLike[str] | None = None,
+    uv_upgrade_strategy: UvUpgradeStrategy = "add",
+) -> UpgradeNotice | None:
+    """Return a notice if a newer version of the package is available.
+
+    latest_version is called with the package name and returns the latest
+    released version, or None when it cannot tell; it is called at most
+    once per interval (in seconds, a day by default) across processes.
+    current_version defaults to the installed version.
+
+    The outcome of the last check is kept in one small file per package
+    under state_dir (by default under $XDG_CACHE_HOME/detect-installer).
+    Its mtime is the time of the last check and an empty file means the
+    package was up to date, so when no check is due and nothing was
+    outdated this costs a single stat call and imports nothing. Files are
+    replaced atomically, and the first process to find a check due pushes
+    the mtime forward so that concurrent processes skip it.
+    """
+
+    if state_dir is None:
+        state_dir = default_state_dir()
+
+    path = os.path.join(state_dir, _normalize_name(package_name))
+    now = time.time()
+
+    try:
+        st = os.stat(path)
+    except OSError:
+        st = None
+
+    if st is not None and 0 <= now - st.st_mtime < interval:
+        if st.st_size == 0:
+            return None
+
+        return _notice(package_name, current_version, _read_state(path))
+
+    if st is not None:
+        try:
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+
+    try:
+        latest = latest_version(package_name)
+    except OSError:
+        latest = None
+
+    if current_version is None:
+        current_version = _installed_version(package_name)
+
+    if latest is None or current_version is None:
+        # Try again after the interval, keeping what was known.
+        _write_state(path, None if st is None else _read_state(path))
+        return None
+
+    from ._versions import is_newer
+
+    if not is_newer(latest, current_version):
+        _write_state(path, None)
+        return None
+
+    installer = detect_installer(package_name, uv_upgrade_strategy)
+
+    if installer is None:
+        _write_state(path, None)
+        return None
+
+    state = {
+        "latest": latest,
+        "installer": installer.installer.value,
+        "upgrade_cmd": installer.upgrade_cmd,
+    }
+    _write_state(path, state)
+
+    return UpgradeNotice(package_name, current_version, latest, installer)
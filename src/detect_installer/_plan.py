@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import os
+import shlex
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from ._detect import Installer, InstallerInfo, _get_upgrade_cmd, detect_installers
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from ._detect import UvUpgradeStrategy
+
+
+# The argv prefix that upgrades any number of packages in one run, per
+# installer that can batch. uv projects are handled by _uv_argv.
+_BATCH_COMMANDS: dict[Installer, tuple[str, ...]] = {
+    Installer.PIP: ("pip", "install", "-U"),
+    Installer.UV_PIP: ("uv", "pip", "install", "--upgrade"),
+    Installer.UV_TOOL: ("uv", "tool", "upgrade"),
+    Installer.BREW: ("brew", "upgrade"),
+    Installer.CONDA: ("conda", "update"),
+    Installer.MAMBA: ("mamba", "update"),
+}
+
+# Installers whose upgrade command takes a single package.
+_SINGLE_COMMANDS: dict[Installer, tuple[str, ...]] = {
+    Installer.PIPX: ("pipx", "upgrade"),
+}
+
+
+@dataclass(frozen=True)
+class UpgradeStep:
+    """One command of an upgrade plan and the packages it upgrades."""
+
+    installer: Installer
+    packages: tuple[str, ...]
+    argv: tuple[str, ...]
+
+    @property
+    def command(self) -> str:
+        """The command, quoted for a POSIX shell."""
+
+        return shlex.join(self.argv)
+
+
+@dataclass(frozen=True)
+class UpgradePlan:
+    """The commands that upgrade a set of packages, grouped by installer.
+
+    steps holds one command per installer that can upgrade several packages
+    at once, followed by one command per package for those that cannot
+    (pipx apps, editable and VCS installs); the latter are also listed in
+    unbatched. Packages for which
+    no command can be given are in skipped, mapped to their InstallerInfo
+    (with Installer.UNKNOWN) or to None when they are not installed.
+    """
+
+    steps: tuple[UpgradeStep, ...] = ()
+    unbatched: tuple[str, ...] = ()
+    skipped: dict[str, InstallerInfo | None] = field(default_factory=dict)
+
+    @property
+    def commands(self) -> list[str]:
+        return [step.command for step in self.steps]
+
+
+def _uv_argv(
+    packages: list[str], uv_upgrade_strategy: UvUpgradeStrategy
+) -> tuple[str, ...]:
+    upgrade = [arg for name in packages for arg in ("--upgrade-package", name)]
+
+    if uv_upgrade_strategy == "lock":
+        return ("uv", "lock", *upgrade)
+
+    return ("uv", "add", *packages, *upgrade)
+
+
+def _uv_strategy(
+    info: InstallerInfo, name: str, uv_upgrade_strategy: UvUpgradeStrategy
+) -> UvUpgradeStrategy:
+    """Return the strategy a uv project result was given, resolving "auto"."""
+
+    if uv_upgrade_strategy != "auto":
+        return uv_upgrade_strategy
+
+    lock = _get_upgrade_cmd(Installer.UV, name, "lock")
+
+    return "lock" if info.upgrade_cmd == lock else "add"
+
+
+def _brew_formula(info: InstallerInfo) -> str | None:
+    """Return the formula a brew result upgrades, if it names one."""
+
+    argv = shlex.split(info.upgrade_cmd or "")
+
+    return argv[2] if len(argv) == 3 and argv[:2] == ["brew", "upgrade"] else None
+
+
+def upgrade_plan(
+    package_names: Iterable[str],
+    uv_upgrade_strategy: UvUpgradeStrategy = "add",
+    *,
+    environment: str | os.PathLike[str] | None = None,
+) -> UpgradePlan:
+    """Plan the fewest commands that upgrade the given packages.
+
+    Packages are detected with detect_installers() and grouped by installer,
+    so that each installer resolves the environment once instead of once
+    per package. Groups keep the order in which their installer is first
+    seen, and packages keep the order they were given in. Homebrew
+    packages are upgraded through their formula, once per formula.
+    """
+
+    # uv projects get a group per strategy, which "auto" picks per package.
+    # Each group maps its packages to the argument that upgrades them.
+    groups: dict[tuple[Installer, UvUpgradeStrategy], dict[str, str]] = {}
+    single: list[tuple[Installer, str, tuple[str, ...]]] = []
+    skipped: dict[str, InstallerInfo | None] = {}
+
+    results = detect_installers(
+        package_names, uv_upgrade_strategy, environment=environment
+    )
+
+    for name, info in results.items():
+        if info is None or info.installer is Installer.UNKNOWN:
+            skipped[name] = info
+        elif info.installer in _SINGLE_COMMANDS:
+            single.append(
+                (info.installer, name, (*_SINGLE_COMMANDS[info.installer], name))
+            )
+        elif info.installer is Installer.UV:
+            strategy = _uv_strategy(info, name, uv_upgrade_strategy)
+            groups.setdefault((Installer.UV, strategy), {})[name] = name
+        elif info.installer is Installer.BREW and (formula := _brew_formula(info)):
+            groups.setdefault((Installer.BREW, uv_upgrade_strategy), {})[name] = formula
+        elif (command := info.upgrade_cmd) is not None and command != _get_upgrade_cmd(
+            info.installer, name, uv_upgrade_strategy
+        ):
+            # Editable and VCS installs are upgraded from their source.
+            single.append((info.installer, name, tuple(shlex.split(command))))
+        else:
+            groups.setdefault((info.installer, uv_upgrade_strategy), {})[name] = name
+
+    steps = [
+        UpgradeStep(
+            installer,
+            tuple(targets),
+            _uv_argv(list(targets), strategy)
+            if installer is Installer.UV
+            else (*_BATCH_COMMANDS[installer], *dict.fromkeys(targets.values())),
+        )
+        for (installer, strategy), targets in groups.items()
+    ]
+    steps.extend(
+        UpgradeStep(installer, (name,), argv) for installer, name, argv in single
+    )
+
+    return UpgradePlan(tuple(steps), tuple(name for _, name, _ in single), skipped)
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future, TimeoutError
+from typing import TYPE_CHECKING
+
+from ._detect import (
+    _MISSING,
+    _UNKNOWN_FAST,
+    InstallerInfo,
+    _cache,
+    _environment_fingerprint,
+    detect_installer,
+)
+
+if TYPE_CHECKING:
+    from ._detect import UvUpgradeStrategy
+
+
+class _Prefetch(Future):  # type: ignore[type-arg]
+    """A Future whose result() falls back to UNKNOWN instead of timing out."""
+
+    def result(self, timeout: float | None = None) -> InstallerInfo | None:
+        try:
+            return super().result(timeout)
+        except TimeoutError:
+            return _UNKNOWN_FAST
+
+
+def _run(
+    future: _Prefetch,
+    package_name: str,
+    uv_upgrade_strategy: UvUpgradeStrategy,
+    use_cache: bool,
+) -> None:
+    if not future.set_running_or_notify_cancel():
+        return
+
+    try:
+        result = detect_installer(
+            package_name, uv_upgrade_strategy, use_cache=use_cache
+        )
+    except BaseException as exc:
+        future.set_exception(exc)
+    else:
+        future.set_result(result)
+
+
+def prefetch_installer(
+    package_name: str,
+    uv_upgrade_strategy: UvUpgradeStrategy = "add",
+    *,
+    use_cache: bool = True,
+) -> Future[InstallerInfo | None]:
+    """Start detecting the installer of a package in the background.
+
+    The detection runs on a daemon thread, so it overlaps with whatever the
+    application does next and never keeps the interpreter from exiting.
+    The returned future resolves to what detect_installer() would return.
+    If result(timeout) is called before the detection has finished, it
+    returns an Installer.UNKNOWN result (with strategy "fast") instead of
+    raising TimeoutError; the detection keeps running and memoizes its
+    result for later calls.
+
+    A result that is already memoized is returned in a completed future,
+    without starting a thread. When no thread can be started, at
+    interpreter shutdown, the future holds the strategy="fast" result,
+    which needs no I/O.
+    """
+
+    future = _Prefetch()
+
+    if use_cache:
+        key = (package_name, uv_upgrade_strategy, _environment_fingerprint())
+
+        if (result := _cache.get(key, _MISSING)) is not _MISSING:
+            future.set_result(result)
+            return future
+
+    thread = threading.Thread(
+        target=_run,
+        args=(future, package_name, uv_upgrade_strategy, use_cache),
+        name=f"detect-installer-prefetch-{package_name}",
+        daemon=True,
+    )
+
+    try:
+        thread.start()
+    except RuntimeError:
+        # "can't create new thread at interpreter shutdown"
+        future.set_result(
+            detect_installer(package_name, uv_upgrade_strategy, strategy="fast")
+        )
+
+    return future
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from ._detect import _LATENCY_BUCKETS_NS, _counters, _fs_calls
+
+_PREFIX = "detect_installer"
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Lookups answered by one cache layer, and those it had to pass on."""
+
+    hits: int
+    misses: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+@dataclass(frozen=True)
+class LatencyHistogram:
+    """How long the detections that ended in one branch took.
+
+    buckets holds (upper bound in seconds, cumulative count) pairs, the
+    last bound being infinity.
+    """
+
+    buckets: tuple[tuple[float, int], ...]
+    count: int
+    sum_seconds: float
+
+
+@dataclass(frozen=True)
+class Stats:
+    """A snapshot of the process-wide detection counters.
+
+    calls counts the packages asked for, through detect_installer() or
+    detect_installers(). not_found counts the detections that found no
+    installed distribution (what importlib.metadata reports as
+    PackageNotFoundError). cache maps each layer (memory, in_flight, disk,
+    dist_index, conda_meta, uv_lock) to its hits and misses, fs_calls the
+    kind of filesystem call (stat, scandir, open) to how many were made,
+    and latency the branch a detection ended in (an Installer value, or
+    "not-found") to a histogram of the detections that ran.
+    """
+
+    calls: int
+    not_found: int
+    cache: dict[str, CacheStats]
+    fs_calls: dict[str, int]
+    latency: dict[str, LatencyHistogram]
+
+    def openmetrics(self) -> str:
+        """Render the snapshot in the OpenMetrics text exposition format.
+
+        The output can be written to a Prometheus textfile collector.
+        """
+
+        lines = [
+            f"# TYPE {_PREFIX}_calls counter",
+            f"# HELP {_PREFIX}_calls Packages whose installer was asked for.",
+            f"{_PREFIX}_calls_total {self.calls}",
+            f"# TYPE {_PREFIX}_not_found counter",
+            f"# HELP {_PREFIX}_not_found Detections that found no distribution.",
+            f"{_PREFIX}_not_found_total {self.not_found}",
+        ]
+
+        for outcome in ("hits", "misses"):
+            lines.append(f"# TYPE {_PREFIX}_cache_{outcome} counter")
+            lines.append(f"# HELP {_PREFIX}_cache_{outcome} Cache {outcome} per layer.")
+            lines.extend(
+                f'{_PREFIX}_cache_{outcome}_total{{layer="{layer}"}} '
+                f"{getattr(counts, outcome)}"
+                for layer, counts in self.cache.items()
+            )
+
+        lines.append(f"# TYPE {_PREFIX}_filesystem_calls counter")
+        lines.append(f"# HELP {_PREFIX}_filesystem_calls Filesystem calls per kind.")
+        lines.extend(
+            f'{_PREFIX}_filesystem_calls_total{{call="{call}"}} {count}'
+            for call, count in self.fs_calls.items()
+        )
+
+        name = f"{_PREFIX}_detection_seconds"
+        lines.append(f"# TYPE {name} histogram")
+        lines.append(f"# UNIT {name} seconds")
+        lines.append(f"# HELP {name} Detection latency per installer branch.")
+
+        for branch, histogram in sorted(self.latency.items()):
+            labels = f'branch="{branch}"'
+            lines.extend(
+                f'{name}_bucket{{{labels},le="{_format_bound(bound)}"}} {count}'
+                for bound, count in histogram.buckets
+            )
+            lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+            lines.append(f"{name}_sum{{{labels}}} {histogram.sum_seconds!r}")
+
+        lines.append("# EOF")
+
+        return "\n".join(lines) + "\n"
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+
+def _histogram(counts: list[int]) -> LatencyHistogram:
+    bounds = [bound / 1e9 for bound in _LATENCY_BUCKETS_NS] + [float("inf")]
+    buckets = []
+    total = 0
+
+    for bound, count in zip(bounds, counts):
+        total += count
+        buckets.append((bound, total))
+
+    return LatencyHistogram(tuple(buckets), total, counts[-1] / 1e9)
+
+
+def stats() -> Stats:
+    """Return a snapshot of the detection counters since start or reset_stats()."""
+
+    return Stats(
+        calls=_counters.calls,
+        not_found=_counters.not_found,
+        cache={layer: CacheStats(*counts) for layer, counts in _counters.cache.items()},
+        fs_calls={
+            "stat": _fs_calls.stat,
+            "scandir": _fs_calls.scandir,
+            "open": _fs_calls.open,
+        },
+        latency={
+            branch: _histogram(list(counts))
+            for branch, counts in list(_counters.latency.items())
+        },
+    )
+
+
+def reset_stats() -> None:
+    """Set every detection counter back to zero."""
+
+    _counters.reset()
+    _fs_calls.stat = _fs_calls.scandir = _fs_calls.open = 0
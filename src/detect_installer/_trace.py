@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from ._detect import (
+    Installer,
+    InstallerInfo,
+    _brew_formula,
+    _conda_packages,
+    _detect_conda_environment,
+    _dist_info_index,
+    _DistInfo,
+    _Environment,
+    _fs_calls,
+    _get_upgrade_cmd,
+    _is_brew_environment,
+    _is_pipx_environment,
+    _is_uv_tool_environment,
+    _normalize_name,
+    _read_dist_info,
+    _resolve_uv_upgrade_strategy,
+    _search_uv_project,
+    _uv_project_search_start,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from ._detect import UvUpgradeStrategy
+
+
+@dataclass(frozen=True)
+class ProbeTrace:
+    """One step of a detection: what it looked at, what it found and its cost."""
+
+    name: str
+    inputs: dict[str, Any]
+    outcome: Any
+    matched: bool
+    elapsed_ns: int
+    fs_calls: int
+
+
+@dataclass(frozen=True)
+class DetectionTrace:
+    """The ordered probes run by explain_installer() and their result.
+
+    requested tells whether the distribution has a REQUESTED file, i.e. it
+    was installed by name rather than as a dependency; it is None when the
+    detection was decided before its metadata was read.
+    """
+
+    package_name: str
+    result: InstallerInfo | None
+    probes: list[ProbeTrace] = field(default_factory=list)
+    requested: bool | None = None
+
+    @property
+    def elapsed_ns(self) -> int:
+        return sum(probe.elapsed_ns for probe in self.probes)
+
+    @property
+    def fs_calls(self) -> int:
+        return sum(probe.fs_calls for probe in self.probes)
+
+    @property
+    def decided_by(self) -> ProbeTrace | None:
+        """The probe whose outcome determined the result, if any."""
+
+        return next((probe for probe in reversed(self.probes) if probe.matched), None)
+
+
+class _Recorder:
+    def __init__(self) -> None:
+        self.probes: list[ProbeTrace] = []
+        self.requested: bool | None = None
+
+    def run(
+        self,
+        name: str,
+        inputs: dict[str, Any],
+        probe: Callable[[], Any],
+        matched: Callable[[Any], bool] = bool,
+    ) -> Any:
+        fs_before = _fs_calls.total()
+        start = time.perf_counter_ns()
+        outcome = probe()
+        elapsed = time.perf_counter_ns() - start
+
+        self.probes.append(
+            ProbeTrace(
+                name,
+                inputs,
+                outcome,
+                matched(outcome),
+                elapsed,
+                _fs_calls.total() - fs_before,
+            )
+        )
+
+        return outcome
+
+
+def explain_installer(
+    package_name: str,
+    uv_upgrade_strategy: UvUpgradeStrategy = "add",
+    *,
+    environment: str | os.PathLike[str] | None = None,
+) -> tuple[InstallerInfo | None, DetectionTrace]:
+    """Detect the installer of a package and explain how it was decided.
+
+    Runs the same ordered probes as detect_installer() (locating the
+    distribution, pipx, uv tool, conda and whether conda-meta lists the
+    package, brew and the formula owning the package, INSTALLER metadata
+    and the uv project lookup), bypassing the result cache, and records
+    each probe's inputs, outcome, elapsed nanoseconds and filesystem call
+    count.
+    detect_installer() itself is not instrumented, so tracing costs nothing
+    unless this function is called.
+
+    Filesystem call counts are process-wide, so they also include calls
+    made by other threads while a probe runs.
+    """
+
+    if environment is None:
+        env = _Environment.current()
+    else:
+        env = _Environment.from_prefix(environment)
+
+    recorder = _Recorder()
+    result = _explain(package_name, uv_upgrade_strategy, env, recorder)
+
+    return result, DetectionTrace(
+        package_name, result, recorder.probes, recorder.requested
+    )
+
+
+def _explain(
+    package_name: str,
+    uv_upgrade_strategy: UvUpgradeStrategy,
+    env: _Environment,
+    recorder: _Recorder,
+) -> InstallerInfo | None:
+    def _result(installer: Installer) -> InstallerInfo:
+        return InstallerInfo(
+            installer,
+            _get_upgrade_cmd(
+                installer, package_name, uv_upgrade_strategy, dist.direct_url
+            ),
+        )
+
+    name = _normalize_name(package_name)
+    dist_path = recorder.run(
+        "distribution",
+        {"name": name, "path": list(env.path)},
+        lambda: _dist_info_index.find({name}, env.path).get(name),
+        matched=lambda dist_path: dist_path is None,
+    )
+
+    if dist_path is None:
+        return None
+
+    dist = _DistInfo(dist_path)
+
+    def _read_installer() -> str | None:
+        nonlocal dist
+        dist = _read_dist_info(dist_path)
+        recorder.requested = dist.requested
+        return dist.installer
+
+    if recorder.run("pipx", {"prefix": env.prefix}, lambda: _is_pipx_environment(env)):
+        return _result(Installer.PIPX)
+
+    if recorder.run(
+        "uv-tool", {"prefix": env.prefix}, lambda: _is_uv_tool_environment(env)
+    ):
+        return _result(Installer.UV_TOOL)
+
+    conda_inputs = {
+        "prefix": env.prefix,
+        "conda_prefix": env.conda_prefix,
+        "mamba_exe": env.mamba_exe,
+    }
+    conda = recorder.run("conda", conda_inputs, lambda: _detect_conda_environment(env))
+
+    if conda is not None:
+        if recorder.run(
+            "conda-meta",
+            {"conda_meta": os.path.join(env.prefix, "conda-meta"), "name": name},
+            lambda: name in _conda_packages(env),
+        ):
+            return _result(conda)
+    elif recorder.run(
+        "brew",
+        {
+            "executable": env.executable,
+            "homebrew_prefix": env.homebrew_prefix,
+            "homebrew_cellar": env.homebrew_cellar,
+        },
+        lambda: _is_brew_environment(env),
+    ):
+        formula = recorder.run(
+            "brew-formula",
+            {"dist_info": dist_path},
+            lambda: _brew_formula(dist_path, env),
+            matched=lambda formula: formula is not None,
+        )
+
+        if formula is not None:
+            return InstallerInfo(
+                Installer.BREW,
+                _get_upgrade_cmd(Installer.BREW, formula, uv_upgrade_strategy),
+            )
+
+    metadata_value = recorder.run(
+        "installer-metadata",
+        {"dist_info": dist_path},
+        _read_installer,
+        matched=lambda value: value in ("pip", "uv", "conda"),
+    )
+
+    if metadata_value == "uv":
+        start, include_start = _uv_project_search_start(env)
+        root = recorder.run(
+            "uv-project",
+            {"start": start, "include_start": include_start},
+            lambda: _search_uv_project(start, include_start)[0],
+            matched=lambda root: root is not None,
+        )
+
+        if root is None:
+            return _result(Installer.UV_PIP)
+
+        if uv_upgrade_strategy == "auto":
+            uv_upgrade_strategy = recorder.run(
+                "uv-dependency",
+                {"project_root": root, "name": name},
+                lambda: _resolve_uv_upgrade_strategy("auto", root, name),
+            )
+
+        return _result(Installer.UV)
+
+    if metadata_value == "pip":
+        return _result(Installer.PIP)
+
+    if metadata_value == "conda":
+        return _result(conda or Installer.CONDA)
+
+    return InstallerInfo(Installer.UNKNOWN, None)
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import re
+
+# PEP 440 public versions, in their normalized and permitted spellings.
+_VERSION = re.compile(
+    r"""
+    v?
+    (?:(?P<epoch>\d+)!)?
+    (?P<release>\d+(?:\.\d+)*)
+    (?:[-_.]?(?P<pre>a|b|c|rc|alpha|beta|pre|preview)[-_.]?(?P<pre_n>\d*))?
+    (?:-(?P<post_implicit>\d+)|[-_.]?(?:post|rev|r)[-_.]?(?P<post_n>\d*))?
+    (?:[-_.]?(?P<dev>dev)[-_.]?(?P<dev_n>\d*))?
+    (?:\+[a-z0-9]+(?:[-_.][a-z0-9]+)*)?
+    """,
+    re.VERBOSE | re.IGNORECASE,
+)
+
+_PRE_PHASES = {
+    "a": 0,
+    "alpha": 0,
+    "b": 1,
+    "beta": 1,
+    "c": 2,
+    "rc": 2,
+    "pre": 2,
+    "preview": 2,
+}
+
+_Key = tuple[int, tuple[int, ...], tuple[int, int], int, tuple[int, int]]
+
+
+def version_key(version: str) -> _Key | None:
+    """Return a key that sorts versions as PEP 440 does, or None if invalid.
+
+    Local version labels are ignored.
+    """
+
+    match = _VERSION.fullmatch(version.strip())
+
+    if match is None:
+        return None
+
+    release = [int(part) for part in match["release"].split(".")]
+
+    while len(release) > 1 and release[-1] == 0:
+        release.pop()
+
+    post = match["post_implicit"] or match["post_n"]
+    has_post = post is not None
+    dev = match["dev"] is not None
+
+    if match["pre"]:
+        pre = (_PRE_PHASES[match["pre"].lower()], int(match["pre_n"] or 0))
+    elif dev and not has_post:
+        # 1.0.dev0 comes before 1.0a0.
+        pre = (-1, 0)
+    else:
+        pre = (3, 0)
+
+    return (
+        int(match["epoch"] or 0),
+        tuple(release),
+        pre,
+        int(post or 0) if has_post else -1,
+        (0, int(match["dev_n"] or 0)) if dev else (1, 0),
+    )
+
+
+def is_prerelease(version: str) -> bool:
+    """Whether the version is a pre-release or development release."""
+
+    key = version_key(version)
+
+    return key is not None and (key[2][0] < 3 or key[4][0] == 0)
+
+
+def is_newer(candidate: str, current: str) -> bool:
+    """Whether candidate is a later version than current.
+
+    Versions that are not valid PEP 440 are compared for inequality only.
+    """
+
+    candidate_key = version_key(candidate)
+    current_key = version_key(current)
+
+    if candidate_key is None or current_key is None:
+        return candidate.strip() != current.strip()
+
+    return candidate_key > current_key
@@ -44,4 +44,5 @@ def test_conda(tmp_path: Path, library_pkg, conda_exe) -> None:
     )
     env = {**os.environ, "CONDA_PREFIX": str(env_path)}
     data = run_cli(conda_python, tmp_path, env=env)
-    assert data["installer"] == "conda"
+    # pip-installed inside the conda env: conda-meta does not list it.
+    assert data["installer"] == "pip"
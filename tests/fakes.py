@@ -0,0 +1,143 @@
+"""Builders for fake installer environments.
+
+These only depend on the standard library so that they can be shared by the
+pytest fixtures in conftest.py and by the benchmarks package.
+"""
+
+from __future__ import annotations
+
+import importlib
+import os
+import sys
+from pathlib import Path
+from typing import Any, Protocol
+
+
+class Patcher(Protocol):
+    """The subset of pytest's MonkeyPatch used by build_fake_env."""
+
+    def setattr(self, target: str, value: Any) -> None: ...
+
+    def setenv(self, name: str, value: str) -> None: ...
+
+
+class SimplePatcher:
+    """A stdlib stand-in for pytest's MonkeyPatch, usable as a context manager."""
+
+    def __init__(self) -> None:
+        self._undo: list[tuple[Any, str, Any]] = []
+        self._env_undo: list[tuple[str, str | None]] = []
+
+    def setattr(self, target: str, value: Any) -> None:
+        module_name, _, attr = target.rpartition(".")
+        owner = importlib.import_module(module_name)
+        self._undo.append((owner, attr, getattr(owner, attr)))
+        setattr(owner, attr, value)
+
+    def setenv(self, name: str, value: str) -> None:
+        self._env_undo.append((name, os.environ.get(name)))
+        os.environ[name] = value
+
+    def undo(self) -> None:
+        for owner, attr, value in reversed(self._undo):
+            setattr(owner, attr, value)
+
+        for name, value in reversed(self._env_undo):
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+        self._undo.clear()
+        self._env_undo.clear()
+
+    def __enter__(self) -> SimplePatcher:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.undo()
+
+
+def make_dist_info(
+    site_packages: Path, pkg_name: str, installer_value: str | None
+) -> Path:
+    """Create a minimal dist-info directory with INSTALLER and METADATA files."""
+    dist_info = site_packages / f"{pkg_name}-1.0.0.dist-info"
+    dist_info.mkdir(parents=True, exist_ok=True)
+
+    (dist_info / "METADATA").write_text(
+        f"Metadata-Version: 2.1\nName: {pkg_name}\nVersion: 1.0.0\n"
+    )
+
+    if installer_value is not None:
+        (dist_info / "INSTALLER").write_text(installer_value)
+
+    return dist_info
+
+
+def build_fake_env(root: Path, spec: dict, patcher: Patcher) -> None:
+    """Build a fake installer environment under root.
+
+    Sets up:
+    - Directory structure under root
+    - Patches sys.prefix, sys.executable, env vars
+    - Prepends the fake site-packages directory to sys.path
+
+    The spec dict supports:
+        prefix: str - relative path under root for sys.prefix
+        executable: str - relative path under root for sys.executable
+        site_packages: str - relative path under root for site-packages
+        pkg_name: str - package name (default: "mypkg")
+        installer_value: str | None - content of INSTALLER file
+        env: dict[str, str] - environment variables to set
+        extra_files: dict[str, str] - extra files to create (relative to root)
+        no_package: bool - if True, don't create dist-info at all
+        conda_packages: list[str] - names to record in <prefix>/conda-meta
+        brew_formula: str - install the package in a keg of this Homebrew
+            formula under <root>/Cellar and link its dist-info from
+            site-packages, as brew does
+    """
+
+    prefix = root / spec["prefix"]
+    prefix.mkdir(parents=True, exist_ok=True)
+    patcher.setattr("sys.prefix", str(prefix))
+
+    executable = spec.get("executable", spec["prefix"] + "/bin/python3")
+    patcher.setattr("sys.executable", str(root / executable))
+
+    for key, value in spec.get("env", {}).items():
+        patcher.setenv(key, value)
+
+    for rel_path, content in spec.get("extra_files", {}).items():
+        file_path = root / rel_path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(content)
+
+    for name in spec.get("conda_packages", ()):
+        conda_meta = prefix / "conda-meta"
+        conda_meta.mkdir(exist_ok=True)
+        (conda_meta / f"{name}-1.0.0-py_0.json").write_text("{}")
+
+    pkg_name = spec.get("pkg_name", "mypkg")
+
+    if not spec.get("no_package"):
+        site_packages_rel = spec.get(
+            "site_packages", spec["prefix"] + "/lib/python3.12/site-packages"
+        )
+        site_packages = root / site_packages_rel
+        site_packages.mkdir(parents=True, exist_ok=True)
+
+        installer_value = spec.get("installer_value")
+
+        if formula := spec.get("brew_formula"):
+            keg = root / "Cellar" / formula / "1.0.0"
+            keg.mkdir(parents=True, exist_ok=True)
+            (keg / "INSTALL_RECEIPT.json").write_text("{}")
+            dist_info = make_dist_info(
+                keg / "lib/python3.12/site-packages", pkg_name, installer_value
+            )
+            (site_packages / dist_info.name).symlink_to(dist_info)
+        else:
+            make_dist_info(site_packages, pkg_name, installer_value)
+
+        patcher.setattr("sys.path", [str(site_packages), *sys.path])
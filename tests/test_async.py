@@ -0,0 +1,140 @@
+"""Tests for the asyncio API."""
+
+import asyncio
+import threading
+
+import pytest
+
+from detect_installer import (
+    Installer,
+    detect_installer,
+    detect_installer_async,
+    detect_installers,
+    detect_installers_async,
+)
+from detect_installer._async import _resolve
+from tests.fakes import make_dist_info
+
+
+@pytest.fixture()
+def blocked_detection(monkeypatch):
+    """Make detections wait until released, recording the names requested."""
+    release = threading.Event()
+    calls = []
+
+    from detect_installer import _async
+
+    original = _async.detect_installers
+
+    def _blocking(names, strategy, *, use_cache):
+        calls.append(list(names))
+        release.wait(timeout=5)
+        return original(names, strategy, use_cache=use_cache)
+
+    monkeypatch.setattr("detect_installer._async.detect_installers", _blocking)
+    yield release, calls
+    release.set()
+
+
+def test_matches_sync_api(fake_env, tmp_path):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+    make_dist_info(
+        tmp_path / "myproject/.venv/lib/python3.12/site-packages", "other", "uv"
+    )
+
+    single = asyncio.run(detect_installer_async("mypkg", use_cache=False))
+    batch = asyncio.run(
+        detect_installers_async(["mypkg", "other", "missing"], use_cache=False)
+    )
+
+    assert single == detect_installer("mypkg", use_cache=False)
+    assert batch == detect_installers(["mypkg", "other", "missing"], use_cache=False)
+    assert batch["other"] is not None
+    assert batch["other"].installer is Installer.UV_PIP
+
+
+def test_concurrent_requests_are_deduplicated(fake_env, blocked_detection):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+    release, calls = blocked_detection
+
+    async def main():
+        tasks = [
+            asyncio.ensure_future(detect_installer_async("mypkg")) for _ in range(5)
+        ]
+        await asyncio.sleep(0.05)
+        release.set()
+        return await asyncio.gather(*tasks)
+
+    results = asyncio.run(main())
+
+    assert calls == [["mypkg"]]
+    assert len({id(result) for result in results}) == 1
+
+
+def test_memoized_results_skip_the_executor(fake_env, blocked_detection):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+    _, calls = blocked_detection
+    expected = detect_installer("mypkg")
+
+    assert asyncio.run(detect_installer_async("mypkg")) is expected
+    assert calls == []
+
+
+def test_timeout(fake_env, blocked_detection):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(detect_installer_async("mypkg", timeout=0.01))
+
+
+def test_cancelling_one_waiter_does_not_cancel_the_others(fake_env, blocked_detection):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+    release, _ = blocked_detection
+
+    async def main():
+        cancelled = asyncio.ensure_future(detect_installer_async("mypkg"))
+        survivor = asyncio.ensure_future(detect_installer_async("mypkg"))
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        return await survivor
+
+    result = asyncio.run(main())
+
+    assert result is not None
+    assert result.installer is Installer.PIP
+
+
+def test_failures_reach_every_caller(fake_env, monkeypatch):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+
+    def _failing(names, strategy, *, use_cache):
+        raise OSError("disk went away")
+
+    monkeypatch.setattr("detect_installer._async.detect_installers", _failing)
+
+    with pytest.raises(OSError, match="disk went away"):
+        asyncio.run(detect_installers_async(["mypkg", "other", "mypkg"]))
+
+
+def test_cancelled_jobs_cancel_the_waiting_futures():
+    async def main():
+        loop = asyncio.get_running_loop()
+        job = loop.create_future()
+        job.cancel()
+        answered, waiting = loop.create_future(), loop.create_future()
+        answered.set_result(None)
+        futures = {("a", "add", True): answered, ("b", "add", True): waiting}
+        in_flight = dict(futures)
+
+        _resolve(in_flight, futures, job)
+
+        return in_flight, answered, waiting
+
+    in_flight, answered, waiting = asyncio.run(main())
+
+    assert in_flight == {}
+    assert answered.result() is None
+    assert waiting.cancelled()
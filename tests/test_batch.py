@@ -0,0 +1,76 @@
+"""Tests for detect_installers, the multi-package variant of detect_installer."""
+
+from detect_installer import Installer, _detect, detect_installer, detect_installers
+from detect_installer._detect import _normalize_name
+from tests.fakes import make_dist_info
+
+
+def test_batch_matches_single_package_results(fake_env, tmp_path):
+    fake_env(
+        {
+            "prefix": "myproject/.venv",
+            "installer_value": "uv",
+            "extra_files": {"myproject/uv.lock": ""},
+        }
+    )
+    site_packages = tmp_path / "myproject/.venv/lib/python3.12/site-packages"
+    make_dist_info(site_packages, "other_pkg", "pip")
+
+    results = detect_installers(["mypkg", "other-pkg", "missing"], use_cache=False)
+
+    assert results == {
+        "mypkg": detect_installer("mypkg", use_cache=False),
+        "other-pkg": detect_installer("other-pkg", use_cache=False),
+        "missing": None,
+    }
+    assert results["mypkg"] is not None
+    assert results["mypkg"].installer is Installer.UV
+    assert results["other-pkg"] is not None
+    assert results["other-pkg"].installer is Installer.PIP
+
+
+def test_batch_runs_environment_probes_once(fake_env, tmp_path, monkeypatch):
+    fake_env({"prefix": "home/.local/pipx/venvs/mypkg", "installer_value": "pip"})
+    site_packages = (
+        tmp_path / "home/.local/pipx/venvs/mypkg/lib/python3.12/site-packages"
+    )
+    for name in ("a", "b", "c"):
+        make_dist_info(site_packages, name, "pip")
+
+    calls = []
+    probe = _detect._detect_environment
+    monkeypatch.setattr(
+        "detect_installer._detect._detect_environment",
+        lambda env: calls.append(1) or probe(env),
+    )
+
+    results = detect_installers(["a", "b", "c", "mypkg"])
+
+    assert len(calls) == 1
+    assert {info.installer for info in results.values() if info} == {Installer.PIPX}
+
+
+def test_batch_uses_and_fills_cache(fake_env):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+
+    single = detect_installer("mypkg")
+    batch = detect_installers(["mypkg", "missing"])
+
+    assert batch["mypkg"] is single
+    assert detect_installer("missing") is None
+
+
+def test_batch_deduplicates_names(fake_env):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+
+    assert list(detect_installers(["mypkg", "mypkg"])) == ["mypkg"]
+
+
+def test_batch_not_installed_at_all(fake_env):
+    fake_env({"prefix": "myproject/.venv", "no_package": True})
+
+    assert detect_installers(["nope"]) == {"nope": None}
+
+
+def test_normalize_name():
+    assert _normalize_name("Foo.Bar__baz-_-qux") == "foo-bar-baz-qux"
@@ -0,0 +1,149 @@
+"""Tests for telling Homebrew formulae from packages pip-installed into brew's Python."""
+
+import os
+import sys
+
+import pytest
+
+from detect_installer import Installer, detect_installer, detect_installers
+from detect_installer._detect import (
+    _brew_formula,
+    _brew_kegs,
+    _Environment,
+    _is_brew_environment,
+)
+from tests.fakes import make_dist_info
+
+pytestmark = pytest.mark.skipif(
+    sys.platform == "win32", reason="brew paths are Unix-only"
+)
+
+
+@pytest.fixture()
+def custom_prefix(fake_env, tmp_path, monkeypatch):
+    """Homebrew under a custom prefix, with its python3 linked from elsewhere."""
+
+    brew = tmp_path / "brew"
+    fake_env(
+        {
+            "prefix": "brew/Cellar/python@3.12/3.12.1",
+            "installer_value": "pip",
+            "env": {"HOMEBREW_PREFIX": str(brew)},
+        }
+    )
+    python = tmp_path / "brew/Cellar/python@3.12/3.12.1/bin/python3"
+    python.parent.mkdir()
+    python.write_text("")
+    (tmp_path / "bin").mkdir()
+    (tmp_path / "bin/python3").symlink_to(python)
+    monkeypatch.setattr(sys, "executable", str(tmp_path / "bin/python3"))
+    return brew
+
+
+def _link_formula(site_packages, cellar, formula, pkg_name):
+    keg = cellar / formula / "2.0.0"
+    keg.mkdir(parents=True)
+    (keg / "INSTALL_RECEIPT.json").write_text("{}")
+    dist_info = make_dist_info(keg / "libexec/site-packages", pkg_name, "pip")
+    (site_packages / dist_info.name).symlink_to(dist_info)
+
+
+def test_homebrew_prefix_is_honoured(custom_prefix, monkeypatch):
+    assert _is_brew_environment(_Environment.current())
+
+    monkeypatch.delenv("HOMEBREW_PREFIX")
+    assert not _is_brew_environment(_Environment.current())
+
+
+def test_symlinked_executable_is_resolved(custom_prefix):
+    env = _Environment.current()
+
+    # Only the resolved executable lies under HOMEBREW_PREFIX.
+    assert _is_brew_environment(env)
+    assert not _is_brew_environment(env, resolve_symlinks=False)
+
+
+def test_formula_is_named_after_its_keg(custom_prefix):
+    site_packages = custom_prefix / "Cellar/python@3.12/3.12.1/lib/python3.12"
+    _link_formula(
+        site_packages / "site-packages", custom_prefix / "Cellar", "tool", "lib"
+    )
+
+    info = detect_installer("lib")
+
+    assert info is not None
+    assert info.installer is Installer.BREW
+    assert info.upgrade_cmd == "brew upgrade tool"
+
+
+def test_pip_installed_packages_are_not_brew_owned(custom_prefix):
+    info = detect_installer("mypkg")
+
+    assert info is not None
+    assert info.installer is Installer.PIP
+    assert info.upgrade_cmd == "pip install -U mypkg"
+
+
+def test_kegs_without_a_receipt_are_not_owned(custom_prefix):
+    site_packages = custom_prefix / "Cellar/python@3.12/3.12.1/lib/python3.12"
+    _link_formula(
+        site_packages / "site-packages", custom_prefix / "Cellar", "tool", "lib"
+    )
+    os.remove(custom_prefix / "Cellar/tool/2.0.0/INSTALL_RECEIPT.json")
+
+    result = detect_installer("lib")
+
+    assert result is not None
+    assert result.installer is Installer.PIP
+
+
+def test_homebrew_cellar_is_honoured(tmp_path):
+    cellar = tmp_path / "kegs"
+    site_packages = tmp_path / "site-packages"
+    site_packages.mkdir()
+    _link_formula(site_packages, cellar, "tool", "lib")
+    env = _Environment(
+        str(tmp_path),
+        "/usr/bin/python3",
+        [str(site_packages)],
+        homebrew_cellar=str(cellar),
+    )
+
+    dist_path = str(site_packages / "lib-1.0.0.dist-info")
+
+    assert _brew_formula(dist_path, env) == "tool"
+
+
+def test_receipts_are_checked_once_per_keg(custom_prefix, monkeypatch):
+    site_packages = (
+        custom_prefix / "Cellar/python@3.12/3.12.1/lib/python3.12/site-packages"
+    )
+    _link_formula(site_packages, custom_prefix / "Cellar", "tool", "lib")
+    make_dist_info(
+        custom_prefix / "Cellar/tool/2.0.0/libexec/site-packages", "dep", "pip"
+    )
+    (site_packages / "dep-1.0.0.dist-info").symlink_to(
+        custom_prefix / "Cellar/tool/2.0.0/libexec/site-packages/dep-1.0.0.dist-info"
+    )
+
+    resolved = []
+    realpath = os.path.realpath
+    monkeypatch.setattr(
+        os.path, "realpath", lambda path: resolved.append(path) or realpath(path)
+    )
+
+    results = detect_installers(["lib", "dep", "mypkg"])
+    calls = len(resolved)
+    detect_installer("lib", use_cache=False)
+
+    assert None not in results.values()
+    assert {name: info.upgrade_cmd for name, info in results.items() if info} == {
+        "lib": "brew upgrade tool",
+        "dep": "brew upgrade tool",
+        "mypkg": "pip install -U mypkg",
+    }
+    # The executable, the prefix and each distribution are resolved once,
+    # and the shared keg's receipt is looked up once.
+    assert calls == len(set(resolved)) == 5
+    assert len(resolved) == calls
+    assert _brew_kegs == {str(custom_prefix / "Cellar/tool/2.0.0"): True}
@@ -0,0 +1,91 @@
+"""Tests for the in-memory result cache of detect_installer."""
+
+from detect_installer import Installer, clear_cache, detect_installer
+
+
+def _count_distribution_calls(monkeypatch):
+    from detect_installer import _detect
+
+    calls = []
+    original = _detect._find_distributions
+
+    def _counting(names: set[str], path: list[str]):
+        calls.extend(sorted(names))
+        return original(names, path)
+
+    monkeypatch.setattr("detect_installer._detect._find_distributions", _counting)
+    return calls
+
+
+def test_repeat_calls_are_cached(fake_env, monkeypatch):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+    calls = _count_distribution_calls(monkeypatch)
+
+    first = detect_installer("mypkg")
+    second = detect_installer("mypkg")
+
+    assert first is second
+    assert first is not None
+    assert first.installer is Installer.PIP
+    assert calls == ["mypkg"]
+
+
+def test_not_found_is_cached(fake_env, monkeypatch):
+    fake_env({"prefix": "myproject/.venv", "no_package": True})
+    calls = _count_distribution_calls(monkeypatch)
+
+    assert detect_installer("missing") is None
+    assert detect_installer("missing") is None
+    assert calls == ["missing"]
+
+
+def test_strategy_is_part_of_the_key(fake_env):
+    fake_env(
+        {
+            "prefix": "myproject/.venv",
+            "installer_value": "uv",
+            "extra_files": {"myproject/uv.lock": ""},
+        }
+    )
+
+    add = detect_installer("mypkg")
+    lock = detect_installer("mypkg", uv_upgrade_strategy="lock")
+
+    assert add is not None and lock is not None
+    assert add.upgrade_cmd == "uv add mypkg --upgrade-package mypkg"
+    assert lock.upgrade_cmd == "uv lock --upgrade-package mypkg"
+
+
+def test_environment_change_invalidates(fake_env, monkeypatch, tmp_path):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+    result = detect_installer("mypkg")
+    assert result is not None
+    assert result.installer is Installer.PIP
+
+    (tmp_path / "myproject/.venv/conda-meta").mkdir()
+    (tmp_path / "myproject/.venv/conda-meta/mypkg-1.0-0.json").write_text("{}")
+    monkeypatch.setenv("CONDA_PREFIX", str(tmp_path / "myproject/.venv"))
+    result = detect_installer("mypkg")
+    assert result is not None
+    assert result.installer is Installer.CONDA
+
+
+def test_use_cache_false_bypasses_cache(fake_env, monkeypatch):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+    calls = _count_distribution_calls(monkeypatch)
+
+    detect_installer("mypkg", use_cache=False)
+    detect_installer("mypkg", use_cache=False)
+
+    assert calls == ["mypkg", "mypkg"]
+
+
+def test_clear_cache(fake_env, monkeypatch):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+    calls = _count_distribution_calls(monkeypatch)
+
+    detect_installer("mypkg")
+    clear_cache()
+    detect_installer("mypkg")
+
+    assert calls == ["mypkg", "mypkg"]
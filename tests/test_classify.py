@@ -0,0 +1,123 @@
+"""Tests for the path classifier and classify_prefixes()."""
+
+import itertools
+import sys
+from pathlib import PurePosixPath
+
+import pytest
+
+from detect_installer import Installer, classify_prefixes, detect_installer
+from detect_installer._detect import _detect_environment, _Environment
+
+
+def _reference(prefix: str, executable: str) -> Installer | None:
+    """The substring checks the classifier replaced, kept as an oracle."""
+
+    if "pipx/venvs" in prefix or "pipx\\venvs" in prefix:
+        return Installer.PIPX
+    if "/uv/tools/" in prefix or "\\uv\\tools\\" in prefix:
+        return Installer.UV_TOOL
+    parts = prefix.lower().replace("\\", "/").split("/")
+    if any(
+        part.startswith(("conda", "miniconda", "miniforge", "mambaforge"))
+        for part in parts
+    ):
+        return Installer.CONDA
+    exe = executable.lower()
+    if any(
+        p in exe for p in ("/opt/homebrew/", "/usr/local/cellar/", "/home/linuxbrew/")
+    ):
+        return Installer.BREW
+    return None
+
+
+SEGMENTS = [
+    "home",
+    "pipx",
+    "venvs",
+    "uv",
+    "tools",
+    "Miniconda3",
+    "condabin",
+    "anaconda3",
+    "opt",
+    "homebrew",
+    "usr",
+    "local",
+    "Cellar",
+    "linuxbrew",
+]
+
+
+def _combinations():
+    for length in range(1, 5):
+        for parts in itertools.product(SEGMENTS, repeat=length):
+            yield "/" + "/".join(parts)
+
+
+def test_matches_the_previous_checks_for_every_combination():
+    prefixes = list(_combinations())
+
+    results = classify_prefixes(prefixes)
+
+    assert results == [_reference(p, p + "/bin/python") for p in prefixes]
+
+
+def test_environment_probes_match_the_previous_checks(monkeypatch):
+    monkeypatch.delenv("CONDA_PREFIX", raising=False)
+    monkeypatch.delenv("MAMBA_EXE", raising=False)
+
+    for prefix in _combinations():
+        for executable in (prefix + "/bin/python", "/opt/homebrew/bin/python3"):
+            env = _Environment(prefix, executable, [])
+            assert _detect_environment(env) == _reference(prefix, executable), prefix
+
+
+@pytest.mark.parametrize(
+    ("path", "expected"),
+    [
+        ("/home/user/.local/pipx/venvs/black", Installer.PIPX),
+        ("C:\\Users\\me\\pipx\\venvs\\black", Installer.PIPX),
+        ("/home/user/.local/share/uv/tools/ruff", Installer.UV_TOOL),
+        ("C:\\Users\\me\\AppData\\Roaming\\uv\\tools\\ruff", Installer.UV_TOOL),
+        ("/home/user/miniforge3/envs/data", Installer.CONDA),
+        ("/opt/homebrew/Cellar/python@3.12/3.12.1", Installer.BREW),
+        ("/home/linuxbrew/.linuxbrew/opt/python@3.12", Installer.BREW),
+        ("/home/user/project/.venv", None),
+        # Precedence: pipx > uv tool > conda > brew.
+        ("/opt/homebrew/miniconda3/pipx/venvs/tool", Installer.PIPX),
+        ("/home/conda/uv/tools/ruff", Installer.UV_TOOL),
+        ("/opt/homebrew/miniconda3", Installer.CONDA),
+        # Markers must not swallow each other's slashes.
+        ("/x/uv/tools/conda3", Installer.UV_TOOL),
+        ("/opt/homebrew/conda3", Installer.CONDA),
+    ],
+)
+def test_classify_prefixes(path, expected):
+    assert classify_prefixes([path]) == [expected]
+
+
+def test_accepts_path_like_objects_and_keeps_order():
+    paths = [
+        PurePosixPath("/a/pipx/venvs/x"),
+        "/a/.venv",
+        PurePosixPath("/a/pipx/venvs/x"),
+    ]
+
+    assert classify_prefixes(paths) == [Installer.PIPX, None, Installer.PIPX]
+
+
+def test_classify_prefixes_ignores_the_running_environment(monkeypatch):
+    monkeypatch.setenv("CONDA_PREFIX", "/a/.venv")
+    monkeypatch.setenv("MAMBA_EXE", "/usr/bin/mamba")
+
+    assert classify_prefixes(["/a/.venv", "/a/miniforge3"]) == [None, Installer.CONDA]
+
+
+def test_agrees_with_detect_installer(fake_env):
+    fake_env({"prefix": "home/.local/share/uv/tools/mypkg", "installer_value": "uv"})
+
+    result = detect_installer("mypkg")
+
+    assert result is not None
+    assert [result.installer] == classify_prefixes([sys.prefix])
@@ -0,0 +1,175 @@
+"""Tests for the detect-installer command."""
+
+import json
+import os
+import runpy
+import sys
+
+import pytest
+
+from detect_installer._cli import (
+    EXIT_NOT_INSTALLED,
+    EXIT_OK,
+    EXIT_UNKNOWN_INSTALLER,
+    EXIT_USAGE,
+    _parse,
+    _parse_fast,
+    main,
+)
+from tests.fakes import make_dist_info
+
+
+@pytest.fixture()
+def site_packages(fake_env, tmp_path, monkeypatch):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+    site_packages = tmp_path / "myproject/.venv/lib/python3.12/site-packages"
+    make_dist_info(site_packages, "mystery", None)
+    monkeypatch.setattr("sys.path", [str(site_packages)])
+    return site_packages
+
+
+def test_text_output(site_packages, capsys):
+    assert main(["mypkg"]) == EXIT_OK
+
+    assert capsys.readouterr().out == "mypkg\tpip\tpip install -U mypkg\n"
+
+
+def test_several_packages_as_json(site_packages, capsys):
+    assert main(["mypkg", "missing", "--json"]) == EXIT_NOT_INSTALLED
+
+    assert json.loads(capsys.readouterr().out) == [
+        {"name": "mypkg", "installer": "pip", "upgrade_cmd": "pip install -U mypkg"},
+        {"name": "missing", "installer": None, "upgrade_cmd": None},
+    ]
+
+
+def test_ndjson_output(site_packages, capsys):
+    main(["--ndjson", "mypkg", "mystery"])
+
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+    assert [line["installer"] for line in lines] == ["pip", "unknown"]
+
+
+@pytest.mark.parametrize(
+    ("packages", "status"),
+    [
+        (["mypkg"], EXIT_OK),
+        (["mystery"], EXIT_UNKNOWN_INSTALLER),
+        (["missing"], EXIT_NOT_INSTALLED),
+        (["mystery", "missing"], EXIT_NOT_INSTALLED),
+    ],
+)
+def test_exit_status(site_packages, packages, status):
+    assert main(packages) == status
+
+
+def test_all_reports_versions(site_packages, capsys):
+    # mystery has no INSTALLER file.
+    assert main(["--all"]) == EXIT_UNKNOWN_INSTALLER
+
+    assert sorted(capsys.readouterr().out.splitlines()) == [
+        "mypkg\t1.0.0\tpip\tpip install -U mypkg",
+        "mystery\t1.0.0\tunknown\t-",
+    ]
+
+
+def test_environment(tmp_path, capsys):
+    prefix = tmp_path / "other"
+    make_dist_info(prefix / "lib/python3.12/site-packages", "mypkg", "uv")
+
+    assert main(["--environment", str(prefix), "mypkg"]) == EXIT_OK
+
+    assert capsys.readouterr().out.split("\t")[1] == "uv-pip"
+
+
+def test_missing_environment(tmp_path, capsys):
+    assert main([f"--environment={tmp_path / 'nope'}", "mypkg"]) == EXIT_USAGE
+
+    assert "environment not found" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        [],
+        ["--all", "mypkg"],
+        ["--json", "--ndjson", "mypkg"],
+        ["--uv-upgrade-strategy", "sync", "mypkg"],
+        ["--workers", "many", "--all"],
+        ["--environment"],
+        ["--bogus", "mypkg"],
+    ],
+)
+def test_usage_errors(argv, capsys):
+    with pytest.raises(SystemExit) as exc_info:
+        main(argv)
+
+    assert exc_info.value.code == EXIT_USAGE
+    assert "usage: detect-installer" in capsys.readouterr().err
+
+
+def test_help(capsys):
+    with pytest.raises(SystemExit) as exc_info:
+        main(["--help"])
+
+    assert exc_info.value.code == 0
+    assert "exit status:" in capsys.readouterr().out
+
+
+def test_python_m(site_packages, capsys, monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["detect-installer", "mypkg"])
+
+    with pytest.raises(SystemExit) as exc_info:
+        runpy.run_module("detect_installer", run_name="__main__")
+
+    assert exc_info.value.code == EXIT_OK
+    assert capsys.readouterr().out == "mypkg\tpip\tpip install -U mypkg\n"
+
+
+class _ClosedPipe:
+    """A stdout whose reader went away, like `detect-installer --all | head`."""
+
+    def __init__(self, fd):
+        self.fd = fd
+
+    def write(self, text):
+        raise BrokenPipeError
+
+    def flush(self):
+        pass
+
+    def fileno(self):
+        return self.fd
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="compares with /dev/null")
+def test_closed_pipe_is_not_an_error(site_packages, tmp_path, monkeypatch):
+    with open(tmp_path / "stdout", "w") as stdout:
+        monkeypatch.setattr(sys, "stdout", _ClosedPipe(stdout.fileno()))
+
+        assert main(["mypkg"]) == EXIT_OK
+        assert os.path.samestat(os.fstat(stdout.fileno()), os.stat(os.devnull))
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        ["mypkg"],
+        ["a", "b", "--json"],
+        ["--all", "--ndjson", "--workers", "4"],
+        ["--environment", "/srv/venv", "--uv-upgrade-strategy=lock", "a"],
+        ["--environment=/srv/venv", "--", "--weird-name"],
+        ["--uv-upgrade-strategy", "auto", "a"],
+    ],
+)
+def test_fast_parser_agrees_with_argparse(argv, monkeypatch):
+    fast = _parse_fast(argv)
+    assert fast is not None
+
+    monkeypatch.setattr("detect_installer._cli._parse_fast", lambda argv: None)
+    slow = _parse(argv)
+
+    assert {name: getattr(fast, name) for name in fast.__slots__} == {
+        name: getattr(slow, name) for name in slow.__slots__
+    }
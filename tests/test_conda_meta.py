@@ -0,0 +1,139 @@
+"""Tests for telling conda-installed packages from pip-in-conda ones."""
+
+import os
+
+import pytest
+
+from detect_installer import (
+    Installer,
+    InstallerInfo,
+    detect_installer,
+    detect_installers,
+    installer_report,
+)
+from detect_installer._detect import (
+    _conda_meta_index,
+    _fs_calls,
+    _parse_conda_meta_name,
+)
+from detect_installer._disk_cache import DiskCache
+from tests.fakes import make_dist_info
+
+
+def _installer(name):
+    result = detect_installer(name, use_cache=False)
+    assert result is not None
+    return result.installer
+
+
+@pytest.mark.parametrize(
+    ("filename", "expected"),
+    [
+        ("numpy-1.26.4-py312h8753938_0.json", "numpy"),
+        ("typing_extensions-4.9.0-pyha770c72_0.json", "typing-extensions"),
+        ("ca-certificates-2024.2.2-hbcca054_0.json", "ca-certificates"),
+        ("history", None),
+        ("broken.json", None),
+        ("-1.0-0.json", None),
+    ],
+)
+def test_parse_conda_meta_name(filename, expected):
+    assert _parse_conda_meta_name(filename) == expected
+
+
+@pytest.fixture()
+def conda_env(fake_env, tmp_path):
+    fake_env(
+        {
+            "prefix": "miniforge3/envs/data",
+            "installer_value": "pip",
+            "env": {"CONDA_PREFIX": "", "MAMBA_EXE": ""},
+            "conda_packages": ["numpy", "typing_extensions"],
+        }
+    )
+    site_packages = tmp_path / "miniforge3/envs/data/lib/python3.12/site-packages"
+    make_dist_info(site_packages, "numpy", "conda")
+    make_dist_info(site_packages, "typing_extensions", "pip")
+    make_dist_info(site_packages, "rich", "uv")
+    return tmp_path / "miniforge3/envs/data"
+
+
+def test_only_listed_packages_are_conda_owned(conda_env):
+    results = detect_installers(["numpy", "typing_extensions", "mypkg", "rich"])
+
+    assert None not in results.values()
+    assert {name: info.installer for name, info in results.items() if info} == {
+        "numpy": Installer.CONDA,
+        "typing_extensions": Installer.CONDA,
+        "mypkg": Installer.PIP,
+        "rich": Installer.UV_PIP,
+    }
+    assert results["mypkg"] == InstallerInfo(Installer.PIP, "pip install -U mypkg")
+
+
+def test_index_reads_filenames_only(conda_env):
+    opens, scandirs = _fs_calls.open, _fs_calls.scandir
+
+    detect_installers(["numpy", "typing_extensions"])
+
+    # Both packages are decided by the listing: no INSTALLER or JSON reads.
+    assert _fs_calls.open == opens
+    # One listing for site-packages, one for conda-meta.
+    assert _fs_calls.scandir - scandirs == 2
+
+
+def test_index_follows_conda_meta_changes(conda_env):
+    assert _installer("mypkg") is Installer.PIP
+
+    record = conda_env / "conda-meta/mypkg-2.0-py_0.json"
+    record.write_text("{}")
+    # Make sure the directory mtime moves even on coarse filesystems.
+    stat = os.stat(conda_env / "conda-meta")
+    os.utime(conda_env / "conda-meta", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert _installer("mypkg") is Installer.CONDA
+
+
+def test_disk_cache_follows_conda_meta_changes(conda_env, tmp_path):
+    result = DiskCache(tmp_path / "cache").detect("mypkg")
+    assert result is not None
+    assert result.installer is Installer.PIP
+
+    (conda_env / "conda-meta/mypkg-2.0-py_0.json").write_text("{}")
+    stat = os.stat(conda_env / "conda-meta")
+    os.utime(conda_env / "conda-meta", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    result = DiskCache(tmp_path / "cache").detect("mypkg")
+    assert result is not None
+    assert result.installer is Installer.CONDA
+
+
+def test_installer_metadata_conda_is_trusted(fake_env, tmp_path):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "conda"})
+
+    assert _installer("mypkg") is Installer.CONDA
+
+
+def test_installer_report(conda_env, monkeypatch):
+    monkeypatch.setattr("sys.path", [str(conda_env / "lib/python3.12/site-packages")])
+
+    report = installer_report()
+
+    assert {installer: sorted(names) for installer, names in report.items()} == {
+        Installer.CONDA: ["numpy", "typing-extensions"],
+        Installer.PIP: ["mypkg"],
+        Installer.UV_PIP: ["rich"],
+    }
+
+
+def test_missing_conda_meta_owns_nothing(tmp_path):
+    assert _conda_meta_index.packages(str(tmp_path)) == frozenset()
+
+
+def test_unreadable_conda_meta_owns_nothing(conda_env, monkeypatch):
+    def _scandir(path):
+        raise PermissionError(path)
+
+    monkeypatch.setattr("detect_installer._detect._scandir", _scandir)
+
+    assert _conda_meta_index.packages(str(conda_env)) == frozenset()
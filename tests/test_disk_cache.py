@@ -0,0 +1,243 @@
+"""Tests for the opt-in persistent detection cache."""
+
+import marshal
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from detect_installer import Installer, clear_cache, detect_installer
+from detect_installer._detect import _fs_calls
+from detect_installer._disk_cache import (
+    _MAX_ENVIRONMENTS,
+    DiskCache,
+    default_cache_dir,
+)
+from tests.fakes import make_dist_info
+
+
+@pytest.fixture()
+def cache_home(tmp_path, monkeypatch):
+    cache_home = tmp_path / "cache"
+    monkeypatch.setenv("XDG_CACHE_HOME", str(cache_home))
+    return cache_home / "detect-installer"
+
+
+@pytest.fixture()
+def detections(monkeypatch):
+    calls = []
+    from detect_installer import _disk_cache
+
+    original = _disk_cache._detect_installer
+
+    def _counting(name, strategy, env):
+        calls.append(name)
+        return original(name, strategy, env)
+
+    monkeypatch.setattr("detect_installer._disk_cache._detect_installer", _counting)
+    return calls
+
+
+def _touch(path):
+    """Bump a directory's mtime so the change is visible regardless of timer resolution."""
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def test_default_cache_dir_honours_xdg(cache_home, tmp_path, monkeypatch):
+    assert default_cache_dir() == str(cache_home)
+
+    monkeypatch.delenv("XDG_CACHE_HOME")
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("USERPROFILE", str(tmp_path))
+    assert default_cache_dir() == str(tmp_path / ".cache" / "detect-installer")
+
+
+def test_result_is_reused_by_later_processes(fake_env, cache_home, detections):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+
+    first = detect_installer("mypkg", persistent_cache=True)
+    clear_cache()  # simulate a new process
+    second = detect_installer("mypkg", persistent_cache=True)
+
+    assert first == second
+    assert second is not None
+    assert second.installer is Installer.PIP
+    assert detections == ["mypkg"]
+    assert len(list(cache_home.glob("*.cache"))) == 1
+
+
+def test_site_packages_change_invalidates(fake_env, cache_home, detections, tmp_path):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+    site_packages = tmp_path / "myproject/.venv/lib/python3.12/site-packages"
+
+    detect_installer("mypkg", persistent_cache=True)
+    (site_packages / "mypkg-1.0.0.dist-info" / "INSTALLER").write_text("uv")
+    _touch(site_packages)
+    clear_cache()
+    result = detect_installer("mypkg", persistent_cache=True)
+
+    assert result is not None
+    assert result.installer is Installer.UV_PIP
+    assert detections == ["mypkg", "mypkg"]
+
+
+def test_new_uv_lock_invalidates(fake_env, cache_home, detections, tmp_path):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "uv"})
+
+    result = detect_installer("mypkg", persistent_cache=True)
+    assert result is not None
+    assert result.installer is Installer.UV_PIP
+
+    (tmp_path / "myproject" / "uv.lock").write_text("")
+    _touch(tmp_path / "myproject")
+    clear_cache()
+    result = detect_installer("mypkg", persistent_cache=True)
+
+    assert result is not None
+    assert result.installer is Installer.UV
+
+
+def test_not_installed_is_cached_until_installed(
+    fake_env, cache_home, detections, tmp_path, monkeypatch
+):
+    fake_env({"prefix": "myproject/.venv", "no_package": True})
+    site_packages = tmp_path / "site-packages"
+    site_packages.mkdir()
+    monkeypatch.setattr("sys.path", [str(site_packages)])
+
+    assert detect_installer("mypkg", persistent_cache=True) is None
+    clear_cache()
+    assert detect_installer("mypkg", persistent_cache=True) is None
+    assert detections == ["mypkg"]
+
+    make_dist_info(site_packages, "mypkg", "pip")
+    _touch(site_packages)
+    clear_cache()
+
+    assert detect_installer("mypkg", persistent_cache=True) is not None
+
+
+@pytest.mark.parametrize(
+    "content", [b"not marshal", marshal.dumps({"version": 2})[:-1]]
+)
+def test_corrupt_cache_file_is_ignored(fake_env, cache_home, content):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+    cache = DiskCache()
+    os.makedirs(cache.directory)
+    Path(cache.path).write_bytes(content)
+
+    result = cache.detect("mypkg")
+
+    assert result is not None
+    assert result.installer is Installer.PIP
+    assert marshal.loads(Path(cache.path).read_bytes())["version"] == 2
+
+
+def test_cache_of_another_format_is_ignored(fake_env, cache_home, detections):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+    cache = DiskCache()
+    cache.detect("mypkg")
+    data = marshal.loads(Path(cache.path).read_bytes())
+    Path(cache.path).write_bytes(marshal.dumps({**data, "version": 1}))
+
+    assert DiskCache().detect("mypkg") is not None
+    assert detections == ["mypkg", "mypkg"]
+
+
+def test_unwritable_cache_dir(fake_env, tmp_path, detections):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+    (tmp_path / "cache").write_text("")
+    cache = DiskCache(tmp_path / "cache")
+
+    assert cache.detect("mypkg") is not None
+    assert cache.detect("mypkg") is not None
+    assert detections == ["mypkg", "mypkg"]
+
+
+def test_failed_writes_are_cleaned_up(fake_env, cache_home, monkeypatch):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+
+    def _fail(path, *args):
+        raise PermissionError(path)
+
+    monkeypatch.setattr(os, "replace", _fail)
+
+    assert DiskCache().detect("mypkg") is not None
+    assert list(cache_home.iterdir()) == []
+
+    # Not even the temporary file can be removed.
+    monkeypatch.setattr(os, "unlink", _fail)
+
+    assert DiskCache().detect("mypkg") is not None
+
+
+def test_writes_leave_no_temporary_files(fake_env, cache_home):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+
+    DiskCache().detect("mypkg")
+    DiskCache().detect("other")
+
+    assert [p.name for p in cache_home.iterdir()] == [
+        os.path.basename(DiskCache().path)
+    ]
+
+
+def test_scripts_sharing_an_interpreter_keep_their_entries(
+    fake_env, cache_home, detections, monkeypatch
+):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+    path = list(sys.path)
+
+    # sys.path[0] is the directory of the script being run.
+    for script_dir in ["tool-a", "tool-b", "tool-a", "tool-b"]:
+        monkeypatch.setattr("sys.path", [script_dir, *path])
+        assert DiskCache().detect("mypkg") is not None
+
+    assert detections == ["mypkg", "mypkg"]
+    assert len(list(cache_home.glob("*.cache"))) == 1
+
+
+def test_least_recently_written_environments_are_dropped(
+    fake_env, cache_home, detections, monkeypatch
+):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+    path = list(sys.path)
+
+    for i in range(_MAX_ENVIRONMENTS + 1):
+        monkeypatch.setattr("sys.path", [f"tool-{i}", *path])
+        DiskCache().detect("mypkg")
+
+    data = marshal.loads(Path(DiskCache().path).read_bytes())
+    assert len(data["environments"]) == _MAX_ENVIRONMENTS
+
+    monkeypatch.setattr("sys.path", ["tool-0", *path])
+    DiskCache().detect("mypkg")
+
+    assert len(detections) == _MAX_ENVIRONMENTS + 2
+
+
+def test_cache_with_a_malformed_environments_table_is_ignored(
+    fake_env, cache_home, detections
+):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+    cache = DiskCache()
+    cache.detect("mypkg")
+    data = marshal.loads(Path(cache.path).read_bytes())
+    Path(cache.path).write_bytes(marshal.dumps({**data, "environments": []}))
+
+    assert DiskCache().detect("mypkg") is not None
+    assert detections == ["mypkg", "mypkg"]
+
+
+def test_hits_are_counted_as_filesystem_calls(fake_env, cache_home):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+    DiskCache().detect("mypkg")
+    cache = DiskCache()
+    before = _fs_calls.stat, _fs_calls.open
+
+    assert cache.detect("mypkg") is not None
+
+    # Reading the file, and a stat of the site-packages directory.
+    assert (_fs_calls.stat - before[0], _fs_calls.open - before[1]) == (1, 1)
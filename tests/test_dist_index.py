@@ -0,0 +1,84 @@
+"""Tests for the normalized dist-info index used to locate distributions."""
+
+import os
+
+import pytest
+
+from detect_installer import Installer, detect_installer
+from detect_installer._detect import _DistInfoIndex
+from tests.fakes import make_dist_info
+
+
+@pytest.mark.parametrize(
+    "requested", ["my-pkg", "my_pkg", "My.Pkg", "MY-PKG", "my__pkg", "my-_.pkg"]
+)
+def test_lookup_is_name_normalized(tmp_path, monkeypatch, requested):
+    make_dist_info(tmp_path, "my_pkg", "pip")
+    monkeypatch.setattr("sys.path", [str(tmp_path)])
+
+    assert _DistInfoIndex().find({"my-pkg"}, [str(tmp_path)]) == {
+        "my-pkg": str(tmp_path / "my_pkg-1.0.0.dist-info")
+    }
+    assert detect_installer(requested) is not None
+
+
+def test_egg_info_is_indexed(tmp_path):
+    (tmp_path / "Legacy.Pkg-2.0-py3.12.egg-info").mkdir()
+    (tmp_path / "bare.egg-info").write_text("Metadata-Version: 1.0\n")
+
+    entries = _DistInfoIndex().entries(str(tmp_path))
+
+    assert entries == {
+        "legacy-pkg": str(tmp_path / "Legacy.Pkg-2.0-py3.12.egg-info"),
+        "bare": str(tmp_path / "bare.egg-info"),
+    }
+
+
+def test_earlier_sys_path_entry_wins(tmp_path, monkeypatch):
+    first, second = tmp_path / "first", tmp_path / "second"
+    make_dist_info(first, "mypkg", "pip")
+    make_dist_info(second, "mypkg", "uv")
+    path = [str(first), str(second)]
+
+    assert _DistInfoIndex().find({"mypkg"}, path) == {
+        "mypkg": str(first / "mypkg-1.0.0.dist-info")
+    }
+
+
+def test_index_is_invalidated_by_directory_mtime(tmp_path):
+    index = _DistInfoIndex()
+    assert index.entries(str(tmp_path)) == {}
+
+    make_dist_info(tmp_path, "mypkg", "pip")
+    os.utime(tmp_path, ns=(0, 1_000_000_000))
+
+    assert "mypkg" in index.entries(str(tmp_path))
+
+
+def test_index_reuses_listing_while_mtime_unchanged(tmp_path, monkeypatch):
+    index = _DistInfoIndex()
+    make_dist_info(tmp_path, "mypkg", "pip")
+    index.entries(str(tmp_path))
+
+    def _fail(path):
+        raise AssertionError("directory listed twice")
+
+    monkeypatch.setattr("os.scandir", _fail)
+
+    assert "mypkg" in index.entries(str(tmp_path))
+
+
+def test_missing_and_non_directory_entries_are_skipped(tmp_path, monkeypatch):
+    archive = tmp_path / "python312.zip"
+    archive.write_bytes(b"")
+    make_dist_info(tmp_path / "site", "mypkg", "pip")
+    monkeypatch.setattr(
+        "sys.path", [str(tmp_path / "missing"), str(archive), str(tmp_path / "site")]
+    )
+    monkeypatch.setattr("sys.prefix", str(tmp_path / "venv"))
+    monkeypatch.setattr("sys.executable", str(tmp_path / "venv/bin/python3"))
+
+    result = detect_installer("mypkg")
+
+    assert result is not None
+    assert result.installer is Installer.PIP
@@ -0,0 +1,173 @@
+"""Tests for the dist-info reader and the editable/VCS upgrade commands."""
+
+import json
+import os
+import sys
+
+import pytest
+
+from detect_installer import Installer, detect_installer
+from detect_installer._detect import (
+    _MAX_INSTALLER_BYTES,
+    _file_url_to_path,
+    _fs_calls,
+    _read_dist_info,
+)
+from tests.fakes import make_dist_info
+
+EDITABLE = {"url": "file:///home/me/src/my%20pkg", "dir_info": {"editable": True}}
+VCS = {
+    "url": "https://github.com/me/mypkg.git",
+    "vcs_info": {"vcs": "git", "commit_id": "0" * 40, "requested_revision": "main"},
+    "subdirectory": "python",
+}
+ARCHIVE = {"url": "https://example.com/mypkg-1.0.0.tar.gz", "archive_info": {}}
+
+
+@pytest.fixture()
+def dist_info(tmp_path):
+    return make_dist_info(tmp_path, "mypkg", "pip")
+
+
+def test_reads_installer_requested_and_direct_url(dist_info):
+    (dist_info / "REQUESTED").write_text("")
+    (dist_info / "direct_url.json").write_text(json.dumps(EDITABLE))
+
+    dist = _read_dist_info(str(dist_info))
+
+    assert dist.installer == "pip"
+    assert dist.requested is True
+    assert dist.direct_url == EDITABLE
+
+
+def test_only_existing_files_are_opened(dist_info):
+    before = _fs_calls.open, _fs_calls.scandir
+
+    dist = _read_dist_info(str(dist_info))
+
+    assert (_fs_calls.open - before[0], _fs_calls.scandir - before[1]) == (1, 1)
+    assert dist.requested is False
+    assert dist.direct_url is None
+
+
+def test_installer_is_normalized_and_bounded(dist_info):
+    (dist_info / "INSTALLER").write_text("  UV\n")
+    assert _read_dist_info(str(dist_info)).installer == "uv"
+
+    (dist_info / "INSTALLER").write_text("x" * (_MAX_INSTALLER_BYTES * 4))
+    installer = _read_dist_info(str(dist_info)).installer
+    assert installer is not None
+    assert len(installer) == _MAX_INSTALLER_BYTES
+
+
+@pytest.mark.parametrize("content", ["{not json", "[]", '{"url": 1}', "\xff"])
+def test_invalid_direct_url_is_ignored(dist_info, content):
+    (dist_info / "direct_url.json").write_text(content, encoding="latin-1")
+
+    assert _read_dist_info(str(dist_info)).direct_url is None
+
+
+def test_missing_directory(tmp_path):
+    dist = _read_dist_info(str(tmp_path / "gone-1.0.dist-info"))
+
+    assert (dist.installer, dist.requested, dist.direct_url) == (None, False, None)
+    assert repr(dist) == (
+        f"_DistInfo({str(tmp_path / 'gone-1.0.dist-info')!r}, installer=None, "
+        "requested=False, direct_url=None)"
+    )
+
+
+def test_unreadable_installer_is_ignored(dist_info):
+    (dist_info / "INSTALLER").unlink()
+    (dist_info / "INSTALLER").mkdir()
+
+    assert _read_dist_info(str(dist_info)).installer is None
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs symlinks")
+def test_dangling_installer_symlink_is_ignored(dist_info):
+    (dist_info / "INSTALLER").unlink()
+    (dist_info / "INSTALLER").symlink_to(dist_info / "gone")
+
+    assert _read_dist_info(str(dist_info)).installer is None
+
+
+def _install(tmp_path, fake_env, prefix, installer_value, direct_url):
+    fake_env({"prefix": prefix, "installer_value": installer_value})
+    dist_info = tmp_path / prefix / "lib/python3.12/site-packages/mypkg-1.0.0.dist-info"
+    (dist_info / "direct_url.json").write_text(json.dumps(direct_url))
+
+
+@pytest.mark.parametrize(
+    ("installer_value", "direct_url", "expected"),
+    [
+        ("pip", EDITABLE, "pip install -U -e '/home/me/src/my pkg'"),
+        ("uv", EDITABLE, "uv pip install --upgrade -e '/home/me/src/my pkg'"),
+        (
+            "pip",
+            VCS,
+            "pip install -U 'mypkg @ git+https://github.com/me/mypkg.git"
+            "@main#subdirectory=python'",
+        ),
+        (
+            "uv",
+            {
+                **VCS,
+                "vcs_info": {"vcs": "hg", "commit_id": "abc"},
+                "subdirectory": None,
+            },
+            "uv pip install --upgrade 'mypkg @ hg+https://github.com/me/mypkg.git'",
+        ),
+        ("pip", ARCHIVE, "pip install -U mypkg"),
+        (
+            "pip",
+            {**EDITABLE, "url": "https://example.com/mypkg"},
+            "pip install -U -e https://example.com/mypkg",
+        ),
+    ],
+)
+def test_direct_url_upgrade_commands(
+    tmp_path, fake_env, installer_value, direct_url, expected
+):
+    _install(tmp_path, fake_env, "myproject/.venv", installer_value, direct_url)
+
+    info = detect_installer("mypkg")
+
+    assert info is not None
+    assert info.upgrade_cmd == expected
+
+
+def test_environment_installers_keep_their_command(tmp_path, fake_env):
+    _install(tmp_path, fake_env, "home/.local/pipx/venvs/mypkg", "pip", VCS)
+
+    info = detect_installer("mypkg")
+
+    assert info is not None
+    assert info.installer is Installer.PIPX
+    assert info.upgrade_cmd == "pipx upgrade mypkg"
+
+
+def test_uv_projects_keep_their_command(tmp_path, fake_env):
+    _install(tmp_path, fake_env, "myproject/.venv", "uv", VCS)
+    (tmp_path / "myproject/uv.lock").write_text("")
+
+    info = detect_installer("mypkg", "lock")
+
+    assert info is not None
+    assert info.upgrade_cmd == "uv lock --upgrade-package mypkg"
+
+
+@pytest.mark.parametrize(
+    ("url", "path"),
+    [
+        ("file:///C:/src/my%20pkg", "C:/src/my pkg"),
+        ("file://localhost/C:/src/mypkg", "C:/src/mypkg"),
+        ("file://server/share/mypkg", "//server/share/mypkg"),
+    ],
+)
+def test_windows_file_urls(url, path, monkeypatch):
+    monkeypatch.setattr(os, "name", "nt")
+    converted = _file_url_to_path(url)
+    monkeypatch.undo()
+
+    assert converted == os.path.normpath(path)
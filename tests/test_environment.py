@@ -0,0 +1,139 @@
+"""Tests for inspecting another environment from disk (environment=...)."""
+
+import os
+import sys
+
+import pytest
+
+from detect_installer import (
+    Installer,
+    clear_cache,
+    detect_installer,
+    detect_installers,
+    iter_environment,
+)
+from detect_installer._detect import _Environment, _fs_calls
+from tests.fakes import make_dist_info
+
+pytestmark = pytest.mark.skipif(
+    sys.platform == "win32", reason="fake environments use the POSIX layout"
+)
+
+
+def make_venv(prefix, installer_value="pip", pyvenv_cfg="version = 3.12.1\n"):
+    site_packages = prefix / "lib" / "python3.12" / "site-packages"
+    site_packages.mkdir(parents=True)
+    (prefix / "bin").mkdir()
+    if pyvenv_cfg is not None:
+        (prefix / "pyvenv.cfg").write_text(pyvenv_cfg)
+    make_dist_info(site_packages, "mypkg", installer_value)
+    return site_packages
+
+
+@pytest.fixture(autouse=True)
+def running_interpreter(tmp_path, monkeypatch):
+    """Make the running interpreter look like a pipx venv, to prove it is ignored."""
+    monkeypatch.setattr("sys.prefix", str(tmp_path / "pipx/venvs/tool"))
+    monkeypatch.setattr("sys.executable", str(tmp_path / "pipx/venvs/tool/bin/python"))
+    monkeypatch.delenv("CONDA_PREFIX", raising=False)
+    monkeypatch.delenv("MAMBA_EXE", raising=False)
+
+
+def _installer(prefix, package="mypkg"):
+    result = detect_installer(package, environment=prefix)
+    assert result is not None
+    return result.installer
+
+
+def test_pip_venv(tmp_path):
+    make_venv(tmp_path / "app/.venv")
+
+    assert _installer(tmp_path / "app/.venv") is Installer.PIP
+    assert detect_installer("mypkg") is None
+
+
+def test_uv_project_venv(tmp_path):
+    make_venv(tmp_path / "app/.venv", "uv")
+    (tmp_path / "app/uv.lock").write_text("")
+
+    assert _installer(tmp_path / "app/.venv") is Installer.UV
+
+
+def test_uv_tool_venv(tmp_path):
+    make_venv(tmp_path / "share/uv/tools/black", "uv")
+
+    assert _installer(tmp_path / "share/uv/tools/black") is Installer.UV_TOOL
+
+
+def test_conda_prefix_is_recognized_by_conda_meta(tmp_path):
+    make_venv(tmp_path / "envs/data", pyvenv_cfg=None)
+    (tmp_path / "envs/data/conda-meta").mkdir()
+    (tmp_path / "envs/data/conda-meta/mypkg-1.0.0-py_0.json").write_text("{}")
+
+    assert _installer(tmp_path / "envs/data") is Installer.CONDA
+
+
+def test_system_site_packages_are_included(tmp_path):
+    base = tmp_path / "base"
+    base_site = base / "lib" / "python3.12" / "site-packages"
+    make_dist_info(base_site, "shared", "pip")
+    cfg = f"home = {base / 'bin'}\ninclude-system-site-packages = true\n"
+    make_venv(tmp_path / "venv", pyvenv_cfg=cfg)
+
+    assert _installer(tmp_path / "venv", "shared") is Installer.PIP
+
+
+def test_system_site_packages_are_excluded_by_default(tmp_path):
+    make_dist_info(tmp_path / "base/lib/python3.12/site-packages", "shared", "pip")
+    make_venv(tmp_path / "venv", pyvenv_cfg=f"home = {tmp_path / 'base/bin'}\n")
+
+    assert detect_installer("shared", environment=tmp_path / "venv") is None
+
+
+def test_inventory_of_another_environment(tmp_path):
+    make_venv(tmp_path / "venv")
+
+    entries = list(iter_environment(environment=tmp_path / "venv"))
+
+    assert [(name, info.installer) for name, _, info in entries] == [
+        ("mypkg", Installer.PIP)
+    ]
+
+
+def test_environment_is_read_once_until_cleared(tmp_path):
+    make_venv(tmp_path / "app/.venv")
+    _installer(tmp_path / "app/.venv")
+    detect_installers(["mypkg"], environment=tmp_path / "app/.venv")
+    env = _Environment.from_prefix(tmp_path / "app/.venv")
+    before = _fs_calls.total()
+
+    for _ in range(10):
+        assert _installer(tmp_path / "app/.venv") is Installer.PIP
+        detect_installers(["mypkg"], environment=str(tmp_path / "app/.venv"))
+
+    assert _fs_calls.total() == before
+    assert _Environment.from_prefix(tmp_path / "app/.venv") is env
+
+    clear_cache()
+
+    assert _Environment.from_prefix(tmp_path / "app/.venv") is not env
+
+
+def test_prefix_without_site_packages(tmp_path):
+    (tmp_path / "empty").mkdir()
+
+    assert detect_installer("mypkg", environment=tmp_path / "empty") is None
+
+
+def test_windows_layout(tmp_path, monkeypatch):
+    prefix = tmp_path / "venv"
+    make_dist_info(prefix / "Lib/site-packages", "mypkg", "pip")
+    (prefix / "Scripts").mkdir()
+    (prefix / "pyvenv.cfg").write_text("version = 3.12.1\n")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(os, "name", "nt")
+        env = _Environment.from_prefix(prefix)
+
+    assert env.executable == str(prefix / "Scripts/python.exe")
+    assert env.path == [str(prefix / "Lib/site-packages")]
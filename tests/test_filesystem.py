@@ -35,6 +35,7 @@ def test_conda_via_env_var(fake_env, tmp_path):
             "prefix": "conda_env",
             "installer_value": "pip",
             "env": {"CONDA_PREFIX": str(tmp_path / "conda_env")},
+            "conda_packages": ["mypkg"],
         }
     )
     result = detect_installer("mypkg")
@@ -48,6 +49,7 @@ def test_conda_via_path(fake_env, conda_dir):
         {
             "prefix": f"home/{conda_dir}/envs/myenv",
             "installer_value": "",
+            "conda_packages": ["mypkg"],
         }
     )
     result = detect_installer("mypkg")
@@ -64,6 +66,7 @@ def test_mamba_detected(fake_env, tmp_path):
                 "CONDA_PREFIX": str(tmp_path / "conda_env"),
                 "MAMBA_EXE": "/usr/bin/mamba",
             },
+            "conda_packages": ["mypkg"],
         }
     )
     result = detect_installer("mypkg")
@@ -79,6 +82,7 @@ def test_brew_macos_arm(fake_env):
             "executable": "opt/homebrew/Frameworks/Python.framework/Versions/3.12/bin/python3",
             "site_packages": "opt/homebrew/Frameworks/Python.framework/Versions/3.12/lib/python3.12/site-packages",
             "installer_value": "pip",
+            "brew_formula": "mypkg",
         }
     )
     result = detect_installer("mypkg")
@@ -94,6 +98,7 @@ def test_brew_macos_intel(fake_env):
             "executable": "usr/local/Cellar/python@3.12/3.12.0/bin/python3",
             "site_packages": "usr/local/Cellar/python@3.12/3.12.0/Frameworks/Python.framework/Versions/3.12/lib/python3.12/site-packages",
             "installer_value": "pip",
+            "brew_formula": "mypkg",
         }
     )
     result = detect_installer("mypkg")
@@ -0,0 +1,140 @@
+"""Regression tests for the cost of `import detect_installer`."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+import detect_installer
+
+# Budget for the cumulative `-X importtime` of the package, as a fraction of
+# `import importlib.metadata` timed the same way in the same interpreter.
+# Importing importlib.metadata eagerly, as the package once did, puts the
+# ratio above 1.
+IMPORT_BUDGET = 0.5
+
+HEAVY_MODULES = ("importlib.metadata", "pathlib", "dataclasses", "typing")
+
+
+def _run(
+    code: str, *flags: str, pycache_prefix: str | None = None
+) -> subprocess.CompletedProcess[str]:
+    package_parent = os.path.dirname(os.path.dirname(detect_installer.__file__))
+    env = {**os.environ, "PYTHONPATH": package_parent}
+
+    if pycache_prefix is not None:
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+        env["PYTHONPYCACHEPREFIX"] = pycache_prefix
+
+    return subprocess.run(
+        [sys.executable, *flags, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+        timeout=60,
+    )
+
+
+def _cumulative_import_us(stderr: str, module: str = "detect_installer") -> int:
+    # Lines look like "import time:   self [us] | cumulative | module".
+    # A submodule imported first includes its package in its cumulative time.
+    for line in stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1])
+
+    raise AssertionError(f"{module} not found in:\n{stderr}")
+
+
+@pytest.fixture(scope="module")
+def pycache(tmp_path_factory):
+    """A bytecode cache for the timed imports, filled by a first run.
+
+    Installed packages come with compiled bytecode, so the timings must not
+    include compiling the sources, whether or not this interpreter can
+    write bytecode next to them.
+    """
+
+    prefix = str(tmp_path_factory.mktemp("pycache"))
+    _run("import detect_installer._cli, importlib.metadata", pycache_prefix=prefix)
+
+    return prefix
+
+
+def _best_import_us(module: str, pycache: str) -> int:
+    # Take the best of a few runs to keep the test stable on noisy machines.
+    # Without site, .pth files cannot import anything before we look.
+    return min(
+        _cumulative_import_us(
+            _run(f"import {module}", "-S", pycache_prefix=pycache).stderr, module
+        )
+        for _ in range(3)
+    )
+
+
+@pytest.mark.parametrize("module", ["detect_installer", "detect_installer._cli"])
+def test_import_stays_within_budget(module, pycache):
+    reference = _best_import_us("importlib.metadata", pycache)
+
+    assert _best_import_us(module, pycache) <= IMPORT_BUDGET * reference
+
+
+def test_environment_checks_do_not_import_heavy_modules():
+    # Compare against the modules loaded before the import, since site
+    # customizations may already have pulled some of them in.
+    result = _run(
+        "import sys\n"
+        "before = set(sys.modules)\n"
+        "import detect_installer\n"
+        "from detect_installer import _detect\n"
+        "_detect._detect_environment(_detect._Environment.current())\n"
+        f"print([m for m in {HEAVY_MODULES!r} if m in set(sys.modules) - before])",
+        # Without site, .pth files cannot import typing before we look.
+        "-S",
+    )
+
+    assert result.stdout.strip() == "[]"
+
+
+def test_command_defers_argparse_and_json():
+    result = _run(
+        "import sys\n"
+        "before = set(sys.modules)\n"
+        "from detect_installer._cli import main\n"
+        "main(['surely-not-installed'])\n"
+        f"modules = ('argparse', 'json', *{HEAVY_MODULES!r})\n"
+        "print([m for m in modules if m in set(sys.modules) - before])",
+        # Without site, .pth files cannot import typing before we look.
+        "-S",
+    )
+
+    assert result.stdout.splitlines() == [
+        "surely-not-installed\tnot-installed\t-",
+        "[]",
+    ]
+
+
+def test_notifier_defers_imports_until_a_check_is_due(tmp_path):
+    (tmp_path / "mypkg").write_text("")
+    result = _run(
+        "import sys\n"
+        "before = set(sys.modules)\n"
+        "from detect_installer import upgrade_notice\n"
+        f"print(upgrade_notice('mypkg', print, state_dir={str(tmp_path)!r}))\n"
+        "modules = ('json', 'tempfile', 're', 'detect_installer._versions',\n"
+        f"           'detect_installer._disk_cache', *{HEAVY_MODULES!r})\n"
+        "print([m for m in modules if m in set(sys.modules) - before])",
+        # Without site, .pth files cannot import typing before we look.
+        "-S",
+    )
+
+    assert result.stdout.splitlines() == ["None", "[]"]
+
+
+def test_type_aliases_are_loaded_on_access():
+    from typing import Literal
+
+    assert detect_installer.UvUpgradeStrategy == Literal["add", "lock", "auto"]
+    assert detect_installer.DetectionStrategy == Literal["fast", "thorough"]
@@ -0,0 +1,328 @@
+"""Tests for the PEP 691 index client, run against a local http.server."""
+
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from detect_installer import IndexClient, Installer, outdated_packages, upgrade_notice
+from detect_installer._index import _file_version
+
+
+def _files(*specs):
+    return [
+        {"filename": filename, "yanked": yanked, "hashes": {}}
+        for filename, yanked in specs
+    ]
+
+
+PROJECTS = {
+    "mypkg": _files(
+        ("mypkg-1.0.0-py3-none-any.whl", False),
+        ("mypkg-1.0.0.tar.gz", False),
+        ("mypkg-2.0.0-py3-none-any.whl", False),
+        ("mypkg-2.1.0.tar.gz", True),
+        ("mypkg-3.0.0rc1-py3-none-any.whl", False),
+    ),
+    "fast-lib": _files(("fast_lib-1.0.0-py3-none-any.whl", False)),
+    "beta-lib": _files(("beta_lib-0.1b1-py3-none-any.whl", False)),
+}
+
+
+class IndexServer(ThreadingHTTPServer):
+    """Serves PROJECTS, plus canned responses for the names in pages."""
+
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), IndexHandler)
+        self.projects = {name: list(files) for name, files in PROJECTS.items()}
+        self.pages: dict[str, tuple[int, bytes, dict[str, str]]] = {}
+        self.revision = 1
+        self.requests: list[tuple[str, object, dict[str, str]]] = []
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host!s}:{port}/simple/"
+
+
+class IndexHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        assert isinstance(server, IndexServer)
+        server.requests.append((self.path, self.client_address, dict(self.headers)))
+        name = self.path.strip("/").rpartition("/")[2]
+
+        if self.path == f"/simple/{name}/" and name in server.pages:
+            self._send(*server.pages[name])
+            return
+
+        if self.path != f"/simple/{name}/" or name not in server.projects:
+            self._send(404, b"not found")
+            return
+
+        etag = f'"{name}-{server.revision}"'
+
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, b"", {"ETag": etag})
+            return
+
+        body = json.dumps(
+            {
+                "meta": {"api-version": "1.1"},
+                "name": name,
+                "files": server.projects[name],
+            }
+        ).encode()
+        self._send(
+            200,
+            body,
+            {"ETag": etag, "Content-Type": "application/vnd.pypi.simple.v1+json"},
+        )
+
+    def _send(self, status, body, headers=()):
+        self.send_response(status)
+        for key, value in dict(headers).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture()
+def index():
+    server = IndexServer()
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture()
+def client(index, tmp_path):
+    with IndexClient(index.url.rstrip("/"), cache_dir=tmp_path / "index") as client:
+        yield client
+
+
+def test_latest_version_skips_yanked_and_prereleases(client, index):
+    assert client.versions("MyPkg") == ["1.0.0", "2.0.0", "3.0.0rc1"]
+    assert client.latest_version("mypkg") == "2.0.0"
+    assert client.latest_version("mypkg", prereleases=True) == "3.0.0rc1"
+    assert client.latest_version("fast_lib") == "1.0.0"
+    assert client.latest_version("missing") is None
+    assert client.latest_version("beta-lib") is None
+    assert client.latest_versions(["mypkg"]) == {"mypkg": "2.0.0"}
+
+    path, _, headers = index.requests[0]
+    assert path == "/simple/mypkg/"
+    assert headers["Accept"] == "application/vnd.pypi.simple.v1+json"
+
+
+def test_repeat_lookups_are_conditional(client, index, tmp_path):
+    client.latest_version("mypkg")
+    assert client.latest_version("mypkg") == "2.0.0"
+
+    _, _, headers = index.requests[-1]
+    assert headers["If-None-Match"] == '"mypkg-1"'
+
+    # The on-disk cache serves another client, and new releases are seen.
+    index.projects["mypkg"] += _files(("mypkg-2.2.0.tar.gz", False))
+    with IndexClient(index.url, cache_dir=tmp_path / "index") as other:
+        assert other.latest_version("mypkg") == "2.0.0"
+
+        index.revision = 2
+        assert other.latest_version("mypkg") == "2.2.0"
+
+
+def test_connections_are_kept_alive(client, index):
+    for _ in range(5):
+        client.latest_version("mypkg")
+
+    assert len(index.requests) == 5
+    assert len({address for _, address, _ in index.requests}) == 1
+    assert client._pool.created == 1
+
+
+def test_stale_connection_is_replaced(client, index):
+    client.latest_version("mypkg")
+
+    for connection in client._pool._idle:
+        connection.sock.close()
+
+    assert client.latest_version("mypkg") == "2.0.0"
+
+
+def test_many_packages_concurrently(client, index):
+    names = ["mypkg", "fast-lib", "missing"] * 4
+
+    assert client.latest_versions(names) == {
+        "mypkg": "2.0.0",
+        "fast-lib": "1.0.0",
+        "missing": None,
+    }
+    assert len(index.requests) == 3
+    assert client._pool.created <= client.max_connections
+
+
+@pytest.mark.parametrize("scheme", ["http", "https"])
+def test_unreachable_index(tmp_path, scheme):
+    with IndexClient(f"{scheme}://127.0.0.1:9/simple/", cache_dir=tmp_path) as client:
+        assert client.latest_version("mypkg") is None
+
+
+def test_unsupported_index_url():
+    with pytest.raises(ValueError, match="unsupported index URL"):
+        IndexClient("file:///srv/simple/")
+
+
+def test_cache_dir_defaults_to_the_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+    with IndexClient() as client:
+        assert client.index_url == "https://pypi.org/simple/"
+        assert client.cache_dir == str(tmp_path / "detect-installer/index")
+
+
+@pytest.mark.parametrize(
+    "page",
+    [
+        (500, b"oops", {}),
+        (200, b"<html></html>", {"Content-Type": "text/html"}),
+        (200, b"[]", {}),
+    ],
+)
+def test_unusable_responses(client, index, page):
+    index.pages["mypkg"] = page
+
+    assert client.versions("mypkg") is None
+
+
+def test_last_modified_is_sent_back(client, index):
+    body = json.dumps({"files": PROJECTS["mypkg"]}).encode()
+    last_modified = "Mon, 01 Jan 2024 00:00:00 GMT"
+    index.pages["mypkg"] = (200, body, {"Last-Modified": last_modified})
+
+    client.latest_version("mypkg")
+    assert client.latest_version("mypkg") == "2.0.0"
+
+    _, _, headers = index.requests[-1]
+    assert headers["If-Modified-Since"] == last_modified
+    assert "If-None-Match" not in headers
+
+
+def test_closed_connections_are_not_reused(client, index):
+    body = json.dumps({"files": PROJECTS["mypkg"]}).encode()
+    index.pages["mypkg"] = (200, body, {"Connection": "close"})
+
+    assert client.latest_version("mypkg") == "2.0.0"
+    assert client.latest_version("mypkg") == "2.0.0"
+
+    assert client._pool._idle == []
+    assert client._pool.created == 2
+
+
+def test_invalid_cache_entries_are_ignored(client, index):
+    url = f"{index.url}mypkg/"
+    os.makedirs(client.cache_dir)
+    with open(client._cache_path(url), "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "url": url, "etag": '"mypkg-1"', "versions": 3}, f)
+
+    assert client.latest_version("mypkg") == "2.0.0"
+
+    _, _, headers = index.requests[-1]
+    assert "If-None-Match" not in headers
+
+
+def test_unwritable_cache_dir(index, tmp_path):
+    (tmp_path / "index").write_text("")
+
+    with IndexClient(index.url, cache_dir=tmp_path / "index") as client:
+        assert client.latest_version("mypkg") == "2.0.0"
+        assert client.latest_version("mypkg") == "2.0.0"
+
+    assert "If-None-Match" not in index.requests[-1][2]
+
+
+def test_failed_cache_writes_are_cleaned_up(client, index, monkeypatch):
+    def _fail(path, *args):
+        raise PermissionError(path)
+
+    monkeypatch.setattr(os, "replace", _fail)
+
+    assert client.latest_version("mypkg") == "2.0.0"
+    assert os.listdir(client.cache_dir) == []
+
+    # Not even the temporary file can be removed.
+    monkeypatch.setattr(os, "unlink", _fail)
+
+    assert client.latest_version("fast-lib") == "1.0.0"
+
+
+def test_outdated_packages(fake_env, tmp_path, client, monkeypatch):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+    monkeypatch.setattr(
+        "detect_installer._index._installed_version",
+        {"mypkg": "1.0.0", "fast-lib": "1.0.0"}.get,
+    )
+
+    outdated = outdated_packages(["mypkg", "fast-lib", "missing"], client=client)
+
+    assert list(outdated) == ["mypkg"]
+    notice = outdated["mypkg"]
+    assert (notice.current_version, notice.latest_version) == ("1.0.0", "2.0.0")
+    assert notice.installer.installer is Installer.PIP
+    assert notice.upgrade_cmd == "pip install -U mypkg"
+
+
+def test_outdated_packages_default_to_pypi(fake_env, index, tmp_path, monkeypatch):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+    monkeypatch.setattr(
+        "detect_installer._index._installed_version", lambda name: "1.0"
+    )
+    monkeypatch.setattr(
+        "detect_installer._index.IndexClient",
+        lambda: IndexClient(index.url, cache_dir=tmp_path / "index"),
+    )
+
+    assert list(outdated_packages(["mypkg"])) == ["mypkg"]
+
+
+def test_plugs_into_upgrade_notice(fake_env, tmp_path, client):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+
+    notice = upgrade_notice(
+        "mypkg",
+        client.latest_version,
+        current_version="1.0.0",
+        state_dir=tmp_path / "state",
+    )
+
+    assert notice is not None
+    assert notice.latest_version == "2.0.0"
+
+
+@pytest.mark.parametrize(
+    ("filename", "version"),
+    [
+        ("my_pkg-1.2.3-py3-none-any.whl", "1.2.3"),
+        ("my_pkg-1.2.3-1-cp312-cp312-manylinux_2_17_x86_64.whl", "1.2.3"),
+        ("my-pkg-1.2.3.tar.gz", "1.2.3"),
+        ("my_pkg-1.2.3.post1.zip", "1.2.3.post1"),
+        ("my_pkg-1.2.3.exe", None),
+    ],
+)
+def test_file_version(filename, version):
+    assert _file_version(filename) == version
@@ -0,0 +1,82 @@
+"""Tests for InstallerInfo's compact layout and lazily rendered commands."""
+
+import copy
+import pickle
+
+import pytest
+
+from detect_installer import Installer, InstallerInfo, detect_installer
+from detect_installer._detect import _UNKNOWN, _info
+
+
+def test_has_no_instance_dict():
+    info = InstallerInfo(Installer.PIP, "pip install -U mypkg")
+
+    assert not hasattr(info, "__dict__")
+
+
+def test_command_is_rendered_once_on_first_access():
+    info = _info(Installer.UV, "mypkg", "lock")
+
+    with pytest.raises(AttributeError):
+        object.__getattribute__(info, "_upgrade_cmd")
+
+    command = info.upgrade_cmd
+
+    assert command == "uv lock --upgrade-package mypkg"
+    assert info.upgrade_cmd is command
+
+
+@pytest.mark.parametrize(
+    ("installer", "expected"),
+    [
+        (Installer.PIP, "pip install -U mypkg"),
+        (Installer.UV, "uv add mypkg --upgrade-package mypkg"),
+        (Installer.UNKNOWN, None),
+    ],
+)
+def test_lazy_and_eager_results_are_interchangeable(installer, expected):
+    lazy = _info(installer, "mypkg")
+    eager = InstallerInfo(installer, expected)
+
+    assert lazy == eager
+    assert hash(lazy) == hash(eager)
+    assert repr(lazy) == repr(eager)
+    assert len({lazy, eager}) == 1
+    assert lazy != _info(installer, "mypkg", strategy="fast")
+
+
+def test_lazy_results_are_still_frozen():
+    info = _info(Installer.PIP, "mypkg")
+
+    with pytest.raises(AttributeError):
+        info.upgrade_cmd = "rm -rf /"  # type: ignore[misc]  # ty: ignore[invalid-assignment]
+
+    with pytest.raises(AttributeError):
+        del info.installer  # type: ignore[misc]  # ty: ignore[invalid-assignment]
+
+
+def test_matches_positional_patterns():
+    match _info(Installer.PIPX, "mypkg"):
+        case InstallerInfo(Installer.PIPX, command, strategy):
+            assert (command, strategy) == ("pipx upgrade mypkg", "thorough")
+        case _:
+            pytest.fail("no match")
+
+
+@pytest.mark.parametrize("clone", [copy.copy, copy.deepcopy, pickle.dumps])
+def test_copies_and_pickles(clone):
+    info = _info(Installer.PIPX, "mypkg", strategy="fast")
+    cloned = clone(info)
+
+    if isinstance(cloned, bytes):
+        cloned = pickle.loads(cloned)
+
+    assert cloned == info
+    assert cloned.strategy == "fast"
+
+
+def test_unknown_results_are_shared(fake_env):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "something-else"})
+
+    assert detect_installer("mypkg", use_cache=False) is _UNKNOWN
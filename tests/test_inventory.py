@@ -0,0 +1,121 @@
+"""Tests for iter_environment and the NDJSON inventory command."""
+
+import json
+
+# Imported up front: the fixture below leaves only the fake site-packages
+# on sys.path, so the thread pool mode could not import it lazily.
+from concurrent.futures import ThreadPoolExecutor  # noqa: F401
+
+import pytest
+
+from detect_installer import Installer, detect_installer, iter_environment
+from detect_installer._cli import EXIT_UNKNOWN_INSTALLER, main
+from detect_installer._detect import _fs_calls
+from detect_installer._inventory import _iter_metadata_dirs, _read_version
+from tests.fakes import make_dist_info
+
+
+@pytest.fixture()
+def site_packages(fake_env, tmp_path, monkeypatch):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+    site_packages = tmp_path / "myproject/.venv/lib/python3.12/site-packages"
+    make_dist_info(site_packages, "Other_Pkg", "uv")
+    make_dist_info(site_packages, "mystery", None)
+    monkeypatch.setattr("sys.path", [str(site_packages)])
+    return site_packages
+
+
+def test_yields_every_distribution(site_packages):
+    entries = {name: (version, info) for name, version, info in iter_environment()}
+
+    assert set(entries) == {"mypkg", "other-pkg", "mystery"}
+    assert all(version == "1.0.0" for version, _ in entries.values())
+    assert entries["mypkg"][1].installer is Installer.PIP
+    assert entries["other-pkg"][1].installer is Installer.UV_PIP
+    assert entries["mystery"][1].installer is Installer.UNKNOWN
+    for name, (_, info) in entries.items():
+        assert info == detect_installer(name)
+
+
+def test_is_lazy(site_packages):
+    iterator = iter_environment()
+
+    assert next(iterator)[0] in {"mypkg", "other-pkg", "mystery"}
+
+
+def test_thread_pool_mode_matches_serial(site_packages):
+    for i in range(50):
+        make_dist_info(site_packages, f"pkg{i}", "pip")
+
+    assert list(iter_environment(workers=4)) == list(iter_environment())
+
+
+def test_shadowed_distributions_are_skipped(site_packages, tmp_path, monkeypatch):
+    later = tmp_path / "later"
+    make_dist_info(later, "mypkg", "uv")
+    monkeypatch.setattr("sys.path", [str(site_packages), str(later)])
+
+    entries = [(name, info) for name, _, info in iter_environment()]
+    expected = detect_installer("mypkg")
+
+    assert expected is not None
+    assert entries.count(("mypkg", expected)) == 1
+    assert len(entries) == 3
+
+
+def test_egg_info_version_is_read_from_pkg_info(site_packages):
+    egg_info = site_packages / "legacy.egg-info"
+    egg_info.mkdir()
+    (egg_info / "PKG-INFO").write_text("Metadata-Version: 1.0\nVersion: 2.5\n")
+
+    versions = {name: version for name, version, _ in iter_environment()}
+
+    assert versions["legacy"] == "2.5"
+
+
+@pytest.mark.parametrize(
+    "pkg_info", [None, "Metadata-Version: 1.0\n\nVersion: 2.5 is in the body\n"]
+)
+def test_egg_info_without_a_version(site_packages, pkg_info):
+    egg_info = site_packages / "legacy.egg-info"
+    egg_info.mkdir()
+    if pkg_info is not None:
+        (egg_info / "PKG-INFO").write_text(pkg_info)
+
+    versions = {name: version for name, version, _ in iter_environment()}
+
+    assert versions["legacy"] is None
+
+
+def test_missing_path_entries_are_skipped(site_packages, tmp_path, monkeypatch):
+    monkeypatch.setattr("sys.path", [str(tmp_path / "gone"), str(site_packages)])
+
+    assert len(list(iter_environment())) == 3
+
+
+def test_ndjson_command(site_packages, capsys):
+    # mystery was installed by an unknown installer.
+    assert main(["--all", "--ndjson"]) == EXIT_UNKNOWN_INSTALLER
+
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+    assert {
+        "name": "mypkg",
+        "version": "1.0.0",
+        "installer": "pip",
+        "upgrade_cmd": "pip install -U mypkg",
+    } in lines
+    assert len(lines) == 3
+
+
+def test_listing_and_versions_are_counted(site_packages):
+    egg_info = site_packages / "legacy.egg-info"
+    egg_info.mkdir()
+    (egg_info / "PKG-INFO").write_text("Metadata-Version: 1.0\nVersion: 2.5\n")
+    before = _fs_calls.stat, _fs_calls.scandir, _fs_calls.open
+
+    list(_iter_metadata_dirs([str(site_packages)]))
+    assert _read_version(str(egg_info)) == "2.5"
+
+    after = _fs_calls.stat, _fs_calls.scandir, _fs_calls.open
+    assert [b - a for a, b in zip(before, after)] == [1, 1, 1]
@@ -58,8 +58,8 @@ def test_uv_lock_three_levels_up(fake_env):
     assert result.installer is Installer.UV
 
 
-def test_uv_lock_four_levels_up_not_found(fake_env):
-    """uv.lock 4 levels up — beyond the 3-level walk, should fall back to UV_PIP."""
+def test_uv_lock_four_levels_up(fake_env):
+    """uv.lock 4 levels up — the walk is not depth limited, so it is found."""
     fake_env(
         {
             "prefix": "a/b/c/d/.venv",
@@ -69,7 +69,7 @@ def test_uv_lock_four_levels_up_not_found(fake_env):
     )
     result = detect_installer("mypkg")
     assert result is not None
-    assert result.installer is Installer.UV_PIP
+    assert result.installer is Installer.UV
 
 
 def test_pip_detected(fake_env):
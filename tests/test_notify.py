@@ -0,0 +1,383 @@
+"""Tests for the throttled upgrade notifier."""
+
+import builtins
+import json
+import os
+import pickle
+import threading
+
+import pytest
+
+from detect_installer import Installer, InstallerInfo, UpgradeNotice, upgrade_notice
+from detect_installer._notify import _installed_version, default_state_dir
+from detect_installer._versions import is_newer, is_prerelease, version_key
+
+DAY = 24 * 60 * 60
+
+ORDERED_VERSIONS = [
+    "1.0.dev0",
+    "1.0a1",
+    "1.0a2.dev1",
+    "1.0a2",
+    "1.0b1",
+    "1.0rc1",
+    "1.0",
+    "1.0.post1.dev0",
+    "1.0.post1",
+    "1.0.1",
+    "1.10",
+    "1!0.1",
+]
+
+
+class Provider:
+    """A latest-version provider that records the packages it is asked for."""
+
+    def __init__(self, latest):
+        self.latest = latest
+        self.calls = []
+
+    def __call__(self, package_name):
+        self.calls.append(package_name)
+
+        if isinstance(self.latest, Exception):
+            raise self.latest
+
+        return self.latest
+
+
+@pytest.fixture()
+def env(fake_env):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+
+
+@pytest.fixture()
+def state_dir(tmp_path):
+    return tmp_path / "state"
+
+
+def _age(path, seconds):
+    st = os.stat(path)
+    os.utime(path, (st.st_atime - seconds, st.st_mtime - seconds))
+
+
+def test_reports_a_newer_version(env, state_dir):
+    provider = Provider("2.0.0")
+
+    notice = upgrade_notice(
+        "mypkg", provider, current_version="1.0.0", state_dir=state_dir
+    )
+
+    assert provider.calls == ["mypkg"]
+    assert isinstance(notice, UpgradeNotice)
+    assert (notice.current_version, notice.latest_version) == ("1.0.0", "2.0.0")
+    assert notice.installer.installer is Installer.PIP
+    assert notice.upgrade_cmd == "pip install -U mypkg"
+    assert str(notice) == (
+        "mypkg 2.0.0 is available (you have 1.0.0). Upgrade with: pip install -U mypkg"
+    )
+
+
+def test_checks_at_most_once_per_interval(env, state_dir):
+    provider = Provider("2.0.0")
+
+    first = upgrade_notice(
+        "mypkg", provider, current_version="1.0.0", state_dir=state_dir
+    )
+    second = upgrade_notice(
+        "mypkg", provider, current_version="1.0.0", state_dir=state_dir
+    )
+
+    assert provider.calls == ["mypkg"]
+    assert second == first
+
+    # Upgraded in the meantime: the recorded latest version is not newer.
+    assert (
+        upgrade_notice("mypkg", provider, current_version="2.0.0", state_dir=state_dir)
+        is None
+    )
+
+    _age(state_dir / "mypkg", DAY + 1)
+    provider.latest = "2.1.0"
+    third = upgrade_notice(
+        "mypkg", provider, current_version="2.0.0", state_dir=state_dir
+    )
+
+    assert provider.calls == ["mypkg", "mypkg"]
+    assert third is not None
+    assert third.latest_version == "2.1.0"
+
+
+def test_up_to_date_leaves_an_empty_state_file(env, state_dir):
+    provider = Provider("1.0.0")
+
+    assert (
+        upgrade_notice("my_pkg", provider, current_version="1.0.0", state_dir=state_dir)
+        is None
+    )
+    assert os.path.getsize(state_dir / "my-pkg") == 0
+
+
+def test_fast_path_is_a_single_stat(env, state_dir, monkeypatch):
+    provider = Provider("1.0.0")
+    upgrade_notice("mypkg", provider, current_version="1.0.0", state_dir=state_dir)
+
+    calls = []
+    real_stat, real_open = os.stat, builtins.open
+
+    def _stat(path, *args, **kwargs):
+        calls.append(("stat", os.fspath(path)))
+        return real_stat(path, *args, **kwargs)
+
+    def _open(path, *args, **kwargs):
+        calls.append(("open", os.fspath(path)))
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setattr(os, "stat", _stat)
+    monkeypatch.setattr(builtins, "open", _open)
+
+    assert upgrade_notice("mypkg", provider, state_dir=state_dir) is None
+
+    assert calls == [("stat", os.path.join(state_dir, "mypkg"))]
+    assert provider.calls == ["mypkg"]
+
+
+def test_current_version_defaults_to_the_installed_one(env, state_dir, monkeypatch):
+    monkeypatch.setattr(
+        "detect_installer._notify._installed_version", lambda name: "1.5"
+    )
+
+    notice = upgrade_notice("mypkg", Provider("2.0"), state_dir=state_dir)
+
+    assert notice is not None
+    assert notice.current_version == "1.5"
+
+
+@pytest.mark.parametrize("latest", [None, OSError("offline")])
+def test_provider_failure_retries_after_the_interval(env, state_dir, latest):
+    provider = Provider(latest)
+
+    assert (
+        upgrade_notice("mypkg", provider, current_version="1.0", state_dir=state_dir)
+        is None
+    )
+    assert (
+        upgrade_notice("mypkg", provider, current_version="1.0", state_dir=state_dir)
+        is None
+    )
+    assert len(provider.calls) == 1
+
+    _age(state_dir / "mypkg", DAY + 1)
+    provider.latest = "2.0"
+
+    assert (
+        upgrade_notice("mypkg", provider, current_version="1.0", state_dir=state_dir)
+        is not None
+    )
+
+
+def test_corrupt_state_is_ignored(env, state_dir):
+    state_dir.mkdir()
+    (state_dir / "mypkg").write_text("{not json")
+
+    assert (
+        upgrade_notice(
+            "mypkg", Provider("2.0"), current_version="1.0", state_dir=state_dir
+        )
+        is None
+    )
+
+
+def test_concurrent_checks_leave_a_complete_state_file(env, state_dir):
+    barrier = threading.Barrier(8)
+    provider = Provider("2.0")
+
+    def _check():
+        barrier.wait()
+        upgrade_notice("mypkg", provider, current_version="1.0", state_dir=state_dir)
+
+    threads = [threading.Thread(target=_check) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    notice = upgrade_notice(
+        "mypkg", Provider("3.0"), current_version="1.0", state_dir=state_dir
+    )
+
+    assert notice is not None
+    assert notice.latest_version == "2.0"
+    assert os.listdir(state_dir) == ["mypkg"]
+
+
+def test_state_dir_defaults_to_the_cache_dir(env, tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+    upgrade_notice("mypkg", Provider("1.0"), current_version="1.0")
+
+    assert default_state_dir() == str(tmp_path / "cache/detect-installer/notify")
+    assert os.listdir(default_state_dir()) == ["mypkg"]
+
+
+def test_installed_version():
+    assert _installed_version("pytest") == pytest.__version__
+    assert _installed_version("not-installed-anywhere") is None
+
+
+def test_package_that_is_not_installed(env, state_dir):
+    provider = Provider("2.0")
+
+    assert upgrade_notice("missing", provider, state_dir=state_dir) is None
+    assert provider.calls == ["missing"]
+
+    # A version to compare with, but no distribution to detect the installer of.
+    assert (
+        upgrade_notice(
+            "missing", provider, current_version="1.0", state_dir=state_dir, interval=0
+        )
+        is None
+    )
+    assert os.path.getsize(state_dir / "missing") == 0
+
+
+def test_recorded_notice_uses_the_installed_version(env, state_dir, monkeypatch):
+    upgrade_notice("mypkg", Provider("2.0"), current_version="1.0", state_dir=state_dir)
+    monkeypatch.setattr(
+        "detect_installer._notify._installed_version", lambda name: "1.5"
+    )
+
+    notice = upgrade_notice("mypkg", Provider("3.0"), state_dir=state_dir)
+
+    assert notice is not None
+    assert (notice.current_version, notice.latest_version) == ("1.5", "2.0")
+
+
+@pytest.mark.parametrize(
+    "state",
+    [
+        {"latest": "2.0", "installer": "pip"},
+        {"latest": "2.0", "installer": "bogus", "upgrade_cmd": None},
+        {"latest": 2, "installer": "pip", "upgrade_cmd": "pip install -U mypkg"},
+        [],
+    ],
+)
+def test_unusable_state_is_ignored(env, state_dir, state):
+    state_dir.mkdir()
+    (state_dir / "mypkg").write_text(json.dumps(state))
+
+    assert (
+        upgrade_notice(
+            "mypkg", Provider("2.0"), current_version="1.0", state_dir=state_dir
+        )
+        is None
+    )
+
+
+def test_notice_without_a_command():
+    notice = UpgradeNotice(
+        "mypkg", "1.0", "2.0", InstallerInfo(Installer.UNKNOWN, None)
+    )
+
+    assert str(notice) == "mypkg 2.0 is available (you have 1.0)."
+
+
+def test_notices_are_immutable_values():
+    installer = InstallerInfo(Installer.PIP, "pip install -U mypkg")
+    notice = UpgradeNotice("mypkg", "1.0", "2.0", installer)
+
+    assert notice == UpgradeNotice("mypkg", "1.0", "2.0", installer)
+    assert notice != UpgradeNotice("mypkg", "1.0", "3.0", installer)
+    assert notice != ("mypkg", "1.0", "2.0", installer)
+    assert len({notice, UpgradeNotice("mypkg", "1.0", "2.0", installer)}) == 1
+    assert pickle.loads(pickle.dumps(notice)) == notice
+    assert repr(notice) == (
+        "UpgradeNotice(package='mypkg', current_version='1.0', "
+        f"latest_version='2.0', installer={installer!r})"
+    )
+
+    match notice:
+        case UpgradeNotice(package, _, latest):
+            assert (package, latest) == ("mypkg", "2.0")
+
+    with pytest.raises(AttributeError):
+        notice.latest_version = "3.0"  # type: ignore[misc]  # ty: ignore[invalid-assignment]
+
+    with pytest.raises(AttributeError):
+        del notice.package  # type: ignore[misc]  # ty: ignore[invalid-assignment]
+
+
+def test_unwritable_state_dir(env, tmp_path):
+    (tmp_path / "state").write_text("")
+
+    assert (
+        upgrade_notice(
+            "mypkg",
+            Provider("2.0"),
+            current_version="1.0",
+            state_dir=tmp_path / "state",
+        )
+        is not None
+    )
+
+
+def test_failed_writes_are_cleaned_up(env, state_dir, monkeypatch):
+    def _fail(path, *args):
+        raise PermissionError(path)
+
+    monkeypatch.setattr(os, "replace", _fail)
+
+    assert (
+        upgrade_notice(
+            "mypkg", Provider("2.0"), current_version="1.0", state_dir=state_dir
+        )
+        is not None
+    )
+    assert os.listdir(state_dir) == []
+
+    # Not even the temporary file can be removed.
+    monkeypatch.setattr(os, "unlink", _fail)
+
+    assert (
+        upgrade_notice(
+            "mypkg", Provider("2.0"), current_version="1.0", state_dir=state_dir
+        )
+        is not None
+    )
+
+
+def test_failed_mtime_update_still_checks(env, state_dir, monkeypatch):
+    upgrade_notice("mypkg", Provider("1.0"), current_version="1.0", state_dir=state_dir)
+    _age(state_dir / "mypkg", DAY + 1)
+
+    def _fail(path, *args):
+        raise PermissionError(path)
+
+    monkeypatch.setattr(os, "utime", _fail)
+    provider = Provider("2.0")
+
+    assert (
+        upgrade_notice("mypkg", provider, current_version="1.0", state_dir=state_dir)
+        is not None
+    )
+    assert provider.calls == ["mypkg"]
+
+
+def test_version_ordering():
+    keys = [version_key(version) for version in ORDERED_VERSIONS]
+
+    assert None not in keys
+    assert keys == sorted(key for key in keys if key is not None)
+    assert len(set(keys)) == len(keys)
+
+
+def test_version_helpers():
+    assert version_key("1.0") == version_key("v1.0.0+local.1")
+    assert version_key("1.0-1") == version_key("1.0.post1")
+    assert version_key("not a version") is None
+    assert is_prerelease("2.0rc1")
+    assert is_prerelease("2.0.dev3")
+    assert not is_prerelease("2.0.post1")
+    assert is_newer("2.0", "1.9.9")
+    assert not is_newer("2.0", "2.0.0")
+    assert is_newer("nightly", "1.0")
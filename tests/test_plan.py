@@ -0,0 +1,151 @@
+"""Tests for upgrade_plan, which batches upgrade commands per installer."""
+
+import sys
+
+import pytest
+
+from detect_installer import Installer, UpgradeStep, upgrade_plan
+from tests.fakes import make_dist_info
+
+
+@pytest.fixture()
+def site_packages(fake_env, tmp_path):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+    site_packages = tmp_path / "myproject/.venv/lib/python3.12/site-packages"
+    make_dist_info(site_packages, "other", "pip")
+    make_dist_info(site_packages, "fast_lib", "uv")
+    make_dist_info(site_packages, "quick", "uv")
+    make_dist_info(site_packages, "mystery", None)
+    return site_packages
+
+
+def test_groups_packages_by_installer(site_packages):
+    plan = upgrade_plan(["mypkg", "fast_lib", "other", "quick"])
+
+    assert plan.steps == (
+        UpgradeStep(
+            Installer.PIP,
+            ("mypkg", "other"),
+            ("pip", "install", "-U", "mypkg", "other"),
+        ),
+        UpgradeStep(
+            Installer.UV_PIP,
+            ("fast_lib", "quick"),
+            ("uv", "pip", "install", "--upgrade", "fast_lib", "quick"),
+        ),
+    )
+    assert plan.commands == [
+        "pip install -U mypkg other",
+        "uv pip install --upgrade fast_lib quick",
+    ]
+    assert plan.unbatched == ()
+    assert plan.skipped == {}
+
+
+def test_reports_packages_without_a_command(site_packages):
+    plan = upgrade_plan(["mypkg", "mystery", "missing"])
+
+    assert plan.commands == ["pip install -U mypkg"]
+    assert plan.skipped["missing"] is None
+    mystery = plan.skipped["mystery"]
+    assert mystery is not None
+    assert mystery.installer is Installer.UNKNOWN
+
+
+@pytest.mark.parametrize(
+    ("strategy", "command"),
+    [
+        (
+            "add",
+            "uv add fast_lib quick --upgrade-package fast_lib --upgrade-package quick",
+        ),
+        ("lock", "uv lock --upgrade-package fast_lib --upgrade-package quick"),
+    ],
+)
+def test_uv_project(site_packages, tmp_path, strategy, command):
+    (tmp_path / "myproject/uv.lock").write_text("")
+
+    plan = upgrade_plan(["fast_lib", "quick"], strategy)
+
+    assert plan.commands == [command]
+
+
+def test_pipx_apps_are_upgraded_one_by_one(fake_env, tmp_path):
+    fake_env({"prefix": "home/.local/pipx/venvs/mypkg", "installer_value": "pip"})
+    make_dist_info(
+        tmp_path / "home/.local/pipx/venvs/mypkg/lib/python3.12/site-packages",
+        "other",
+        "pip",
+    )
+
+    plan = upgrade_plan(["mypkg", "other"])
+
+    assert plan.commands == ["pipx upgrade mypkg", "pipx upgrade other"]
+    assert plan.unbatched == ("mypkg", "other")
+
+
+def test_editable_installs_are_not_batched(site_packages):
+    (site_packages / "other-1.0.0.dist-info/direct_url.json").write_text(
+        '{"url": "file:///src/other", "dir_info": {"editable": true}}'
+    )
+
+    plan = upgrade_plan(["mypkg", "other"])
+
+    assert plan.commands == ["pip install -U mypkg", "pip install -U -e /src/other"]
+    assert plan.unbatched == ("other",)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="brew paths are Unix-only")
+def test_brew_packages_are_batched_by_formula(fake_env, tmp_path):
+    fake_env(
+        {
+            "prefix": "opt/homebrew/Frameworks/Python.framework/Versions/3.12",
+            "installer_value": "pip",
+            "brew_formula": "tool",
+        }
+    )
+    site_packages = (
+        tmp_path
+        / "opt/homebrew/Frameworks/Python.framework/Versions/3.12/lib/python3.12"
+        / "site-packages"
+    )
+    for formula, pkg_name in [("tool", "tool_lib"), ("other-tool", "other")]:
+        dist_info = make_dist_info(
+            tmp_path / "Cellar" / formula / "1.0.0/lib/python3.12/site-packages",
+            pkg_name,
+            "pip",
+        )
+        (tmp_path / "Cellar" / formula / "1.0.0/INSTALL_RECEIPT.json").write_text("{}")
+        (site_packages / dist_info.name).symlink_to(dist_info)
+    make_dist_info(site_packages, "pipped", "pip")
+
+    plan = upgrade_plan(["mypkg", "pipped", "tool_lib", "other"])
+
+    assert plan.steps == (
+        UpgradeStep(
+            Installer.BREW,
+            ("mypkg", "tool_lib", "other"),
+            ("brew", "upgrade", "tool", "other-tool"),
+        ),
+        UpgradeStep(Installer.PIP, ("pipped",), ("pip", "install", "-U", "pipped")),
+    )
+    assert plan.unbatched == ()
+
+
+def test_commands_are_shell_quoted(site_packages):
+    # Not a valid project name, but nothing stops it from being on disk.
+    make_dist_info(site_packages, "a;b", "pip")
+
+    plan = upgrade_plan(["mypkg", "a;b"])
+
+    assert plan.commands == ["pip install -U mypkg 'a;b'"]
+
+
+def test_other_environment(tmp_path):
+    prefix = tmp_path / "other"
+    make_dist_info(prefix / "lib/python3.12/site-packages", "mypkg", "uv")
+
+    plan = upgrade_plan(["mypkg"], environment=prefix)
+
+    assert plan.commands == ["uv pip install --upgrade mypkg"]
+    assert str(prefix) not in sys.path
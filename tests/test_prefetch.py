@@ -0,0 +1,155 @@
+"""Tests for background prefetching of detections."""
+
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+import detect_installer as package
+from detect_installer import (
+    Installer,
+    InstallerInfo,
+    detect_installer,
+    prefetch_installer,
+)
+from detect_installer._detect import _UNKNOWN_FAST
+from detect_installer._prefetch import _Prefetch, _run
+
+
+@pytest.fixture()
+def blocked_detection(monkeypatch):
+    """Make detections wait until released."""
+    release = threading.Event()
+
+    from detect_installer import _prefetch
+
+    original = _prefetch.detect_installer
+
+    def _blocking(*args, **kwargs):
+        release.wait(timeout=5)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr("detect_installer._prefetch.detect_installer", _blocking)
+    yield release
+    release.set()
+
+
+def test_resolves_to_the_detection_result(fake_env):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+
+    future = prefetch_installer("mypkg")
+
+    result = future.result(timeout=5)
+    assert result is not None
+    assert result == detect_installer("mypkg")
+    assert result.installer is Installer.PIP
+    assert prefetch_installer("missing").result(timeout=5) is None
+
+
+def test_runs_on_a_daemon_thread(fake_env, blocked_detection):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+
+    future = prefetch_installer("mypkg")
+    (thread,) = [
+        t for t in threading.enumerate() if t.name.startswith("detect-installer-")
+    ]
+
+    assert thread.daemon
+    assert not future.done()
+
+    blocked_detection.set()
+    thread.join(timeout=5)
+    assert future.done()
+
+
+def test_timeout_falls_back_to_unknown(fake_env, blocked_detection):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+
+    future = prefetch_installer("mypkg")
+
+    assert future.result(timeout=0.01) is _UNKNOWN_FAST
+
+    blocked_detection.set()
+    result = future.result(timeout=5)
+    assert result is not None
+    assert result.installer is Installer.PIP
+
+
+def test_memoized_result_needs_no_thread(fake_env, monkeypatch):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+    expected = detect_installer("mypkg")
+
+    def _no_threads(self):
+        raise AssertionError("a thread was started")
+
+    monkeypatch.setattr(threading.Thread, "start", _no_threads)
+    future = prefetch_installer("mypkg")
+
+    assert future.done()
+    assert future.result() is expected
+
+
+def test_no_thread_at_shutdown_falls_back_to_fast(fake_env, monkeypatch):
+    fake_env({"prefix": "home/.local/pipx/venvs/mypkg", "installer_value": "pip"})
+
+    def _shutting_down(self):
+        raise RuntimeError("can't create new thread at interpreter shutdown")
+
+    monkeypatch.setattr(threading.Thread, "start", _shutting_down)
+    future = prefetch_installer("mypkg")
+
+    assert future.done()
+    assert future.result() == InstallerInfo(
+        Installer.PIPX, "pipx upgrade mypkg", "fast"
+    )
+
+
+def test_cancelled_prefetch_does_not_detect(monkeypatch):
+    def _detect(*args, **kwargs):
+        raise AssertionError("detected after cancel()")
+
+    monkeypatch.setattr("detect_installer._prefetch.detect_installer", _detect)
+    future = _Prefetch()
+    future.cancel()
+
+    _run(future, "mypkg", "add", True)
+
+    assert future.cancelled()
+
+
+def test_exceptions_are_raised_from_result(fake_env, monkeypatch):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+
+    def _broken(*args, **kwargs):
+        raise OSError("boom")
+
+    monkeypatch.setattr("detect_installer._prefetch.detect_installer", _broken)
+
+    with pytest.raises(OSError, match="boom"):
+        prefetch_installer("mypkg", use_cache=False).result(timeout=5)
+
+
+def test_interpreter_exit_does_not_wait():
+    # A detection that never finishes, prefetched both before and during
+    # shutdown, must not hold up or break the exit.
+    code = (
+        "import atexit, time\n"
+        "from detect_installer import _prefetch\n"
+        "_prefetch.detect_installer = lambda *a, **k: time.sleep(60)\n"
+        "_prefetch.prefetch_installer('pip')\n"
+        "atexit.register(_prefetch.prefetch_installer, 'pip')\n"
+    )
+    package_parent = os.path.dirname(os.path.dirname(package.__file__))
+
+    completed = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": package_parent},
+        timeout=30,
+    )
+
+    assert completed.returncode == 0, completed.stderr
+    assert completed.stderr == ""
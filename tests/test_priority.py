@@ -20,13 +20,14 @@ def test_pipx_wins_over_pip_metadata(fake_env):
 
 @pytest.mark.skipif(sys.platform == "win32", reason="brew paths are Unix-only")
 def test_brew_wins_over_pip_metadata(fake_env):
-    """Homebrew Python with INSTALLER saying 'pip' — brew should win."""
+    """Formula-owned package with INSTALLER saying 'pip' — brew should win."""
     fake_env(
         {
             "prefix": "opt/homebrew/Frameworks/Python.framework/Versions/3.12",
             "executable": "opt/homebrew/Frameworks/Python.framework/Versions/3.12/bin/python3",
             "site_packages": "opt/homebrew/Frameworks/Python.framework/Versions/3.12/lib/python3.12/site-packages",
             "installer_value": "pip",
+            "brew_formula": "mypkg",
         }
     )
     result = detect_installer("mypkg")
@@ -34,13 +35,30 @@ def test_brew_wins_over_pip_metadata(fake_env):
     assert result.installer is Installer.BREW
 
 
+@pytest.mark.skipif(sys.platform == "win32", reason="brew paths are Unix-only")
+def test_pip_wins_in_homebrew_python(fake_env):
+    """pip install into Homebrew's Python — no formula owns it, pip should win."""
+    fake_env(
+        {
+            "prefix": "opt/homebrew/Frameworks/Python.framework/Versions/3.12",
+            "executable": "opt/homebrew/Frameworks/Python.framework/Versions/3.12/bin/python3",
+            "site_packages": "opt/homebrew/Frameworks/Python.framework/Versions/3.12/lib/python3.12/site-packages",
+            "installer_value": "pip",
+        }
+    )
+    result = detect_installer("mypkg")
+    assert result is not None
+    assert result.installer is Installer.PIP
+
+
 def test_conda_wins_over_pip_metadata(fake_env, tmp_path):
-    """Conda env with INSTALLER saying 'pip' — conda should win."""
+    """Conda env listing the package in conda-meta, INSTALLER saying 'pip' — conda should win."""
     fake_env(
         {
             "prefix": "conda_env",
             "installer_value": "pip",
             "env": {"CONDA_PREFIX": str(tmp_path / "conda_env")},
+            "conda_packages": ["mypkg"],
         }
     )
     result = detect_installer("mypkg")
@@ -48,6 +66,21 @@ def test_conda_wins_over_pip_metadata(fake_env, tmp_path):
     assert result.installer is Installer.CONDA
 
 
+def test_pip_metadata_wins_for_packages_conda_does_not_list(fake_env, tmp_path):
+    """pip install inside a conda env — conda-meta does not list it, so PIP."""
+    fake_env(
+        {
+            "prefix": "conda_env",
+            "installer_value": "pip",
+            "env": {"CONDA_PREFIX": str(tmp_path / "conda_env")},
+            "conda_packages": ["python", "numpy"],
+        }
+    )
+    result = detect_installer("mypkg")
+    assert result is not None
+    assert result.installer is Installer.PIP
+
+
 def test_uv_tool_wins_over_uv_metadata(fake_env):
     """uv tool path with INSTALLER saying 'uv' — UV_TOOL should win, not UV or UV_PIP."""
     fake_env(
@@ -0,0 +1,100 @@
+"""Tests for the process-wide detection counters and their OpenMetrics export."""
+
+import re
+
+import pytest
+
+from detect_installer import (
+    Installer,
+    detect_installer,
+    detect_installers,
+    reset_stats,
+    stats,
+)
+from tests.fakes import make_dist_info
+
+
+@pytest.fixture(autouse=True)
+def _fresh_stats():
+    reset_stats()
+    yield
+    reset_stats()
+
+
+@pytest.fixture()
+def env(fake_env, tmp_path):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+    site_packages = tmp_path / "myproject/.venv/lib/python3.12/site-packages"
+    make_dist_info(site_packages, "fast_lib", "uv")
+
+
+def test_counts_calls_cache_layers_and_not_found(env):
+    detect_installer("mypkg")
+    detect_installer("mypkg")
+    detect_installers(["mypkg", "fast_lib", "missing"])
+
+    snapshot = stats()
+
+    assert snapshot.calls == 5
+    assert snapshot.not_found == 1
+    assert snapshot.cache["memory"].hits == 2
+    assert snapshot.cache["memory"].misses == 3
+    assert snapshot.cache["memory"].hit_rate == pytest.approx(0.4)
+    assert snapshot.cache["dist_index"].misses >= 1
+    assert snapshot.fs_calls["scandir"] >= 1
+    assert snapshot.fs_calls["open"] >= 2
+
+
+def test_latency_per_branch(env):
+    detect_installers(["mypkg", "fast_lib", "missing"])
+    detect_installer("mypkg", use_cache=False)
+
+    latency = stats().latency
+
+    assert set(latency) == {Installer.PIP.value, Installer.UV_PIP.value, "not-found"}
+    pip = latency[Installer.PIP.value]
+    assert pip.count == 2
+    assert pip.buckets[-1] == (float("inf"), 2)
+    assert [count for _, count in pip.buckets] == sorted(
+        count for _, count in pip.buckets
+    )
+    assert pip.sum_seconds > 0
+
+
+def test_snapshots_are_frozen_and_reset(env):
+    detect_installer("mypkg")
+    before = stats()
+
+    reset_stats()
+    after = stats()
+
+    assert before.calls == 1
+    assert after.calls == 0
+    assert after.cache["memory"].hits == after.cache["memory"].misses == 0
+    assert after.fs_calls == {"stat": 0, "scandir": 0, "open": 0}
+    assert after.latency == {}
+
+    # Counting goes on after a reset.
+    detect_installer("mypkg")
+    assert stats().cache["memory"].hits == 1
+
+
+def test_openmetrics(env):
+    detect_installers(["mypkg", "missing"])
+
+    text = stats().openmetrics()
+    lines = text.splitlines()
+
+    assert text.endswith("# EOF\n")
+    assert "detect_installer_calls_total 2" in lines
+    assert "detect_installer_not_found_total 1" in lines
+    assert 'detect_installer_cache_misses_total{layer="memory"} 2' in lines
+    assert "# TYPE detect_installer_detection_seconds histogram" in lines
+    assert 'detect_installer_detection_seconds_count{branch="pip"} 1' in lines
+    assert 'detect_installer_detection_seconds_bucket{branch="pip",le="+Inf"} 1' in (
+        lines
+    )
+
+    sample = re.compile(r'^[a-z_]+(\{[a-z_]+="[^"]*"(,[a-z_]+="[^"]*")*\})? \S+$')
+    for line in lines:
+        assert line.startswith("# ") or sample.match(line), line
@@ -0,0 +1,141 @@
+"""Tests for the fast (zero I/O) and thorough detection strategies."""
+
+import contextlib
+import os
+import subprocess
+import sys
+
+import pytest
+
+from detect_installer import Installer, InstallerInfo, detect_installer
+
+
+@contextlib.contextmanager
+def no_filesystem():
+    """Make every way the detection could touch the filesystem fail."""
+
+    def _forbidden(*args, **kwargs):
+        raise AssertionError(f"filesystem access: {args!r}")
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        for name in ("stat", "lstat", "scandir", "listdir", "open"):
+            monkeypatch.setattr(os, name, _forbidden)
+        monkeypatch.setattr("builtins.open", _forbidden)
+        yield
+
+
+def test_fast_uses_the_path_checks(fake_env):
+    fake_env({"prefix": "home/.local/pipx/venvs/mypkg", "installer_value": "pip"})
+    with no_filesystem():
+        info = detect_installer("mypkg", strategy="fast")
+
+    assert info == InstallerInfo(Installer.PIPX, "pipx upgrade mypkg", "fast")
+
+
+def test_fast_does_not_compile_the_path_checks_before_re_is_imported(fake_env):
+    fake_env({"prefix": "home/.local/pipx/venvs/mypkg", "installer_value": "pip"})
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr("detect_installer._detect._path_classifier", None)
+        monkeypatch.delitem(sys.modules, "re")
+        info = detect_installer("mypkg", strategy="fast")
+
+    assert info == InstallerInfo(Installer.UNKNOWN, None, "fast")
+
+
+def test_fast_uses_environment_variables(fake_env, monkeypatch):
+    fake_env(
+        {
+            "prefix": "envs/data",
+            "installer_value": "pip",
+            "env": {"MAMBA_EXE": "/usr/bin/mamba"},
+        }
+    )
+    monkeypatch.setenv("CONDA_PREFIX", sys.prefix)
+
+    with no_filesystem():
+        info = detect_installer("mypkg", strategy="fast")
+
+    assert info is not None
+    assert info.installer is Installer.MAMBA
+
+
+def test_fast_is_unknown_without_metadata(fake_env):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+    with no_filesystem():
+        info = detect_installer("mypkg", strategy="fast")
+
+    assert info == InstallerInfo(Installer.UNKNOWN, None, "fast")
+
+
+def test_fast_reuses_a_thorough_result(fake_env):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+    thorough = detect_installer("mypkg")
+    with no_filesystem():
+        assert detect_installer("mypkg", strategy="fast") is thorough
+    assert thorough is not None
+    assert thorough.strategy == "thorough"
+
+
+def test_fast_knows_missing_packages_from_the_index(fake_env):
+    fake_env({"prefix": "home/.local/pipx/venvs/mypkg", "installer_value": "pip"})
+    # Lists every sys.path directory without memoizing a result.
+    detect_installer("missing", use_cache=False)
+
+    with no_filesystem():
+        assert detect_installer("also-missing", strategy="fast") is None
+        info = detect_installer("mypkg", strategy="fast")
+
+    assert info is not None
+    assert info.installer is Installer.PIPX
+
+
+def test_fast_does_not_memoize(fake_env):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+
+    fast = detect_installer("mypkg", strategy="fast")
+    thorough = detect_installer("mypkg")
+
+    assert fast is not None
+    assert fast.strategy == "fast"
+    assert thorough is not None
+    assert thorough.strategy == "thorough"
+
+
+def test_fast_rejects_other_environments(tmp_path):
+    with pytest.raises(ValueError, match="fast"):
+        detect_installer("mypkg", strategy="fast", environment=tmp_path)
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError, match="'quick'"):
+        detect_installer("mypkg", strategy="quick")  # type: ignore[arg-type]  # ty: ignore[invalid-argument-type]
+
+
+def test_fast_opens_nothing_in_a_fresh_interpreter():
+    # Audit hooks also see the files read by imports.
+    package_file = sys.modules["detect_installer"].__file__
+    assert package_file is not None
+    package_parent = os.path.dirname(os.path.dirname(package_file))
+    code = (
+        "import sys\n"
+        "from detect_installer import detect_installer\n"
+        "events = []\n"
+        "def hook(event, args):\n"
+        "    if event in ('open', 'os.scandir', 'os.listdir'):\n"
+        "        events.append((event, args[0]))\n"
+        "sys.addaudithook(hook)\n"
+        "info = detect_installer('rich', strategy='fast')\n"
+        "print(info.strategy, events)\n"
+    )
+
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": package_parent},
+        check=True,
+        timeout=60,
+    )
+
+    assert result.stdout.strip() == "fast []"
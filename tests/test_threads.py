@@ -0,0 +1,266 @@
+"""Tests for detecting from many threads at once, and after os.fork()."""
+
+import os
+import threading
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from detect_installer import (
+    Installer,
+    InstallerInfo,
+    _async,
+    _detect,
+    clear_cache,
+    detect_installer,
+    detect_installers,
+)
+
+
+@pytest.fixture()
+def slow_detection(fake_env, monkeypatch):
+    """Count detections and hold each one until `release` is set."""
+
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+    calls = []
+    release = threading.Event()
+    detect = _detect._detect_from_distribution
+
+    def _slow(package_name, *args):
+        calls.append(package_name)
+        assert release.wait(10)
+        return detect(package_name, *args)
+
+    monkeypatch.setattr(_detect, "_detect_from_distribution", _slow)
+    return calls, release
+
+
+def _until(condition):
+    for _ in range(10_000):
+        if condition():
+            return
+        threading.Event().wait(0.001)
+
+    raise AssertionError("timed out")
+
+
+def test_concurrent_callers_share_one_detection(slow_detection, monkeypatch):
+    calls, release = slow_detection
+    waiters = []
+    wait = _detect._InFlight.wait
+
+    def _wait(flight):
+        waiters.append(flight)
+        return wait(flight)
+
+    monkeypatch.setattr(_detect._InFlight, "wait", _wait)
+
+    with ThreadPoolExecutor(8) as pool:
+        futures = [pool.submit(detect_installer, "mypkg") for _ in range(8)]
+        _until(lambda: len(waiters) == 7)
+        release.set()
+        results = [future.result(timeout=10) for future in futures]
+
+    assert calls == ["mypkg"]
+    assert all(result is results[0] for result in results)
+    assert results[0] is not None
+    assert results[0].installer is Installer.PIP
+
+
+def test_batches_join_single_detections(slow_detection):
+    calls, release = slow_detection
+
+    with ThreadPoolExecutor(2) as pool:
+        single = pool.submit(detect_installer, "mypkg")
+        _until(lambda: calls)
+        batch = pool.submit(detect_installers, ["mypkg", "missing"])
+        release.set()
+
+        assert batch.result(timeout=10)["mypkg"] is single.result(timeout=10)
+
+    assert calls == ["mypkg"]
+
+
+def test_failures_reach_every_waiter_and_are_not_memoized(fake_env, monkeypatch):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+    release = threading.Event()
+
+    def _failing(*args):
+        assert release.wait(10)
+        raise OSError("disk went away")
+
+    monkeypatch.setattr(_detect, "_detect_from_distribution", _failing)
+
+    with ThreadPoolExecutor(4) as pool:
+        futures = [pool.submit(detect_installer, "mypkg") for _ in range(4)]
+        release.set()
+
+        for future in futures:
+            with pytest.raises(OSError, match="disk went away"):
+                future.result(timeout=10)
+
+    monkeypatch.undo()
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+    result = detect_installer("mypkg")
+
+    assert result is not None
+    assert result.installer is Installer.PIP
+    assert not _detect._in_flight
+
+
+def test_interruptions_are_not_shared_with_waiters(fake_env, monkeypatch):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+    calls = []
+    release = threading.Event()
+    detect = _detect._detect_from_distribution
+    waiters = []
+    wait = _detect._InFlight.wait
+
+    def _interrupted_once(package_name, *args):
+        calls.append(package_name)
+
+        if len(calls) == 1:
+            assert release.wait(10)
+            raise KeyboardInterrupt
+
+        return detect(package_name, *args)
+
+    def _wait(flight):
+        waiters.append(flight)
+        return wait(flight)
+
+    monkeypatch.setattr(_detect, "_detect_from_distribution", _interrupted_once)
+    monkeypatch.setattr(_detect._InFlight, "wait", _wait)
+
+    with ThreadPoolExecutor(3) as pool:
+        owner = pool.submit(detect_installer, "mypkg")
+        _until(lambda: calls)
+        single = pool.submit(detect_installer, "mypkg")
+        batch = pool.submit(detect_installers, ["mypkg"])
+        _until(lambda: len(waiters) == 2)
+        release.set()
+
+        with pytest.raises(KeyboardInterrupt):
+            owner.result(timeout=10)
+
+        result = single.result(timeout=10)
+
+        assert result is not None
+        assert result.installer is Installer.PIP
+        assert batch.result(timeout=10) == {"mypkg": result}
+
+    # The waiters ran the detection again themselves, once.
+    assert calls == ["mypkg", "mypkg"]
+    assert not _detect._in_flight
+
+
+def test_result_memoized_while_waiting_is_reused(fake_env):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+    expected = InstallerInfo(Installer.PIP, "pip install -U mypkg")
+    key = ("mypkg", "add", _detect._environment_fingerprint())
+    misses = _detect._memory_cache[1]
+
+    with ThreadPoolExecutor(1) as pool:
+        with _detect._in_flight_lock:
+            future = pool.submit(detect_installer, "mypkg")
+            _until(lambda: _detect._memory_cache[1] > misses)
+            # Another thread finished the detection in the meantime.
+            _detect._cache[key] = expected
+
+        assert future.result(timeout=10) is expected
+
+
+def test_batch_failures_are_not_left_in_flight(fake_env, monkeypatch):
+    fake_env({"prefix": "myproject/.venv", "installer_value": "pip"})
+
+    def _failing(*args):
+        raise OSError("disk went away")
+
+    monkeypatch.setattr(_detect, "_detect_from_distribution", _failing)
+
+    with pytest.raises(OSError, match="disk went away"):
+        detect_installers(["mypkg", "other"])
+
+    assert not _detect._in_flight
+
+
+def test_uv_lock_scan_rechecks_after_waiting_its_turn(tmp_path):
+    lock = tmp_path / "uv.lock"
+    lock.write_text('[[package]]\nname = "mypkg"\n')
+    scan = _detect._UvLockScan(0)
+    misses = _detect._counters.cache["uv_lock"][1]
+    opens = _detect._fs_calls.open
+
+    with ThreadPoolExecutor(1) as pool:
+        with scan.lock:
+            future = pool.submit(scan.locks, str(lock), "mypkg")
+            _until(lambda: _detect._counters.cache["uv_lock"][1] > misses)
+            # Another thread found the package while this one waited.
+            scan.names.add("mypkg")
+
+        assert future.result(timeout=10)
+
+    assert _detect._fs_calls.open == opens
+
+
+def test_clear_cache_drops_running_detections(slow_detection):
+    calls, release = slow_detection
+
+    with ThreadPoolExecutor(1) as pool:
+        future = pool.submit(detect_installer, "mypkg")
+        _until(lambda: calls)
+        clear_cache()
+        release.set()
+        future.result(timeout=10)
+
+    # The result was computed before clear_cache() returned: not memoized.
+    assert not _detect._cache
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_child_does_not_wait_for_the_parents_threads(slow_detection):
+    calls, release = slow_detection
+
+    with ThreadPoolExecutor(1) as pool:
+        future = pool.submit(detect_installer, "mypkg")
+        _until(lambda: calls)
+
+        with warnings.catch_warnings():
+            # Forking a multi-threaded process is what this test is about.
+            warnings.simplefilter("ignore", DeprecationWarning)
+            pid = os.fork()
+
+        if pid == 0:
+            try:
+                release.set()
+                info = detect_installer("mypkg")
+                ok = len(calls) == 2 and info is not None and info.installer == "pip"
+                os._exit(0 if ok else 1)
+            finally:
+                os._exit(2)
+
+        release.set()
+        future.result(timeout=10)
+
+    _, status = os.waitpid(pid, 0)
+
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert _detect._in_flight == {}
+
+
+def test_fork_hooks_replace_locks_and_forget_running_work(tmp_path, monkeypatch):
+    (tmp_path / "uv.lock").write_text("")
+    _detect._uv_lock_locks(str(tmp_path), "mypkg")
+    (scan,) = _detect._uv_lock_scans.values()
+    scan_lock = scan.lock
+    monkeypatch.setattr(_detect, "_in_flight", {"running": object()})
+    monkeypatch.setattr(_detect, "_in_flight_lock", _detect._in_flight_lock)
+    monkeypatch.setattr(_async, "_executor", ThreadPoolExecutor(1))
+
+    _detect._after_fork_in_child()
+    _async._after_fork_in_child()
+
+    assert _detect._in_flight == {}
+    assert scan.lock is not scan_lock
+    assert _async._executor is None
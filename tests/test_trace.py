@@ -0,0 +1,194 @@
+"""Tests for explain_installer and its decision trace."""
+
+import pytest
+
+from detect_installer import (
+    DetectionTrace,
+    Installer,
+    detect_installer,
+    explain_installer,
+)
+from tests.fakes import make_dist_info
+
+SPECS = {
+    "pipx": {"prefix": "home/.local/pipx/venvs/mypkg", "installer_value": "pip"},
+    "uv-tool": {"prefix": "home/.local/share/uv/tools/mypkg", "installer_value": "uv"},
+    "conda": {
+        "prefix": "home/miniconda3/envs/myenv",
+        "installer_value": "pip",
+        "conda_packages": ["mypkg"],
+    },
+    "mamba": {
+        "prefix": "home/miniforge3/envs/myenv",
+        "installer_value": "pip",
+        "env": {"MAMBA_EXE": "/usr/bin/mamba"},
+        "conda_packages": ["mypkg"],
+    },
+    "pip-in-conda": {"prefix": "home/miniconda3/envs/myenv", "installer_value": "pip"},
+    "conda-metadata": {
+        "prefix": "home/miniconda3/envs/myenv",
+        "installer_value": "conda",
+    },
+    "brew": {
+        "prefix": "opt/homebrew/Frameworks/Python.framework/Versions/3.12",
+        "executable": "opt/homebrew/Frameworks/Python.framework/Versions/3.12/bin/python3",
+        "installer_value": "pip",
+        "brew_formula": "mypkg-formula",
+    },
+    "pip-in-brew": {
+        "prefix": "opt/homebrew/Frameworks/Python.framework/Versions/3.12",
+        "executable": "opt/homebrew/Frameworks/Python.framework/Versions/3.12/bin/python3",
+        "installer_value": "pip",
+    },
+    "uv-project": {
+        "prefix": "myproject/.venv",
+        "installer_value": "uv",
+        "extra_files": {"myproject/uv.lock": ""},
+    },
+    "uv-project-direct": {
+        "prefix": "myproject/.venv",
+        "installer_value": "uv",
+        "extra_files": {
+            "myproject/uv.lock": "",
+            "myproject/pyproject.toml": '[project]\ndependencies = ["mypkg"]\n',
+        },
+    },
+    "uv-project-transitive": {
+        "prefix": "myproject/.venv",
+        "installer_value": "uv",
+        "extra_files": {
+            "myproject/uv.lock": '[[package]]\nname = "mypkg"\nversion = "1.0.0"\n',
+            "myproject/pyproject.toml": "[project]\ndependencies = []\n",
+        },
+    },
+    "uv-pip": {"prefix": "myproject/.venv", "installer_value": "uv"},
+    "pip": {"prefix": "myproject/.venv", "installer_value": "pip"},
+    "editable": {
+        "prefix": "myproject/.venv",
+        "installer_value": "pip",
+        "extra_files": {
+            "myproject/.venv/lib/python3.12/site-packages/mypkg-1.0.0.dist-info/"
+            "direct_url.json": '{"url": "file:///src/mypkg", '
+            '"dir_info": {"editable": true}}',
+        },
+    },
+    "unknown": {"prefix": "myproject/.venv", "installer_value": None},
+    "not-found": {"prefix": "myproject/.venv", "no_package": True},
+}
+
+
+@pytest.fixture(autouse=True)
+def _neutral_conda(monkeypatch):
+    monkeypatch.delenv("CONDA_PREFIX", raising=False)
+    monkeypatch.delenv("MAMBA_EXE", raising=False)
+
+
+# explain_installer() repeats the decisions of detect_installer() probe by
+# probe, so every branch is checked against it with every uv strategy.
+@pytest.mark.parametrize("uv_upgrade_strategy", ["add", "lock", "auto"])
+@pytest.mark.parametrize("branch", list(SPECS))
+def test_result_matches_detect_installer(fake_env, branch, uv_upgrade_strategy):
+    fake_env(SPECS[branch])
+
+    result, trace = explain_installer("mypkg", uv_upgrade_strategy)
+
+    assert isinstance(trace, DetectionTrace)
+    assert trace.result == result
+    assert result == detect_installer("mypkg", uv_upgrade_strategy, use_cache=False)
+
+
+def test_other_environment(tmp_path):
+    make_dist_info(tmp_path / "venv/lib/python3.12/site-packages", "mypkg", "uv")
+
+    result, _ = explain_installer("mypkg", environment=tmp_path / "venv")
+
+    assert result is not None
+    assert result.installer is Installer.UV_PIP
+    assert result == detect_installer("mypkg", environment=tmp_path / "venv")
+
+
+def test_requested_marker(tmp_path):
+    site_packages = tmp_path / "venv/lib/python3.12/site-packages"
+    make_dist_info(site_packages, "mypkg", "pip")
+    (make_dist_info(site_packages, "wanted", "pip") / "REQUESTED").write_text("")
+
+    assert (
+        explain_installer("mypkg", environment=tmp_path / "venv")[1].requested is False
+    )
+    assert (
+        explain_installer("wanted", environment=tmp_path / "venv")[1].requested is True
+    )
+    assert (
+        explain_installer("missing", environment=tmp_path / "venv")[1].requested is None
+    )
+
+
+def test_brew_formula_probe(fake_env):
+    fake_env(SPECS["brew"])
+
+    result, trace = explain_installer("mypkg")
+
+    assert result is not None
+    assert result.upgrade_cmd == "brew upgrade mypkg-formula"
+    assert [probe.name for probe in trace.probes][-2:] == ["brew", "brew-formula"]
+    assert trace.decided_by is trace.probes[-1]
+    assert trace.probes[-1].outcome == "mypkg-formula"
+
+
+def test_probes_are_listed_in_order(fake_env):
+    fake_env(SPECS["uv-project"])
+
+    result, trace = explain_installer("mypkg")
+
+    assert result is not None
+    assert result.installer is Installer.UV
+    assert [probe.name for probe in trace.probes] == [
+        "distribution",
+        "pipx",
+        "uv-tool",
+        "conda",
+        "brew",
+        "installer-metadata",
+        "uv-project",
+    ]
+    assert trace.decided_by is trace.probes[-1]
+    assert trace.probes[-1].outcome.endswith("myproject")
+    assert trace.probes[5].outcome == "uv"
+
+
+def test_stops_at_first_matching_environment_probe(fake_env, tmp_path):
+    fake_env(SPECS["pipx"])
+
+    _, trace = explain_installer("mypkg")
+
+    assert [probe.name for probe in trace.probes] == ["distribution", "pipx"]
+    assert trace.decided_by is not None
+    assert trace.decided_by.name == "pipx"
+    assert trace.probes[1].inputs == {"prefix": str(tmp_path / SPECS["pipx"]["prefix"])}
+
+
+def test_not_found(fake_env):
+    fake_env(SPECS["not-found"])
+
+    result, trace = explain_installer("mypkg")
+
+    assert result is None
+    assert [probe.name for probe in trace.probes] == ["distribution"]
+    assert trace.decided_by is trace.probes[0]
+
+
+def test_timings_and_filesystem_calls(fake_env):
+    fake_env(SPECS["pip"])
+
+    _, trace = explain_installer("mypkg")
+    distribution, *_, metadata = trace.probes
+
+    # The dist-info index is cold, so the fake site-packages (first on
+    # sys.path) is stat'ed and listed.
+    assert distribution.fs_calls == 2
+    # One listing of the dist-info directory, one read of INSTALLER.
+    assert metadata.fs_calls == 2
+    assert trace.probes[1].fs_calls == 0
+    assert all(probe.elapsed_ns >= 0 for probe in trace.probes)
+    assert trace.elapsed_ns == sum(probe.elapsed_ns for probe in trace.probes)
+    assert trace.fs_calls == sum(probe.fs_calls for probe in trace.probes)
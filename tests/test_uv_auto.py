@@ -0,0 +1,196 @@
+"""Tests for the "auto" uv strategy, which picks uv add or uv lock per package."""
+
+import os
+
+import pytest
+
+from detect_installer import Installer, detect_installer, upgrade_plan
+from detect_installer._detect import (
+    _fs_calls,
+    _read_pyproject_dependencies,
+    _resolve_uv_upgrade_strategy,
+    _uv_lock_scans,
+)
+from detect_installer._disk_cache import DiskCache
+from tests.fakes import make_dist_info
+
+PYPROJECT = """\
+[project]
+name = "app"
+dependencies = [
+    "Rich>=13",  # terminal output
+    # "mypkg" was removed
+    'httpx[http2,socks] ; python_version >= "3.10"',  # not "sniffio" [yet
+    "tqdm#egg",
+    "click ; platform_machine != \\"x86#64\\"",
+]
+
+[project.optional-dependencies]
+docs = ["mkdocs"]
+
+[dependency-groups]
+dev = [{include-group = "lint"}, "pytest"]
+lint = ["ruff"]
+
+[tool.uv]
+dev-dependencies = ["coverage[toml]"]
+
+[tool.other]
+dependencies = ["not-a-dependency"]
+"""
+
+
+def _lock(*names):
+    entries = "".join(
+        f'[[package]]\nname = "{name}"\nversion = "1.0.0"\n'
+        f'source = {{ registry = "https://pypi.org/simple" }}\n'
+        f'dependencies = [\n    {{ name = "idna" }},\n]\n\n'
+        for name in names
+    )
+    return f'version = 1\nrequires-python = ">=3.12"\n\n{entries}'
+
+
+@pytest.fixture()
+def project(fake_env, tmp_path):
+    root = tmp_path / "app"
+    fake_env(
+        {
+            "prefix": "app/.venv",
+            "installer_value": "uv",
+            "extra_files": {
+                "app/pyproject.toml": PYPROJECT,
+                "app/uv.lock": _lock("app", "rich", "mypkg", "idna"),
+            },
+        }
+    )
+    site_packages = root / ".venv/lib/python3.12/site-packages"
+    make_dist_info(site_packages, "rich", "uv")
+    make_dist_info(site_packages, "stray", "uv")
+    return root
+
+
+def test_reads_every_kind_of_direct_dependency(tmp_path):
+    path = tmp_path / "pyproject.toml"
+    path.write_text(PYPROJECT)
+
+    assert _read_pyproject_dependencies(str(path)) == {
+        "rich",
+        "httpx",
+        "tqdm",
+        "click",
+        "mkdocs",
+        "pytest",
+        "ruff",
+        "coverage",
+    }
+
+
+def test_missing_pyproject_has_no_dependencies(tmp_path):
+    assert _read_pyproject_dependencies(str(tmp_path / "pyproject.toml")) == set()
+
+
+def _upgrade_cmd(package_name, uv_upgrade_strategy="auto"):
+    result = detect_installer(package_name, uv_upgrade_strategy)
+    assert result is not None
+    return result.upgrade_cmd
+
+
+def test_direct_dependencies_are_added(project):
+    assert _upgrade_cmd("rich") == ("uv add rich --upgrade-package rich")
+
+
+def test_transitive_dependencies_are_locked(project):
+    info = detect_installer("mypkg", "auto")
+
+    assert info is not None
+    assert info.installer is Installer.UV
+    assert info.upgrade_cmd == "uv lock --upgrade-package mypkg"
+
+
+def test_unlocked_packages_are_added(project):
+    assert _upgrade_cmd("stray") == ("uv add stray --upgrade-package stray")
+
+
+def test_lock_scan_stops_at_the_package_and_resumes(project):
+    root = str(project)
+    lock = project / "uv.lock"
+
+    assert _resolve_uv_upgrade_strategy("auto", root, "mypkg") == "lock"
+    scan = _uv_lock_scans[str(lock)]
+    stopped_at = scan.offset
+    assert 0 < stopped_at < lock.stat().st_size
+
+    # Already seen: answered without reading.
+    before = _fs_calls.open
+    assert _resolve_uv_upgrade_strategy("auto", root, "app") == "lock"
+    assert _fs_calls.open == before
+
+    assert _resolve_uv_upgrade_strategy("auto", root, "idna") == "lock"
+    assert scan.offset > stopped_at
+    assert not scan.complete
+
+
+def test_files_are_read_again_when_they_change(project):
+    root = str(project)
+    assert _resolve_uv_upgrade_strategy("auto", root, "mypkg") == "lock"
+
+    before = _fs_calls.open
+    assert _resolve_uv_upgrade_strategy("auto", root, "mypkg") == "lock"
+    assert _fs_calls.open == before
+
+    pyproject = project / "pyproject.toml"
+    pyproject.write_text(PYPROJECT.replace('"mkdocs"', '"mkdocs", "mypkg"'))
+    os.utime(pyproject, ns=(0, 1))
+    assert _resolve_uv_upgrade_strategy("auto", root, "mypkg") == "add"
+
+    lock = project / "uv.lock"
+    lock.write_text(_lock("app", "stray"))
+    os.utime(lock, ns=(0, 1))
+    assert _resolve_uv_upgrade_strategy("auto", root, "stray") == "lock"
+
+
+def test_projects_without_a_readable_lock_add(project):
+    (project / "uv.lock").unlink()
+    assert _resolve_uv_upgrade_strategy("auto", str(project), "mypkg") == "add"
+
+    (project / "uv.lock").mkdir()
+    assert _resolve_uv_upgrade_strategy("auto", str(project), "mypkg") == "add"
+    assert _uv_lock_scans[str(project / "uv.lock")].complete
+
+
+def test_disk_cache_sees_dependency_changes(project, tmp_path):
+    cache = DiskCache(tmp_path / "cache")
+    result = cache.detect("mypkg", "auto")
+    assert result is not None
+    assert result.upgrade_cmd == "uv lock --upgrade-package mypkg"
+
+    pyproject = project / "pyproject.toml"
+    pyproject.write_text(PYPROJECT.replace('"mkdocs"', '"mkdocs", "mypkg"'))
+    os.utime(pyproject, ns=(0, 1))
+
+    result = DiskCache(tmp_path / "cache").detect("mypkg", "auto")
+    assert result is not None
+    assert result.upgrade_cmd == "uv add mypkg --upgrade-package mypkg"
+
+
+@pytest.mark.parametrize("strategy", ["add", "lock"])
+def test_explicit_strategies_read_nothing(project, strategy):
+    before = _fs_calls.open
+
+    assert _resolve_uv_upgrade_strategy(strategy, str(project), "mypkg") == strategy
+    assert _fs_calls.open == before
+
+
+def test_plan_groups_by_resolved_strategy(project):
+    plan = upgrade_plan(["rich", "mypkg", "stray"], "auto")
+
+    assert plan.commands == [
+        "uv add rich stray --upgrade-package rich --upgrade-package stray",
+        "uv lock --upgrade-package mypkg",
+    ]
+
+
+def test_uv_pip_ignores_auto(fake_env):
+    fake_env({"prefix": "venv", "installer_value": "uv"})
+
+    assert _upgrade_cmd("mypkg") == ("uv pip install --upgrade mypkg")
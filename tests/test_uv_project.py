@@ -0,0 +1,143 @@
+"""Tests for locating the uv project that owns the running environment."""
+
+import os
+
+import pytest
+
+from detect_installer import Installer, detect_installer
+from detect_installer._detect import _search_uv_project
+
+
+def _installer(fake_env, spec):
+    fake_env({"installer_value": "uv", **spec})
+    result = detect_installer("mypkg")
+    assert result is not None
+    return result.installer
+
+
+def test_pyproject_with_tool_uv_is_a_project_root(fake_env):
+    spec = {
+        "prefix": "myproject/.venv",
+        "extra_files": {"myproject/pyproject.toml": "[project]\n\n[tool.uv]\n"},
+    }
+    assert _installer(fake_env, spec) is Installer.UV
+
+
+def test_pyproject_without_tool_uv_is_not_a_project_root(fake_env):
+    spec = {
+        "prefix": "myproject/.venv",
+        "extra_files": {"myproject/pyproject.toml": "[tool.poetry]\n"},
+    }
+    assert _installer(fake_env, spec) is Installer.UV_PIP
+
+
+def test_deeply_nested_workspace_member(fake_env):
+    spec = {
+        "prefix": "ws/packages/group/sub/member/.venv",
+        "extra_files": {"ws/uv.lock": ""},
+    }
+    assert _installer(fake_env, spec) is Installer.UV
+
+
+def test_uv_project_environment_absolute(fake_env, tmp_path, monkeypatch):
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "uv.lock").write_text("")
+    monkeypatch.chdir(project)
+    monkeypatch.setenv("UV_PROJECT_ENVIRONMENT", str(tmp_path / "envs/project"))
+
+    assert _installer(fake_env, {"prefix": "envs/project"}) is Installer.UV
+
+
+def test_uv_project_environment_relative(fake_env, monkeypatch):
+    monkeypatch.setenv("UV_PROJECT_ENVIRONMENT", "build/venv")
+    spec = {"prefix": "project/build/venv", "extra_files": {"project/uv.lock": ""}}
+
+    assert _installer(fake_env, spec) is Installer.UV
+
+
+@pytest.mark.parametrize("project_env", ["/somewhere/else", "build/venv"])
+def test_uv_project_environment_pointing_elsewhere_is_ignored(
+    fake_env, monkeypatch, project_env
+):
+    monkeypatch.setenv("UV_PROJECT_ENVIRONMENT", project_env)
+    spec = {"prefix": "project/.venv", "extra_files": {"project/uv.lock": ""}}
+
+    assert _installer(fake_env, spec) is Installer.UV
+
+
+def test_directories_are_examined_once(tmp_path, monkeypatch):
+    (tmp_path / "a/b/one").mkdir(parents=True)
+    (tmp_path / "a/b/two").mkdir(parents=True)
+    (tmp_path / "a/uv.lock").write_text("")
+
+    _search_uv_project(str(tmp_path / "a/b/one"))
+
+    scandir, stat = os.scandir, os.stat
+    seen = []
+    monkeypatch.setattr("os.scandir", lambda p: seen.append(p) or scandir(p))
+    monkeypatch.setattr("os.stat", lambda p, **kw: seen.append(p) or stat(p, **kw))
+
+    root, visited = _search_uv_project(str(tmp_path / "a/b/two"))
+
+    assert root == str(tmp_path / "a")
+    assert visited == [str(tmp_path / "a/b"), str(tmp_path / "a")]
+    assert seen == [str(tmp_path / "a/b/two")]
+
+
+def test_walk_stops_at_filesystem_boundary(tmp_path, monkeypatch):
+    (tmp_path / "mnt/project/.venv").mkdir(parents=True)
+    (tmp_path / "uv.lock").write_text("")
+    mount = str(tmp_path / "mnt")
+
+    real_stat = os.stat
+
+    class _Stat:
+        def __init__(self, st_dev):
+            self.st_dev = st_dev
+
+    def _stat(path, **kwargs):
+        inside = str(path).startswith(mount)
+        return _Stat(2 if inside else real_stat(path, **kwargs).st_dev)
+
+    monkeypatch.setattr("os.stat", _stat)
+
+    root, visited = _search_uv_project(str(tmp_path / "mnt/project/.venv"))
+
+    assert root is None
+    assert visited == [str(tmp_path / "mnt/project"), mount]
+
+
+@pytest.mark.parametrize(
+    "content",
+    ["[tool.uv.workspace]\n", "  [tool.uv.sources]\n", "[[tool.uv.index]]\n"],
+)
+def test_tool_uv_subtables_count(tmp_path, content):
+    (tmp_path / "pyproject.toml").write_text(content)
+    (tmp_path / ".venv").mkdir()
+
+    assert _search_uv_project(str(tmp_path / ".venv"))[0] == str(tmp_path)
+
+
+@pytest.mark.parametrize(
+    "content",
+    ["[tool.uvicorn]\n", "[tool.uv-dynamic-versioning]\n", 'x = "[tool.uv]"\n'],
+)
+def test_tables_merely_starting_with_tool_uv_do_not_count(tmp_path, content):
+    (tmp_path / "pyproject.toml").write_text(content)
+    (tmp_path / ".venv").mkdir()
+
+    assert _search_uv_project(str(tmp_path / ".venv"))[0] is None
+
+
+def test_unreadable_pyproject_does_not_count(tmp_path):
+    (tmp_path / "pyproject.toml").mkdir()
+    (tmp_path / ".venv").mkdir()
+
+    assert _search_uv_project(str(tmp_path / ".venv"))[0] is None
+
+
+def test_missing_start_directory(tmp_path):
+    start = str(tmp_path / "gone")
+
+    assert _search_uv_project(start, include_start=True) == (None, [start])